@@ -0,0 +1,227 @@
+"""
+Headless Batch-Lauf: komplettes Universe + Portfolio analysieren und die
+gerankten Radar- und Portfolio-Tabellen als Parquet/CSV/JSON schreiben.
+
+    python agi_batch.py --out exports --formats parquet,csv,json
+    python agi_batch.py --snapshot      # zusätzlich Analyse-Snapshot für die APP schreiben
+    python agi_batch.py --shards 8      # Universe auf 8 Prozesse verteilen (große Universes)
+    python agi_batch.py --top 50        # Radar nur mit den Top-50 nach STS bzw. LAS
+
+Exit-Code 0 = ok, 1 = keine einzige Radar-Zeile berechnet.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import perf
+import price_panel
+from sharded_scan import scan_universe, top_k_rows
+from config_utils import load_ai_universe, load_config
+from analysis_core import (
+    PREFETCH_WORKERS,
+    build_portfolio_overview,
+    build_radar_rows,
+    compute_macro_context,
+    decide_portfolio_action,
+    prefetch_market_data,
+    score_dual_candidate,
+    screen_tickers,
+)
+
+OUTPUT_FORMATS = ("parquet", "csv", "json")
+
+
+class StageTimer:
+    """Misst die Dauer benannter Stufen (Sekunden)."""
+
+    def __init__(self):
+        self.timings = {}
+
+    def run(self, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings[stage] = round(time.perf_counter() - started, 3)
+        return result
+
+
+def rank_radar(rows):
+    """Radar-Tabelle nach STS sortieren und Ränge für STS & LAS ergänzen."""
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df["Rang STS"] = df["STS (Short-Term)"].rank(ascending=False, method="min").astype(int)
+    df["Rang LAS"] = df["LAS (Long-Term AGI)"].rank(ascending=False, method="min").astype(int)
+    return df.sort_values(["Rang STS", "Rang LAS"]).reset_index(drop=True)
+
+
+def portfolio_table(analyses, rows, thresholds, macro):
+    """Portfolio-Zeilen um Empfehlung und STS/LAS erweitern."""
+    out = []
+    for row in rows:
+        analysis, total_shares = analyses[row["Ticker"].upper()]
+        action, reason = decide_portfolio_action(analysis, total_shares)
+        sts, las = score_dual_candidate(analysis, thresholds, macro)
+        out.append(
+            {
+                **row,
+                "STS (Short-Term)": sts,
+                "LAS (Long-Term AGI)": las,
+                "Aktion": action,
+                "Begründung": reason,
+            }
+        )
+    return pd.DataFrame(out)
+
+
+def write_table(df, out_dir, name, formats):
+    """Tabelle in allen gewünschten Formaten schreiben; liefert die Pfade."""
+    written = []
+    for fmt in formats:
+        path = out_dir / f"{name}.{fmt}"
+        if fmt == "parquet":
+            try:
+                df.to_parquet(path, index=False)
+            except ImportError:
+                print(f"WARN: Parquet übersprungen ({name}) – pyarrow/fastparquet fehlt", file=sys.stderr)
+                continue
+        elif fmt == "csv":
+            df.to_csv(path, index=False)
+        elif fmt == "json":
+            df.to_json(path, orient="records", force_ascii=False, indent=2)
+        written.append(str(path))
+    return written
+
+
+def run_batch(out_dir, formats, workers=PREFETCH_WORKERS, prefetch=True, snapshot=False,
+              shards=1, top_k=None):
+    """
+    Kompletter Lauf; liefert die Zusammenfassung als dict.
+    shards > 1: Universe-Scan (Laden, Analyse, Scoring) in eigenen Prozessen,
+    workers gilt dann pro Shard.
+    """
+    timer = StageTimer()
+    cfg = load_config()
+    thresholds = cfg.get("thresholds", {"run_up_pct": 30, "dip_pct": -30})
+    universe = load_ai_universe().get("ai_universe", [])
+
+    portfolio_tickers = [p["ticker"] for p in cfg.get("portfolio", [])]
+    tickers = portfolio_tickers + [e["ticker"] for e in universe if e.get("ticker")]
+
+    # Vorfilter: Zombie-/Untradable-Werte vor jedem teuren Abruf aussortieren
+    tickers, screened_out = timer.run("screen", screen_tickers, tickers, keep=portfolio_tickers)
+
+    failed = []
+    if prefetch:
+        # mit Shards lädt jeder Worker sein Universe-Stück selbst
+        to_fetch = tickers if shards <= 1 else portfolio_tickers
+        failed = timer.run("prefetch", prefetch_market_data, to_fetch, max_workers=workers)
+
+    macro = timer.run("macro", compute_macro_context)
+
+    shard_stats = None
+    if shards > 1:
+        entries = [e for e in universe if (e.get("ticker") or "").upper() not in screened_out]
+        radar_rows, shard_stats = timer.run(
+            "scan", scan_universe, entries, thresholds, macro, shards,
+            top_k=top_k, prefetch=prefetch, max_workers=workers,
+        )
+
+    if prefetch:
+        timer.run("panel", price_panel.publish_panel, tickers)
+    # Analyse aus dem geteilten Panel (Stand des letzten Prefetch/Warmer-Laufs)
+    price_panel.activate()
+
+    _portfolio, analyses, rows, gesamt_wert, gesamt_einsatz = timer.run(
+        "portfolio", build_portfolio_overview, cfg, thresholds
+    )
+    if shards <= 1:
+        radar_rows = timer.run("radar", build_radar_rows, universe, thresholds, macro)
+        if top_k:
+            radar_rows = top_k_rows(radar_rows, top_k)
+
+    radar_df = rank_radar(radar_rows)
+    portfolio_df = portfolio_table(analyses, rows, thresholds, macro)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    files = write_table(radar_df, out_dir, "radar", formats)
+    files += write_table(portfolio_df, out_dir, "portfolio", formats)
+    timer.timings["write"] = round(time.perf_counter() - started, 3)
+
+    if snapshot:
+        # Import erst hier: der Snapshot rechnet alles noch einmal aus dem Cache
+        from snapshot import build_analysis_context, save_snapshot
+
+        timer.run("snapshot", lambda: save_snapshot(build_analysis_context(cfg, thresholds)))
+
+    return {
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "tickers": len(set(t.upper() for t in tickers)),
+        "radar_rows": len(radar_df),
+        "portfolio_rows": len(portfolio_df),
+        "without_data": failed,
+        "screened_out": screened_out,
+        "shards": shard_stats,
+        "macro_regime": macro.get("regime"),
+        "gesamt_wert": round(gesamt_wert, 2),
+        "gesamt_einsatz": round(gesamt_einsatz, 2),
+        "timings_s": {**timer.timings, "total": round(sum(timer.timings.values()), 3)},
+        "files": files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AGI & AI Radar/Portfolio – Batch-Lauf ohne UI")
+    parser.add_argument("--out", default="exports", help="Ausgabeverzeichnis (Standard: exports)")
+    parser.add_argument(
+        "--formats",
+        default="parquet,csv,json",
+        help="Komma-getrennt, Auswahl aus: " + ", ".join(OUTPUT_FORMATS),
+    )
+    parser.add_argument("--workers", type=int, default=PREFETCH_WORKERS, help="parallele Abrufe")
+    parser.add_argument("--no-prefetch", action="store_true", help="nur vorhandene Caches nutzen")
+    parser.add_argument("--snapshot", action="store_true", help="Analyse-Snapshot für die APP schreiben")
+    parser.add_argument(
+        "--shards", type=int, default=1, help="Universe-Scan auf so viele Prozesse verteilen"
+    )
+    parser.add_argument(
+        "--top", type=int, default=None, help="Radar auf die Top-k nach STS bzw. LAS begrenzen"
+    )
+    args = parser.parse_args()
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        parser.error(f"unbekannte Formate: {', '.join(unknown)}")
+
+    run = perf.start_run("batch")
+    try:
+        summary = run_batch(
+            Path(args.out),
+            formats,
+            workers=args.workers,
+            prefetch=not args.no_prefetch,
+            snapshot=args.snapshot,
+            shards=args.shards,
+            top_k=args.top,
+        )
+    finally:
+        perf_summary = perf.finish_run(run)
+    summary["network"] = perf_summary["network"]
+    summary["slowest_tickers"] = perf_summary["slowest_tickers"][:10]
+
+    (Path(args.out) / "summary.json").write_text(
+        json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0 if summary["radar_rows"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,26 @@
+import time
+from datetime import datetime
+
 import streamlit as st
 
+import perf
+import price_panel
+from analysis_core import set_read_only
 from config_utils import load_config
+from live_quotes import QUOTE_MAX_AGE
+from snapshot import (
+    apply_live_quotes,
+    build_analysis_context,
+    context_version,
+    is_stale,
+    latest_context,
+    prefetch_pending,
+    refresh_error,
+    refresh_running,
+    set_context,
+    snapshot_age,
+    start_background_refresh,
+)
 from styles import STYLES
 from icons import icon_html
 from ui_tabs import (
@@ -8,22 +28,12 @@ from ui_tabs import (
     render_universe_tab,
     render_portfolio_tab,
     render_trades_tab,
+    render_diagnostics_panel,
 )
 
 
-def main():
-    st.set_page_config(
-        page_title="AGI & AI Trading APP",
-        layout="centered",
-        initial_sidebar_state="collapsed",
-    )
-
-    # Styles laden
-    st.markdown(STYLES, unsafe_allow_html=True)
-
-    # -------------------------------------------------
-    # Lade-Hinweis + Fortschrittsbalken (Retro-Style)
-    # -------------------------------------------------
+def _compute_with_loader(cfg, thresholds):
+    """Allererster Start ohne Snapshot: einmal synchron rechnen (Retro-Loader)."""
     loader = st.empty()
 
     with loader.container():
@@ -36,6 +46,7 @@ def main():
               <div class="loading-box-sub">
                 Diese APP verknüpft sehr viele Markt- und Bewertungsdaten.
                 Der erste Start kann bis zu <b>180 Sekunden</b> dauern – das ist vollkommen normal.
+                Danach startet die APP sofort aus dem gespeicherten Datenstand.
               </div>
             </div>
             """,
@@ -43,6 +54,40 @@ def main():
         )
         progress = st.progress(0)
 
+    ctx = build_analysis_context(
+        cfg,
+        thresholds,
+        progress_cb=lambda frac: progress.progress(int(frac * 100)),
+    )
+    set_context(ctx)
+
+    # Lade-Hinweis + Balken entfernen, wenn alles fertig ist
+    loader.empty()
+    return ctx
+
+
+def main():
+    run = perf.start_run("rerun")
+    try:
+        _render_app()
+    finally:
+        summary = perf.finish_run(run)
+
+    # Verstecktes Diagnose-Panel: ?diag=1 an die URL hängen
+    if st.query_params.get("diag") == "1":
+        render_diagnostics_panel(summary, perf.last_runs())
+
+
+def _render_app():
+    st.set_page_config(
+        page_title="AGI & AI Trading APP",
+        layout="centered",
+        initial_sidebar_state="collapsed",
+    )
+
+    # Styles laden
+    st.markdown(STYLES, unsafe_allow_html=True)
+
     # Titel mit Icon
     st.markdown(
         f"""
@@ -61,7 +106,38 @@ def main():
     # Konfiguration laden
     cfg = load_config()
     thresholds = cfg.get("thresholds", {"run_up_pct": 30, "dip_pct": -30})
-    progress.progress(20)
+
+    # Läuft der Cache-Warmer, liest die APP nur noch aus dem geteilten Cache
+    # (Kurse aus dem vom Warmer veröffentlichten Panel)
+    warmer = cfg["warmer"].get("enabled", False)
+    set_read_only(warmer)
+    if warmer:
+        price_panel.activate()
+
+    # -------------------------------------------------
+    # Analyse-Kontext: sofort aus dem Snapshot, Neuberechnung im Hintergrund
+    # (mit Cache-Warmer rechnet nur der Warmer neu, die APP liest nur)
+    # -------------------------------------------------
+    ctx = latest_context()
+    if warmer:
+        if ctx is None:
+            st.info(
+                "Noch kein Datenstand vorhanden – der Cache-Warmer schreibt gerade "
+                "den ersten Snapshot. Die APP lädt ihn automatisch."
+            )
+            _watch_background_refresh(None)
+            return
+    elif ctx is None:
+        ctx = _compute_with_loader(cfg, thresholds)
+    elif is_stale(ctx, cfg, thresholds):
+        start_background_refresh(cfg, thresholds)
+
+    # Live-Kurse: ein gebündelter Quote-Abruf statt neuer Historien
+    if st.session_state.get("live_quotes"):
+        ctx = apply_live_quotes(ctx, cfg, thresholds)
+        st.session_state["live_rendered_at"] = time.time()
+
+    render_snapshot_status(ctx, warmer)
 
     # -------------------------------------------------
     # Tabs: DAILY ACTIONS entfernt – alles in 4 Tabs
@@ -70,25 +146,81 @@ def main():
         ["HOME", "AGI/AI RADAR", "PORTFOLIO", "TRADE/JOURNAL"]
     )
 
-    # Tabs rendern
-    with tab_actions:
-        render_actions_tab(cfg, thresholds)
-    progress.progress(40)
+    # Tabs rendern (Dauer pro Tab wird für die Diagnose erfasst)
+    with tab_actions, perf.span("render_tab", tab="HOME"):
+        render_actions_tab(cfg, thresholds, ctx)
 
-    with tab_universe:
-        render_universe_tab(cfg, thresholds)
-    progress.progress(60)
+    with tab_universe, perf.span("render_tab", tab="AGI/AI RADAR"):
+        render_universe_tab(cfg, thresholds, ctx)
 
-    with tab_portfolio:
-        render_portfolio_tab(cfg, thresholds)
-    progress.progress(80)
+    with tab_portfolio, perf.span("render_tab", tab="PORTFOLIO"):
+        render_portfolio_tab(cfg, thresholds, ctx)
 
-    with tab_trades:
+    with tab_trades, perf.span("render_tab", tab="TRADE/JOURNAL"):
         render_trades_tab(cfg)
-    progress.progress(100)
 
-    # Lade-Hinweis + Balken entfernen, wenn alles fertig ist
-    loader.empty()
+
+@st.fragment(run_every=5)
+def _watch_background_refresh(version):
+    """
+    Sobald ein neuerer Kontext vorliegt (Hintergrund-Lauf, Journal-Änderung,
+    vorgeladener neuer Ticker) → App neu rendern.
+    """
+    latest = latest_context()
+    if latest is not None and context_version(latest) != version:
+        st.rerun()
+
+
+def render_snapshot_status(ctx, warmer=False):
+    """Alter des angezeigten Datenstands + Hinweis auf laufende Aktualisierung."""
+    age_min = int(snapshot_age(ctx) // 60)
+    created = datetime.fromisoformat(ctx["created_at"]).strftime("%d.%m.%Y %H:%M")
+    if age_min < 1:
+        age_txt = "gerade eben"
+    elif age_min < 120:
+        age_txt = f"vor {age_min} Min."
+    else:
+        age_txt = f"vor {age_min // 60} Std."
+
+    status = f"Datenstand: <b>{created}</b> ({age_txt})"
+    live = ctx.get("live_quotes")
+    if live:
+        live_time = datetime.fromtimestamp(live["fetched_at"]).strftime("%H:%M:%S")
+        status += f" – Live-Kurse: <b>{live_time}</b> ({live['tickers']} Ticker, vorläufig)"
+    pending = prefetch_pending()
+    if pending:
+        status += f" – lade Kursdaten für {', '.join(pending)} …"
+    if warmer:
+        status += " – wird vom Cache-Warmer aktualisiert"
+    elif refresh_running():
+        status += " – Aktualisierung läuft im Hintergrund …"
+    elif refresh_error():
+        status += " – letzte Aktualisierung fehlgeschlagen, zeige gespeicherten Stand"
+
+    st.markdown(
+        f"<div class='snapshot-status'>{status}</div>",
+        unsafe_allow_html=True,
+    )
+
+    # auch ohne laufende Aktualisierung: eine Journal-Änderung weiter unten
+    # im selben Lauf passt den Kontext an
+    _watch_background_refresh(context_version(ctx))
+
+    st.toggle(
+        "Live-Kurse (intraday)",
+        key="live_quotes",
+        help="Aktuelle Kurse als vorläufiger Tages-Bar über dem Datenstand – "
+        f"ein gebündelter Abruf, höchstens alle {QUOTE_MAX_AGE} Sekunden.",
+    )
+    if st.session_state.get("live_quotes"):
+        _watch_live_quotes()
+
+
+@st.fragment(run_every=QUOTE_MAX_AGE)
+def _watch_live_quotes():
+    """Live-Modus: regelmäßig neu rendern (Quotes kommen aus dem geteilten Cache)."""
+    if time.time() - st.session_state.get("live_rendered_at", 0.0) >= QUOTE_MAX_AGE:
+        st.rerun()
 
 
 if __name__ == "__main__":
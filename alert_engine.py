@@ -0,0 +1,359 @@
+"""
+Streaming-Alerts für Ladder-Ziele und Wellen-Zonen.
+
+    python alert_engine.py                      # Live-Kurse pollen, Alerts auf die Konsole
+    python alert_engine.py --stdin              # Updates "TICKER,KURS[,UNIXZEIT]" von stdin
+    python alert_engine.py --sinks console,file:logs/alerts.jsonl,webhook:http://127.0.0.1:8766/alerts
+    python alert_engine.py --serve-webhook      # lokaler Webhook-Empfänger (Stand-in)
+
+Die Trigger-Level kommen aus dem Analyse-Snapshot (Ladder-Ziele, nächste
+Ladder-Stufe laut Fortschritt, TP-/Re-Entry-Level der Wellenlogik) und liegen
+pro Ticker sortiert vor. Ein Kurs-Update kostet zwei Binärsuchen; ein Alert
+feuert nur, wenn seit dem letzten Kurs ein Level gekreuzt wurde.
+"""
+
+import argparse
+import bisect
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import live_quotes
+from config_utils import load_config
+from ladder_engine import LADDER_LEVELS, next_ladder_trigger
+from snapshot import context_version, latest_context
+
+ALERT_LOG_PATH = Path("logs") / "alerts.jsonl"
+WEBHOOK_HOST = "127.0.0.1"
+WEBHOOK_PORT = 8766
+
+# Dasselbe Level feuert frühestens nach so vielen Sekunden erneut (Flattern am Level)
+COOLDOWN = 15 * 60
+
+UP, DOWN = 1, -1
+
+Trigger = namedtuple("Trigger", "ticker level direction kind label")
+
+
+# -------------------------------------------------------------------
+# Trigger-Level aus dem Analyse-Kontext
+# -------------------------------------------------------------------
+
+def build_triggers(ctx, cfg):
+    """
+    Trigger aller Portfolio- und Radar-Werte → (Trigger-Liste, {ticker: Kurs}).
+    Die Kurse dienen als Ausgangspunkt, damit beim Start nichts feuert.
+    """
+    triggers, prices = [], {}
+    progress = cfg.get("ladder_progress", {})
+
+    for ticker, (analysis, shares) in ctx.get("portfolio_analyses", {}).items():
+        name = analysis.get("name") or ticker
+        for i, target in enumerate(analysis.get("targets") or [], start=1):
+            triggers.append(
+                Trigger(ticker, float(target), UP, "ladder_target", f"{name}: Ziel {i} erreicht")
+            )
+        stage = next_ladder_trigger(ticker, shares, analysis.get("buy_price"), progress)
+        if stage is not None:
+            level, number = stage
+            triggers.append(Trigger(
+                ticker, level, UP, "ladder_stage",
+                f"{name}: Ladder-Stufe {number}/{len(LADDER_LEVELS)} – Teilverkauf fällig",
+            ))
+
+    analyses = dict(ctx.get("radar_analyses") or {})
+    analyses.update({t: a for t, (a, _shares) in ctx.get("portfolio_analyses", {}).items()})
+    for ticker, analysis in analyses.items():
+        name = analysis.get("name") or ticker
+        if analysis.get("price"):
+            prices[ticker] = analysis["price"]
+        if analysis.get("wave_tp_level"):
+            triggers.append(Trigger(
+                ticker, float(analysis["wave_tp_level"]), UP, "wave_tp",
+                f"{name}: Take-Profit-Zone",
+            ))
+        if analysis.get("wave_reentry_level"):
+            triggers.append(Trigger(
+                ticker, float(analysis["wave_reentry_level"]), DOWN, "wave_reentry",
+                f"{name}: Re-Entry-Zone",
+            ))
+    return triggers, prices
+
+
+# -------------------------------------------------------------------
+# Engine
+# -------------------------------------------------------------------
+
+class AlertEngine:
+    """
+    Sortierter Level-Index pro Ticker. update() sucht per bisect die Level
+    zwischen letztem und neuem Kurs – O(log n) pro Update plus Treffer.
+    Ticker werden groß geschrieben erwartet.
+    """
+
+    def __init__(self, sinks=(), cooldown=COOLDOWN):
+        self.sinks = list(sinks)
+        self.cooldown = cooldown
+        self.levels = {}    # ticker -> sortierte Level
+        self.triggers = {}  # ticker -> Trigger in derselben Reihenfolge
+        self.last = {}      # ticker -> letzter Kurs
+        self.fired_at = {}  # (ticker, kind, level) -> Zeitpunkt
+        self.updates = 0
+        self.alerts = 0
+
+    def load(self, triggers, prices=None):
+        """Index (neu) aufbauen; bekannte letzte Kurse bleiben erhalten."""
+        grouped = {}
+        for trigger in triggers:
+            grouped.setdefault(trigger.ticker.upper(), []).append(trigger)
+        levels, ordered = {}, {}
+        for ticker, items in grouped.items():
+            items.sort(key=lambda t: t.level)
+            ordered[ticker] = items
+            levels[ticker] = [t.level for t in items]
+        self.levels, self.triggers = levels, ordered
+        for ticker, price in (prices or {}).items():
+            self.last.setdefault(ticker.upper(), price)
+
+    def update(self, ticker, price, at=None):
+        """Einen Kurs verarbeiten → Liste der ausgelösten Alerts."""
+        self.updates += 1
+        previous = self.last.get(ticker)
+        self.last[ticker] = price
+        levels = self.levels.get(ticker)
+        if previous is None or levels is None or price == previous:
+            return []
+
+        if price > previous:
+            direction = UP
+            lo, hi = bisect.bisect_right(levels, previous), bisect.bisect_right(levels, price)
+        else:
+            direction = DOWN
+            lo, hi = bisect.bisect_left(levels, price), bisect.bisect_left(levels, previous)
+        if lo == hi:
+            return []
+
+        at = at or time.time()
+        fired = []
+        for trigger in self.triggers[ticker][lo:hi]:
+            if trigger.direction != direction:
+                continue
+            key = (ticker, trigger.kind, trigger.level)
+            if at - self.fired_at.get(key, float("-inf")) < self.cooldown:
+                continue
+            self.fired_at[key] = at
+            fired.append({
+                "at": datetime.fromtimestamp(at).isoformat(timespec="seconds"),
+                "ticker": ticker,
+                "kind": trigger.kind,
+                "label": trigger.label,
+                "level": round(trigger.level, 4),
+                "price": price,
+                "previous": previous,
+                "direction": "up" if direction == UP else "down",
+            })
+
+        for alert in fired:
+            for sink in self.sinks:
+                sink.emit(alert)
+        self.alerts += len(fired)
+        return fired
+
+    def run(self, updates):
+        """Einen Strom (ticker, kurs[, zeit]) abarbeiten; liefert die Anzahl Alerts."""
+        before = self.alerts
+        for update in updates:
+            self.update(*update)
+        return self.alerts - before
+
+
+# -------------------------------------------------------------------
+# Sinks
+# -------------------------------------------------------------------
+
+class ConsoleSink:
+    def emit(self, alert):
+        arrow = "↑" if alert["direction"] == "up" else "↓"
+        print(
+            f"[{alert['at']}] {arrow} {alert['label']} – Kurs {alert['price']:.2f} "
+            f"(Level {alert['level']:.2f})",
+            flush=True,
+        )
+
+
+class FileSink:
+    """Alerts als JSON-Zeilen anhängen."""
+
+    def __init__(self, path=ALERT_LOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def emit(self, alert):
+        line = json.dumps(alert, ensure_ascii=False)
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class WebhookSink:
+    """
+    Alerts per HTTP-POST (JSON) zustellen – in einem Hintergrund-Thread,
+    damit ein langsamer Empfänger den Kurs-Strom nicht bremst.
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._deliver, name="alert-webhook", daemon=True)
+        self.thread.start()
+
+    def emit(self, alert):
+        self.queue.put(alert)
+
+    def _deliver(self):
+        while True:
+            alert = self.queue.get()
+            request = urllib.request.Request(
+                self.url,
+                data=json.dumps(alert, ensure_ascii=False).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except OSError as e:
+                print(f"WARN: Webhook {self.url} nicht erreichbar ({e})", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+
+def sink_from_spec(spec):
+    """'console' | 'file[:<pfad>]' | 'webhook:<url>' → Sink."""
+    kind, _, arg = spec.strip().partition(":")
+    kind = kind.lower()
+    if kind == "console":
+        return ConsoleSink()
+    if kind == "file":
+        return FileSink(arg or ALERT_LOG_PATH)
+    if kind == "webhook":
+        return WebhookSink(arg or f"http://{WEBHOOK_HOST}:{WEBHOOK_PORT}/alerts")
+    raise ValueError(f"Unbekannter Alert-Sink: {spec}")
+
+
+# -------------------------------------------------------------------
+# Webhook-Stand-in & Kurs-Quellen
+# -------------------------------------------------------------------
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            alert = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+        ConsoleSink().emit(alert)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_webhook(host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+    """Lokaler Empfänger für WebhookSink: gibt eingehende Alerts auf der Konsole aus."""
+    server = ThreadingHTTPServer((host, port), _WebhookHandler)
+    print(f"Webhook-Empfänger auf http://{host}:{port}/alerts", flush=True)
+    server.serve_forever()
+
+
+def parse_updates(lines):
+    """Zeilen 'TICKER,KURS[,UNIXZEIT]' oder JSON {"ticker","price","at"} → Updates."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            data = json.loads(line)
+            yield data["ticker"].upper(), float(data["price"]), data.get("at")
+            continue
+        parts = line.split(",")
+        at = float(parts[2]) if len(parts) > 2 and parts[2] else None
+        yield parts[0].strip().upper(), float(parts[1]), at
+
+
+def poll_live_quotes(engine, interval=live_quotes.QUOTE_MAX_AGE):
+    """
+    Endlos: Live-Kurse aller Trigger-Ticker holen und einspeisen. Neuer
+    Kontext (Snapshot, Journal-Änderung) → Level samt Ladder-Stand neu laden.
+    """
+    version = None
+    while True:
+        ctx = latest_context()
+        if ctx is not None and context_version(ctx) != version:
+            engine.load(*build_triggers(ctx, load_config()))
+            version = context_version(ctx)
+        quotes = live_quotes.get_quotes(list(engine.levels), max_age=interval)
+        for ticker, quote in quotes.items():
+            if quote.get("Close") is not None:
+                engine.update(ticker, quote["Close"])
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming-Alerts für Ladder-Ziele & Wellen-Zonen")
+    parser.add_argument(
+        "--sinks", default="console", help="Komma-getrennt: console, file[:pfad], webhook:<url>"
+    )
+    parser.add_argument("--stdin", action="store_true", help="Kurs-Updates von stdin lesen")
+    parser.add_argument("--serve-webhook", action="store_true", help="nur Webhook-Empfänger starten")
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT, help="Port des Webhook-Empfängers")
+    args = parser.parse_args()
+
+    if args.serve_webhook:
+        serve_webhook(port=args.port)
+        return 0
+
+    try:
+        sinks = [sink_from_spec(s) for s in args.sinks.split(",") if s.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+
+    cfg = load_config()
+    ctx = latest_context()
+    if ctx is None:
+        print("Kein Analyse-Snapshot vorhanden – erst APP, Cache-Warmer oder Batch laufen lassen.",
+              file=sys.stderr)
+        return 1
+
+    engine = AlertEngine(sinks)
+    engine.load(*build_triggers(ctx, cfg))
+    try:
+        if args.stdin:
+            engine.run(parse_updates(sys.stdin))
+        else:
+            poll_live_quotes(engine)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sink in sinks:
+            if hasattr(sink, "flush"):
+                sink.flush()
+    print(f"{engine.updates} Updates, {engine.alerts} Alerts", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,536 @@
-import yfinance as yf
-import pandas as pd
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import pandas as pd
+
+import cache_store
+import live_quotes
+import market_calendar
+import perf
+import lot_ledger
+import price_panel
+import price_store
+from fetch_guard import guarded_provider, is_provider_failure
+from single_flight import FLIGHTS, coalesce
+
+log = logging.getLogger("analysis_core")
+
 # -------------------------------------------------------------------
 # Caches
 # -------------------------------------------------------------------
 
+# In-Memory-Front vor dem persistenten cache_store: key -> (value, fetched_at)
+# Geteilt von allen Session-Threads; gleichzeitige Abrufe desselben Tickers
+# bündelt @coalesce (single_flight), sodass nur ein Thread wirklich lädt.
 FUND_CACHE = {}
 EARNINGS_CACHE = {}
-MACRO_CACHE = None
+MACRO_CACHE = {}
+
+# Maximales Alter der gecachten Daten (Sekunden). Solange seit dem Abruf
+# kein neuer Handelstag geschlossen hat, bleiben sie trotzdem gültig
+# (market_calendar) – Makro-Daten sind sogar nur daran gebunden.
+FUND_MAX_AGE = 7 * 24 * 60 * 60
+EARNINGS_MAX_AGE = 24 * 60 * 60
+
+# Nur-Lesen-Modus: jeder vorhandene Cache-Stand wird genutzt, aktualisiert
+# wird ausschließlich vom Cache-Warmer (nur echte Lücken werden nachgeladen).
+READ_ONLY = False
+
+
+def set_read_only(flag):
+    global READ_ONLY
+    READ_ONLY = bool(flag)
+
+
+def _is_valid(fetched_at, max_age, calendar_ticker):
+    if max_age is not None and time.time() - fetched_at < max_age:
+        return True
+    return market_calendar.is_current(calendar_ticker, fetched_at)
+
+
+def _cache_lookup(mem_cache, namespace, key, max_age, calendar_ticker=None):
+    """
+    Wert aus Memory- oder Platten-Cache, falls (im Nur-Lesen-Modus: irgendwie) gültig.
+    Gültig = jünger als max_age oder seitdem kein neuer Bar an der Börse
+    von calendar_ticker (Standard: key).
+    """
+    calendar_ticker = calendar_ticker or key
+    entry = mem_cache.get(key)
+    if entry is None or not _is_valid(entry[1], max_age, calendar_ticker):
+        stored = cache_store.get(namespace, key)
+        if stored is not None and (entry is None or stored[1] > entry[1]):
+            entry = stored
+            mem_cache[key] = entry
+
+    if entry is None:
+        return None
+    if READ_ONLY or _is_valid(entry[1], max_age, calendar_ticker):
+        return entry[0]
+    return None
+
+
+def _last_known(mem_cache, namespace, key, default):
+    """Letzter gespeicherter Wert (egal wie alt) – Fallback bei Provider-Fehlern."""
+    entry = mem_cache.get(key) or cache_store.get(namespace, key)
+    return default if entry is None else entry[0]
+
+
+def _cache_store(mem_cache, namespace, key, value, persist=True):
+    mem_cache[key] = (value, time.time())
+    if persist:
+        cache_store.put(namespace, key, value)
 
 
 # -------------------------------------------------------------------
 # Kurs- & Analyse-Helfer
 # -------------------------------------------------------------------
 
+@perf.timed("fetch_history", ticker_arg="ticker")
 def fetch_history(ticker, period="1y"):
-    """1 Jahr Kursdaten (Daily) holen."""
-    data = yf.Ticker(ticker).history(period=period, interval="1d")
-    if data.empty:
+    """
+    Daily-Kursdaten für den gewünschten Zeitraum (Standard: 1 Jahr).
+    Quelle ist der lokale Kursspeicher, der nur bei Bedarf nachgeladen wird –
+    bzw. das geteilte Kurs-Panel, wenn der Prozess es aktiviert hat.
+    """
+    panel = price_panel.active_panel()
+    if panel is not None and period in price_panel.PANEL_PERIODS and ticker in panel:
+        return panel.history(ticker, period)
+
+    data = update_history(ticker)
+    if data is None or data.empty:
         return None
+    return price_store.slice_period(data, period)
+
+
+@coalesce("history", "ticker", "force")
+def update_history(ticker, force=False):
+    """
+    Komplette Historie aus dem Kursspeicher liefern und bei Bedarf aktualisieren:
+    - nichts gespeichert   → einmalig 'max' laden
+    - Speicher veraltet    → nur die Bars ab dem letzten gespeicherten Tag holen
+    - Split/Dividende      → überlappender Bar weicht ab → komplett neu laden
+    force=True ignoriert die Frische-Prüfung (Cache-Warmer).
+    """
+    stored = price_store.load_history(ticker)
+    has_stored = stored is not None and not stored.empty
+    if has_stored and not force and (READ_ONLY or price_store.is_fresh(ticker)):
+        return stored
+
+    if not has_stored:
+        try:
+            data = guarded_provider().history(ticker, period="max")
+        except Exception:
+            # Fehlschlag bzw. Backoff/Circuit Breaker → im Negativ-Cache vermerkt
+            return None
+        data = _finished_bars(ticker, data)
+        if data.empty:
+            return None
+        price_store.save_history(ticker, data)
+        return data
+
+    last_day = stored.index[-1]
+    try:
+        new = guarded_provider().history(ticker, start=last_day.strftime("%Y-%m-%d"))
+    except Exception:
+        # Netzwerkproblem → mit dem gespeicherten Stand weiterarbeiten
+        return stored
+
+    return _apply_history_update(ticker, stored, new)
+
+
+def _finished_bars(ticker, data):
+    """
+    Ohne den vorläufigen Bar des laufenden Handelstags: der ändert sich bis
+    zum Schluss und gehört ins Live-Overlay (live_quotes), nicht in den Speicher.
+    """
+    day = guarded_provider().session_day(ticker)
+    if day is None or data is None or data.empty:
+        return data
+    return data[data.index.date < day]
+
+
+def _apply_history_update(ticker, stored, new):
+    """Neue (fertige) Bars an die gespeicherte Historie hängen (inkl. Split-Prüfung)."""
+    finished = _finished_bars(ticker, stored)  # Altbestand mit vorläufigem Bar
+    new = _finished_bars(ticker, new)
+    if new is None or new.empty:
+        if len(finished) == len(stored):
+            price_store.touch_history(ticker)
+            return stored
+        new = finished.iloc[0:0]
+    stored = finished
+
+    last_day = stored.index[-1] if not stored.empty else None
+    if last_day in new.index:
+        old_close = float(stored.loc[last_day, "Close"])
+        new_close = float(new.loc[last_day, "Close"])
+        if old_close and abs(new_close - old_close) / old_close > 0.005:
+            # rückwirkend adjustierte Kurse → Historie passt nicht mehr zusammen
+            if guarded_provider().session_day(ticker) is not None:
+                # nie während des Handels komplett neu laden; der gespeicherte
+                # Stand bleibt unverändert und wird nach dem Schluss neu geprüft
+                log.info("%s: Kurse rückwirkend geändert, Neuladen nach Handelsschluss", ticker)
+                return stored
+            try:
+                data = guarded_provider().history(ticker, period="max")
+            except Exception:
+                return stored
+            data = _finished_bars(ticker, data)
+            if data.empty:
+                return stored
+            price_store.save_history(ticker, data)
+            return data
+
+    data = price_store.merge_history(stored, new)
+    price_store.save_history(ticker, data)
     return data
 
 
+# -------------------------------------------------------------------
+# Batch-/Parallel-Vorladen (viele Ticker auf einmal)
+# -------------------------------------------------------------------
+
+PREFETCH_WORKERS = 8
+PREFETCH_BATCH_SIZE = 50
+
+
+def _isolated(fn):
+    """
+    Fehler eines einzelnen Tickers abfangen (→ None, geloggt), damit ein
+    Lauf über viele Ticker nicht komplett abbricht.
+    """
+    def call(ticker):
+        try:
+            return fn(ticker)
+        except Exception as e:
+            log.warning("%s: %r", ticker, e)
+            return None
+    return call
+
+
+def _batch_update_histories(stale, force=False):
+    """
+    Veraltete Historien gebündelt aktualisieren: ein Download pro Batch
+    statt einem Request pro Ticker. Ticker, die gerade eine andere Session
+    lädt, werden nicht noch einmal geholt, sondern abgewartet.
+    """
+    updated = {}
+    for i in range(0, len(stale), PREFETCH_BATCH_SIZE):
+        claimed, foreign = {}, {}
+        for ticker in stale[i:i + PREFETCH_BATCH_SIZE]:
+            call, leader = FLIGHTS.begin(("history", ticker, force))
+            (claimed if leader else foreign)[ticker] = call
+
+        try:
+            if claimed:
+                updated.update(_download_chunk(list(claimed), force))
+        except BaseException as e:
+            for ticker, call in claimed.items():
+                FLIGHTS.finish(("history", ticker, force), call, error=e)
+            raise
+        for ticker, call in claimed.items():
+            FLIGHTS.finish(("history", ticker, force), call, result=updated.get(ticker))
+
+        for ticker, call in foreign.items():
+            try:
+                updated[ticker] = FLIGHTS.wait(call, ticker)
+            except Exception:
+                updated[ticker] = price_store.load_history(ticker)
+
+    return updated
+
+
+def _download_chunk(chunk, force):
+    stored = {t: price_store.load_history(t) for t in chunk}
+    start = min(h.index[-1] for h in stored.values()).strftime("%Y-%m-%d")
+
+    try:
+        data = guarded_provider().download(chunk, start=start)
+    except Exception:
+        data = None
+
+    updated = {}
+    for ticker in chunk:
+        if data is None or data.empty:
+            # Batch fehlgeschlagen → Einzelabruf als Fallback (ohne Single-Flight,
+            # der Ticker ist von diesem Thread bereits beansprucht)
+            updated[ticker] = update_history.__wrapped__(ticker, force=force)
+            continue
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                updated[ticker] = stored[ticker]
+                continue
+            new = data[ticker]
+        else:
+            new = data
+        new = price_store.align_index(new.dropna(how="all").copy(), stored[ticker])
+        new = new[new.index >= stored[ticker].index[-1]]
+        updated[ticker] = _apply_history_update(ticker, stored[ticker], new)
+    return updated
+
+
+def prefetch_market_data(tickers, force=False, max_workers=PREFETCH_WORKERS):
+    """
+    Kursdaten, Fundamentals und Earnings für viele Ticker vorab in die Caches laden:
+    - fehlende Historien   → parallel ('max' pro Ticker)
+    - veraltete Historien  → gebündelt per Batch-Download
+    - Fundamentals/Earnings → parallel
+    Danach laufen analyze_ticker & Co. komplett aus dem Cache.
+    Liefert die Ticker ohne Kursdaten.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+
+    missing, stale = [], []
+    for ticker in tickers:
+        if not price_store.has_history(ticker):
+            missing.append(ticker)
+        elif force or not (READ_ONLY or price_store.is_fresh(ticker)):
+            stale.append(ticker)
+
+    histories = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for ticker, data in zip(missing, pool.map(perf.bind(_isolated(update_history)), missing)):
+            histories[ticker] = data
+
+    try:
+        histories.update(_batch_update_histories(stale, force=force))
+    except Exception as e:
+        # Batch abgebrochen → Ticker einzeln (isoliert) nachladen
+        log.warning("Batch-Update abgebrochen: %r", e)
+        update_one = _isolated(lambda t: update_history(t, force=force))
+        for ticker in stale:
+            histories[ticker] = update_one(ticker)
+
+    available = [
+        t for t in tickers
+        if histories.get(t) is not None or price_store.has_history(t)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(perf.bind(_isolated(lambda t: fetch_fundamentals(t, force=force))), available))
+        list(pool.map(perf.bind(_isolated(lambda t: fetch_earnings_info(t, force=force))), available))
+
+    available = set(available)
+    return [t for t in tickers if t not in available]
+
+
+def refresh_histories(tickers, max_workers=PREFETCH_WORKERS):
+    """
+    Nur die Kurshistorien der Ticker neu holen (auch innerhalb des Handelstags),
+    Fundamentals/Earnings bleiben unberührt. Für den adaptiven Scheduler.
+    Während des Handels ändert sich bei frischen Historien nur der vorläufige
+    Bar – der kommt gebündelt ins Live-Overlay (live_quotes), der Speicher
+    bleibt, wie er ist. Liefert {ticker: Historie oder None}.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    missing = [t for t in tickers if not price_store.has_history(t)]
+    provider = guarded_provider()
+    intraday = [
+        t for t in tickers
+        if t not in set(missing) and provider.session_day(t) is not None and price_store.is_fresh(t)
+    ]
+    stored = [t for t in tickers if t not in set(missing) | set(intraday)]
+
+    histories = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for ticker, data in zip(missing, pool.map(perf.bind(_isolated(update_history)), missing)):
+            histories[ticker] = data
+    histories.update(_batch_update_histories(stored, force=True))
+
+    if intraday:
+        for ticker in live_quotes.refresh_quotes(intraday):
+            price_store.touch_history(ticker)  # nicht bei jedem Tick erneut fällig
+        for ticker in intraday:
+            histories[ticker] = price_store.load_history(ticker)
+    return histories
+
+
+# -------------------------------------------------------------------
+# Liquiditäts-Vorfilter (vor Download & Analyse)
+# -------------------------------------------------------------------
+#
+# Zombie-/Untradable-Werte werden aussortiert, bevor für sie eine komplette
+# Historie, Fundamentals und Earnings geladen werden. Grundlage sind frische
+# gespeicherte Historien bzw. für unbekannte oder veraltete Ticker ein
+# gebündelter Abruf der letzten Wochen (provider.quotes). Dieselben Regeln
+# nutzt analyze_ticker.
+
+ZOMBIE_MIN_PRICE = 0.5
+ZOMBIE_MIN_HIGH_52W = 1.0
+ZOMBIE_MIN_VOLUME = 100_000
+
+# Letzter Bar älter → Handel ausgesetzt / delistet
+UNTRADABLE_STALE_DAYS = 10
+
+SCREEN_CACHE = {}
+SCREEN_MAX_AGE = 24 * 60 * 60
+SCREEN_BATCH_SIZE = 200
+
+
+def liquidity_check(price, high_52w, avg_volume_20d, last_bar=None):
+    """
+    (is_zombie, is_untradable, Gründe). high_52w=None überspringt die
+    52W-Regel (z.B. wenn nur wenige Wochen Kursdaten vorliegen).
+    """
+    reasons = []
+    is_zombie = False
+    if price is not None and price < ZOMBIE_MIN_PRICE:
+        is_zombie = True
+        reasons.append("Kurs < 0,50")
+    if high_52w is not None and high_52w < ZOMBIE_MIN_HIGH_52W:
+        is_zombie = True
+        reasons.append("52W-High < 1,00")
+    if avg_volume_20d is not None and avg_volume_20d < ZOMBIE_MIN_VOLUME:
+        is_zombie = True
+        reasons.append("∅ Volumen 20d < 100k")
+
+    is_untradable = False
+    if last_bar is not None:
+        stale_days = (guarded_provider().today() - last_bar).days
+        if stale_days > UNTRADABLE_STALE_DAYS:
+            is_untradable = True
+            reasons.append(f"kein Kurs seit {stale_days} Tagen")
+    if avg_volume_20d is not None and avg_volume_20d == 0:
+        is_untradable = True
+        reasons.append("kein Umsatz in 20 Tagen")
+    return is_zombie, is_untradable, reasons
+
+
+def _screen_record(bars, full_history, check_last_bar=True):
+    """
+    Vorfilter-Ergebnis aus Daily-Bars (full_history: mind. ein Jahr vorhanden).
+    check_last_bar=False überspringt die Alters-Regel (veralteter Speicherstand
+    sagt nichts darüber, ob der Wert noch gehandelt wird).
+    """
+    if bars is not None and "Close" in bars:
+        bars = bars.dropna(subset=["Close"])
+    if bars is None or bars.empty:
+        return {"is_zombie": False, "is_untradable": True, "reason": "keine Kursdaten"}
+
+    closes = bars["Close"]
+    price = float(closes.iloc[-1])
+    high_52w = float(price_store.slice_period(bars, "1y")["Close"].max()) if full_history else None
+    avg_volume_20d = float(bars["Volume"].tail(20).mean()) if "Volume" in bars else None
+    last_bar = bars.index[-1].date()
+
+    is_zombie, is_untradable, reasons = liquidity_check(
+        price, high_52w, avg_volume_20d, last_bar if check_last_bar else None
+    )
+    return {
+        "price": price,
+        "high_52w": high_52w,
+        "avg_volume_20d": avg_volume_20d,
+        "last_bar": last_bar.isoformat(),
+        "is_zombie": is_zombie,
+        "is_untradable": is_untradable,
+        "reason": "; ".join(reasons) if reasons else None,
+    }
+
+
+def screen_universe(tickers, force=False):
+    """
+    Vorfilter für viele Ticker → {ticker: Ergebnis} (siehe _screen_record).
+    - frische gespeicherte Historie → ohne Netzwerk
+    - sonst                         → provider.quotes in Batches von SCREEN_BATCH_SIZE
+    Schlägt ein Batch fehl, werden dessen Ticker mit veralteter Historie
+    nur nach Kurs/Volumen geprüft (ohne Alters-Regel, nicht gecacht), alle
+    anderen bleiben ungeprüft (kein Eintrag).
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    screened, unknown, outdated = {}, [], {}
+    for ticker in tickers:
+        if not force:
+            cached = _cache_lookup(SCREEN_CACHE, "screen", ticker, SCREEN_MAX_AGE)
+            if cached is not None:
+                screened[ticker] = cached
+                continue
+        if not price_store.has_history(ticker):
+            unknown.append(ticker)
+            continue
+
+        panel = price_panel.active_panel()
+        if panel is not None and ticker in panel:
+            bars = panel.history(ticker, "1y")
+        else:
+            bars = price_store.slice_period(price_store.load_history(ticker), "1y")
+        if price_store.is_fresh(ticker):
+            # frischer Stand genügt – kein Nachladen für den Vorfilter
+            screened[ticker] = _screen_record(bars, full_history=True)
+            _cache_store(SCREEN_CACHE, "screen", ticker, screened[ticker])
+        else:
+            # Alter des Speichers ≠ Alter des Markts → aktuelle Bars abfragen
+            outdated[ticker] = bars
+            unknown.append(ticker)
+
+    for i in range(0, len(unknown), SCREEN_BATCH_SIZE):
+        chunk = unknown[i:i + SCREEN_BATCH_SIZE]
+        try:
+            data = guarded_provider().quotes(chunk)
+        except Exception:
+            data = None
+        failed = data is None or data.empty
+        for ticker in chunk:
+            if failed:
+                bars = None
+            elif isinstance(data.columns, pd.MultiIndex):
+                present = ticker in data.columns.get_level_values(0)
+                bars = data[ticker] if present else None
+            else:
+                bars = data if len(chunk) == 1 else None
+
+            if bars is None or bars.dropna(how="all").empty:
+                if ticker in outdated:
+                    # gespeicherter Stand ohne Alters-Regel, nicht gecacht
+                    screened[ticker] = _screen_record(
+                        outdated[ticker], full_history=True, check_last_bar=False
+                    )
+                    continue
+                if failed:
+                    continue  # Batch fehlgeschlagen → ungeprüft
+            screened[ticker] = _screen_record(bars, full_history=False)
+            # "keine Kursdaten" evtl. nur ein Aussetzer im Batch → nicht cachen
+            if screened[ticker].get("last_bar"):
+                _cache_store(SCREEN_CACHE, "screen", ticker, screened[ticker])
+    return screened
+
+
+def screen_reason(record):
+    """Grund für das Aussortieren (None = handelbar bzw. nicht geprüft)."""
+    if record and (record.get("is_zombie") or record.get("is_untradable")):
+        return record.get("reason") or "illiquide"
+    return None
+
+
+def screen_tickers(tickers, keep=(), force=False):
+    """
+    Ticker ohne Zombie-/Untradable-Werte; keep (z.B. Portfolio) bleibt immer drin.
+    Liefert (Ticker, {aussortierter Ticker: Grund}).
+    """
+    keep = {t.upper() for t in keep if t}
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    screened = screen_universe([t for t in tickers if t not in keep], force=force)
+    dropped = {}
+    for ticker, record in screened.items():
+        reason = screen_reason(record)
+        if reason:
+            dropped[ticker] = reason
+    return [t for t in tickers if t not in dropped], dropped
+
+
 def moving_average(series, window):
     if len(series) < window:
         return None
     return float(series[-window:].mean())
 
 
-def summarize_trades(trades):
-    """Gesamtstückzahl und gewichteten Durchschnittskurs berechnen."""
-    if not trades:
-        return 0, None
-    total_shares = sum(t["shares"] for t in trades)
-    if total_shares == 0:
-        return 0, None
-    volume = sum(t["shares"] * t["price"] for t in trades)
-    avg_price = volume / total_shares
-    return total_shares, avg_price
+def summarize_trades(trades, method=lot_ledger.DEFAULT_COST_METHOD):
+    """
+    Offene Stückzahl und Einstand der offenen Lots (FIFO bzw. Durchschnitt).
+    Nach Teilverkäufen zählen nur noch die verbliebenen Lots.
+    """
+    position = lot_ledger.summarize(trades, method)
+    return position["shares"], position["cost_basis"]
 
 
 def detect_wave_stock(hist, ma_window=50):
@@ -138,6 +630,17 @@ def classify_portfolio_position(price, buy_price, targets):
     return f"Ziel {len(reached_levels)} erreicht (+{change_pct:.1f}%)", next_target, change_pct
 
 
+def classify_vs_ref(price, ref_price, thresholds):
+    if price is None or ref_price is None or not thresholds:
+        return None
+    change_pct_ref = (price - ref_price) / ref_price * 100
+    if change_pct_ref >= thresholds["run_up_pct"]:
+        return f"RUN vs Ref (+{change_pct_ref:.1f}%)"
+    if change_pct_ref <= thresholds["dip_pct"]:
+        return f"DIP vs Ref ({change_pct_ref:.1f}%)"
+    return f"neutral vs Ref ({change_pct_ref:+.1f}%)"
+
+
 def wave_signal(price, closes, up_pct, down_pct, window=20):
     """
     Wellenlogik mit dynamischen Schwellwerten.
@@ -204,15 +707,19 @@ def compute_ladder_targets(buy_price, tp_level_est, reentry_level_est):
 # Fundamentals & Events
 # -------------------------------------------------------------------
 
-def fetch_fundamentals(ticker):
+@perf.timed("fetch_fundamentals", ticker_arg="ticker")
+@coalesce("fundamentals", "ticker", "force")
+def fetch_fundamentals(ticker, force=False):
     """
     Holt grobe Fundamentals (Jahreszahlen) und berechnet:
     - rev_growth_1y (%)
     - net_margin (%)
     - debt_to_assets (Quote 0–1+)
     """
-    if ticker in FUND_CACHE:
-        return FUND_CACHE[ticker]
+    if not force:
+        cached = _cache_lookup(FUND_CACHE, "fundamentals", ticker, FUND_MAX_AGE)
+        if cached is not None:
+            return cached
 
     result = {
         "rev_growth_1y": None,
@@ -221,8 +728,8 @@ def fetch_fundamentals(ticker):
     }
 
     try:
-        t = yf.Ticker(ticker)
-        fin = t.financials
+        provider = guarded_provider()
+        fin = provider.financials(ticker)
         if fin is not None and not fin.empty:
             if "Total Revenue" in fin.index:
                 rev = fin.loc["Total Revenue"]
@@ -245,46 +752,53 @@ def fetch_fundamentals(ticker):
                 if r0 != 0:
                     result["net_margin"] = n0 / r0 * 100.0
 
-        bs = t.balance_sheet
+        bs = provider.balance_sheet(ticker)
         if bs is not None and not bs.empty:
             if "Total Liab" in bs.index and "Total Assets" in bs.index:
                 liab = float(bs.loc["Total Liab"].iloc[0])
                 assets = float(bs.loc["Total Assets"].iloc[0])
                 if assets != 0:
                     result["debt_to_assets"] = liab / assets
-    except Exception:
-        # bewusst ruhig: wir wollen nur "None" zurück
-        pass
+    except Exception as e:
+        # bewusst ruhig: wir wollen nur "None" zurück – Provider-Fehler aber
+        # nicht für eine Woche festschreiben (Retry regelt der Negativ-Cache)
+        if is_provider_failure(e, ticker, "fundamentals"):
+            return _last_known(FUND_CACHE, "fundamentals", ticker, result)
 
-    FUND_CACHE[ticker] = result
+    _cache_store(FUND_CACHE, "fundamentals", ticker, result)
     return result
 
 
-def fetch_earnings_info(ticker):
+@perf.timed("fetch_earnings_info", ticker_arg="ticker")
+@coalesce("earnings", "ticker", "force")
+def fetch_earnings_info(ticker, force=False):
     """
     Liefert Tage bis zum nächsten Earnings-Termin (falls verfügbar).
     days_to_earnings:
       >0 = in Zukunft
       <0 = liegt in der Vergangenheit
     """
-    if ticker in EARNINGS_CACHE:
-        return EARNINGS_CACHE[ticker]
+    if not force:
+        cached = _cache_lookup(EARNINGS_CACHE, "earnings", ticker, EARNINGS_MAX_AGE)
+        if cached is not None:
+            return cached
 
     result = {"days_to_earnings": None}
 
     try:
-        t = yf.Ticker(ticker)
-        cal = t.calendar
+        provider = guarded_provider()
+        cal = provider.calendar(ticker)
         if cal is not None and not cal.empty and "Earnings Date" in cal.index:
             edate = cal.loc["Earnings Date"].iloc[0]
             if isinstance(edate, (pd.Timestamp, datetime)):
-                today = datetime.utcnow().date()
+                today = provider.today()
                 d = (edate.date() - today).days
                 result["days_to_earnings"] = int(d)
-    except Exception:
-        pass
+    except Exception as e:
+        if is_provider_failure(e, ticker, "earnings"):
+            return _last_known(EARNINGS_CACHE, "earnings", ticker, result)
 
-    EARNINGS_CACHE[ticker] = result
+    _cache_store(EARNINGS_CACHE, "earnings", ticker, result)
     return result
 
 
@@ -292,7 +806,9 @@ def fetch_earnings_info(ticker):
 # Makro-Kontext
 # -------------------------------------------------------------------
 
-def compute_macro_context():
+@perf.timed("compute_macro_context")
+@coalesce("macro", "force")
+def compute_macro_context(force=False):
     """
     Grober Makro-Kontext auf Basis des S&P 500 (^GSPC).
     Liefert:
@@ -300,17 +816,17 @@ def compute_macro_context():
       - chg20_spy: 20-Tage-Performance (%)
       - regime   : 'bull', 'normal', 'correction', 'crash', 'unknown'
     """
-    global MACRO_CACHE
-    if MACRO_CACHE is not None:
-        return MACRO_CACHE
+    if not force:
+        cached = _cache_lookup(MACRO_CACHE, "macro", "^GSPC", None)
+        if cached is not None:
+            return cached
 
     ctx = {"dd_spy": None, "chg20_spy": None, "regime": "unknown"}
 
     try:
-        data = yf.download("^GSPC", period="1y", interval="1d", progress=False)
+        data = guarded_provider().history("^GSPC", period="1y")
         closes = data["Close"].dropna()
         if closes.empty:
-            MACRO_CACHE = ctx
             return ctx
 
         price = float(closes.iloc[-1])
@@ -334,16 +850,27 @@ def compute_macro_context():
 
         ctx = {"dd_spy": dd, "chg20_spy": chg20, "regime": regime}
     except Exception:
-        ctx = {"dd_spy": None, "chg20_spy": None, "regime": "unknown"}
+        # Fehlschläge nicht cachen – erneute Versuche drosselt fetch_guard (Backoff)
+        return {"dd_spy": None, "chg20_spy": None, "regime": "unknown"}
 
-    MACRO_CACHE = ctx
+    _cache_store(MACRO_CACHE, "macro", "^GSPC", ctx)
     return ctx
 
 
+def clear_macro_cache():
+    """In-Memory-Makro verwerfen → nächster Aufruf liest den geteilten Cache neu."""
+    MACRO_CACHE.clear()
+
+
 # -------------------------------------------------------------------
 # Analyse eines einzelnen Tickes
 # -------------------------------------------------------------------
 
+# Schlusskurse, die eine Analyse für apply_quote mitführt
+# (20er-Wellenfenster + Kurs vor 20 Tagen)
+RECENT_CLOSES = 21
+
+@perf.timed("analyze_ticker", ticker_arg="ticker")
 def analyze_ticker(name, ticker, buy_price=None, targets=None,
                    ref_price=None, thresholds=None):
     """Zentrale Analysefunktion für einen Ticker."""
@@ -371,11 +898,21 @@ def analyze_ticker(name, ticker, buy_price=None, targets=None,
             "wave_reentry_level": None,
             "targets": targets or [],
             "targets_reached": 0,
+            "buy_price": buy_price,
+            "ref_price": ref_price,
+            "last_bar": None,
+            "recent_closes": [],
+            "ma50": None,
+            "ma200": None,
+            "high_52w": None,
+            "low_52w": None,
             "drawdown_52w": None,
             "change_20d_pct": None,
             "change_3d_pct": None,
             "avg_volume_20d": None,
             "is_viable": True,
+            "is_zombie": False,
+            "is_untradable": False,
             "quality_note": None,
             "fundamentals": {"rev_growth_1y": None, "net_margin": None, "debt_to_assets": None},
             "days_to_earnings": None,
@@ -419,22 +956,10 @@ def analyze_ticker(name, ticker, buy_price=None, targets=None,
     if "Volume" in hist.columns:
         avg_volume_20d = float(hist["Volume"].tail(20).mean())
 
-    is_zombie = False
-    zombie_reasons = []
-
-    if price is not None:
-        if price < 0.5:
-            is_zombie = True
-            zombie_reasons.append("Kurs < 0,50")
-        if high_52w < 1.0:
-            is_zombie = True
-            zombie_reasons.append("52W-High < 1,00")
-
-    if avg_volume_20d is not None and avg_volume_20d < 100_000:
-        is_zombie = True
-        zombie_reasons.append("∅ Volumen 20d < 100k")
-
-    quality_note = "; ".join(zombie_reasons) if is_zombie else None
+    is_zombie, is_untradable, zombie_reasons = liquidity_check(
+        price, high_52w, avg_volume_20d, hist.index[-1].date()
+    )
+    quality_note = "; ".join(zombie_reasons) if zombie_reasons else None
 
     trend = classify_trend(price, ma50, ma200)
     stage_52w = classify_52w_stage(price, high_52w, low_52w)
@@ -462,23 +987,19 @@ def analyze_ticker(name, ticker, buy_price=None, targets=None,
     if buy_price is not None and ladder_targets:
         status_vs_buy, next_target, pl_pct = classify_portfolio_position(price, buy_price, ladder_targets)
 
-    status_vs_ref = None
-    if ref_price is not None and thresholds:
-        change_pct_ref = (price - ref_price) / ref_price * 100
-        if change_pct_ref >= thresholds["run_up_pct"]:
-            status_vs_ref = f"RUN vs Ref (+{change_pct_ref:.1f}%)"
-        elif change_pct_ref <= thresholds["dip_pct"]:
-            status_vs_ref = f"DIP vs Ref ({change_pct_ref:.1f}%)"
-        else:
-            status_vs_ref = f"neutral vs Ref ({change_pct_ref:+.1f}%)"
+    status_vs_ref = classify_vs_ref(price, ref_price, thresholds)
 
     targets_reached = 0
     if ladder_targets and price is not None:
         targets_reached = sum(1 for t in ladder_targets if price >= t)
 
-    fundamentals = fetch_fundamentals(ticker)
-    earnings_info = fetch_earnings_info(ticker)
-    days_to_earnings = earnings_info.get("days_to_earnings")
+    if (is_zombie or is_untradable) and buy_price is None:
+        # wird ohnehin nicht gescort → keine Fundamentals/Earnings laden
+        fundamentals = {"rev_growth_1y": None, "net_margin": None, "debt_to_assets": None}
+        days_to_earnings = None
+    else:
+        fundamentals = fetch_fundamentals(ticker)
+        days_to_earnings = fetch_earnings_info(ticker).get("days_to_earnings")
 
     return {
         "name": name,
@@ -502,17 +1023,95 @@ def analyze_ticker(name, ticker, buy_price=None, targets=None,
         "wave_reentry_level": reentry_level,
         "targets": ladder_targets,
         "targets_reached": targets_reached,
+        # Stand für apply_quote (Live-Kurse ohne Historie neu bewerten)
+        "buy_price": buy_price,
+        "ref_price": ref_price,
+        "last_bar": hist.index[-1].strftime("%Y-%m-%d"),
+        "recent_closes": [float(c) for c in closes.iloc[-RECENT_CLOSES:]],
+        "ma50": ma50,
+        "ma200": ma200,
+        "high_52w": high_52w,
+        "low_52w": low_52w,
         "drawdown_52w": drawdown_52w,
         "change_20d_pct": change_20d_pct,
         "change_3d_pct": change_3d_pct,
         "avg_volume_20d": avg_volume_20d,
-        "is_viable": not is_zombie,
+        "is_viable": not (is_zombie or is_untradable),
+        "is_zombie": is_zombie,
+        "is_untradable": is_untradable,
         "quality_note": quality_note,
         "fundamentals": fundamentals,
         "days_to_earnings": days_to_earnings,
     }
 
 
+def apply_quote(analysis, quote, thresholds=None):
+    """
+    Analyse mit einem Live-Kurs (vorläufiger letzter Bar, siehe live_quotes)
+    aktualisieren, ohne die Historie zu laden: neu berechnet werden nur die
+    kursabhängigen Felder – P/L & erreichte Ladder-Ziele, Wellen-Zone,
+    Momentum, 52W-Stage, Trend. Ladder-Ziele und Volatilität bleiben.
+    Gleicher Tag wie der letzte Bar → ersetzen, neuer Tag → anhängen.
+    """
+    closes = analysis.get("recent_closes")
+    if not quote or quote.get("Close") is None or analysis.get("price") is None or not closes:
+        return analysis
+    if quote["date"] < analysis["last_bar"]:
+        return analysis
+
+    price = float(quote["Close"])
+    if quote["date"] == analysis["last_bar"]:
+        window = closes[:-1] + [price]
+    else:
+        window = closes[1:] + [price] if len(closes) >= RECENT_CLOSES else closes + [price]
+
+    high_52w = max(analysis["high_52w"], price)
+    low_52w = min(analysis["low_52w"], price)
+    price_20d_ago = window[-21] if len(window) > 20 else None
+    price_3d_ago = window[-4] if len(window) > 3 else None
+
+    updated = dict(analysis)
+    updated.update({
+        "price": price,
+        "provisional": True,
+        "quote_date": quote["date"],
+        "last_bar": quote["date"],
+        "recent_closes": window,
+        "high_52w": high_52w,
+        "low_52w": low_52w,
+        "trend": classify_trend(price, analysis.get("ma50"), analysis.get("ma200")),
+        "stage_52w": classify_52w_stage(price, high_52w, low_52w),
+        "drawdown_52w": (price - high_52w) / high_52w * 100 if high_52w else None,
+        "change_20d_pct": (price - price_20d_ago) / price_20d_ago * 100 if price_20d_ago else None,
+        "change_3d_pct": (price - price_3d_ago) / price_3d_ago * 100 if price_3d_ago else None,
+        "status_vs_ref": classify_vs_ref(price, analysis.get("ref_price"), thresholds),
+    })
+    if thresholds:
+        updated["momentum_20d"] = classify_momentum(price, price_20d_ago, thresholds)
+
+    if analysis.get("is_wave"):
+        up_pct, down_pct = wave_params_from_vol(analysis.get("avg_range_pct"))
+        label, swing_low, swing_high, tp_level, reentry_level = wave_signal(
+            price, pd.Series(window), up_pct, down_pct
+        )
+        updated.update({
+            "wave": label,
+            "wave_swing_low": swing_low,
+            "wave_swing_high": swing_high,
+            "wave_tp_level": tp_level,
+            "wave_reentry_level": reentry_level,
+        })
+
+    targets = analysis.get("targets") or []
+    buy_price = analysis.get("buy_price")
+    if buy_price is not None and targets:
+        updated["status_vs_buy"], updated["next_target"], updated["pl_pct"] = (
+            classify_portfolio_position(price, buy_price, targets)
+        )
+    updated["targets_reached"] = sum(1 for t in targets if price >= t)
+    return updated
+
+
 # -------------------------------------------------------------------
 # Entscheidungslogik: Portfolio-Aktionen
 # -------------------------------------------------------------------
@@ -618,6 +1217,7 @@ def _clamp(x, lo, hi):
     return max(lo, min(hi, x))
 
 
+@perf.timed("score_dual_candidate", ticker_arg="analysis")
 def score_dual_candidate(analysis, thresholds, macro=None):
     """
     Liefert zwei weiche Scores (0–100):
@@ -810,53 +1410,177 @@ def score_watchlist_candidate(analysis, thresholds, macro=None):
     return sts
 
 
+def is_reversal_candidate(analysis, thresholds):
+    """
+    Entscheidet, ob eine Aktie ein Reversal-Kandidat ist.
+    """
+    dd = analysis.get("dd_52w")
+    stage = analysis.get("stage_52w", "")
+    wave = analysis.get("wave", "")
+
+    if dd is None:
+        return False
+
+    min_dd = thresholds.get("reversal_dd_min", -30)
+
+    if dd <= min_dd and ("Korrektur" in stage or "Re-Entry" in wave or "DIP" in wave):
+        return True
+
+    return False
+
+
+# -------------------------------------------------------------------
+# AI Universe Radar – Zeilen berechnen
+# -------------------------------------------------------------------
+
+def build_radar_row(entry, analysis, thresholds, macro):
+    """Eine Radar-Zeile (inkl. STS/LAS & Ampel) aus einer Analyse bauen."""
+    sts, las = score_dual_candidate(analysis, thresholds, macro)
+
+    if sts >= 65 or las >= 60:
+        ampel = "🟢 Kauf-Zone"
+    elif sts >= 50 or las >= 50:
+        ampel = "🟡 Watchlist / opportunistisch"
+    else:
+        ampel = "🔴 Kein Kauf / nur beobachten"
+
+    fund = analysis.get("fundamentals") or {}
+    reversal_flag = is_reversal_candidate(analysis, thresholds)
+    dd_52w = analysis.get("dd_52w")
+
+    return {
+        "Name": analysis["name"],
+        "Ticker": analysis["ticker"],
+        "WKN": entry.get("wkn", "—"),
+        "Kategorie": entry.get("category", ""),
+        "AGI-Exposure (1–10)": entry.get("exposure", ""),
+        "STS (Short-Term)": sts,
+        "LAS (Long-Term AGI)": las,
+        "Ampel": ampel,
+        "Setup": "🔁 Reversal" if reversal_flag else "—",
+        "Kurs": round(analysis["price"], 2) if analysis["price"] else None,
+        "Trend": analysis["trend"],
+        "Momentum 20d": analysis["momentum_20d"],
+        "52W-Stage": analysis["stage_52w"],
+        "Drawdown 52W (%)": round(dd_52w, 1) if dd_52w is not None else None,
+        "Umsatzwachstum 1Y (%)": round(fund["rev_growth_1y"], 1)
+        if fund.get("rev_growth_1y") is not None
+        else None,
+        "Nettomarge (%)": round(fund["net_margin"], 1)
+        if fund.get("net_margin") is not None
+        else None,
+        "Debt/Assets": round(fund["debt_to_assets"], 2)
+        if fund.get("debt_to_assets") is not None
+        else None,
+        "Wave-Signal": analysis["wave"],
+        "TP-Level": round(analysis["wave_tp_level"], 2)
+        if analysis.get("wave_tp_level")
+        else None,
+        "Re-Entry-Level": round(analysis["wave_reentry_level"], 2)
+        if analysis.get("wave_reentry_level")
+        else None,
+    }
+
+
+@perf.timed("build_radar_rows")
+def build_radar_rows(universe, thresholds, macro, analyses=None):
+    """
+    Alle Universe-Werte analysieren und als Radar-Zeilen zurückgeben.
+    analyses (optional, dict) nimmt pro Ticker die Analyse ohne Historie auf
+    (Grundlage für apply_live_quotes).
+    """
+    # Vorfilter: aussortierte Werte gar nicht erst laden & analysieren
+    screened = screen_universe([e["ticker"] for e in universe if e.get("ticker")])
+
+    rows = []
+    for entry in universe:
+        if screen_reason(screened.get((entry.get("ticker") or "").upper())):
+            continue
+        analysis = analyze_ticker(
+            name=entry["name"],
+            ticker=entry["ticker"],
+            thresholds=thresholds,
+        )
+
+        # Unhandlbare / tote Werte überspringen
+        if (
+            analysis["price"] is None
+            or analysis.get("is_zombie")
+            or analysis.get("is_untradable")
+        ):
+            continue
+
+        rows.append(build_radar_row(entry, analysis, thresholds, macro))
+        if analyses is not None:
+            analyses[analysis["ticker"].upper()] = {**analysis, "history": None}
+
+    return rows
+
+
 # -------------------------------------------------------------------
 # Portfolio-Übersicht  ✅ HIER IST DIE KORRIGIERTE FUNKTION
 # -------------------------------------------------------------------
 
+def build_portfolio_row(analysis, total_shares):
+    """Eine Portfolio-Tabellenzeile (aktueller Kurs & Werte) aus einer Analyse."""
+    avg_price = analysis.get("buy_price")
+    kurs = analysis["price"] or 0.0
+    wert = (total_shares or 0) * kurs
+
+    return {
+        "Name": analysis["name"],
+        "Ticker": analysis["ticker"],
+        "Stücke": total_shares,
+        "Einstand (EK)": round(avg_price, 2) if avg_price else None,
+
+        # WICHTIG: diese Keys werden im UI benutzt
+        "Aktueller Kurs": round(kurs, 2) if kurs else None,
+        "Kurs": round(kurs, 2) if kurs else None,
+        "Wert gesamt": round(wert, 2) if wert else None,
+
+        "P/L %": round(analysis["pl_pct"], 1) if analysis["pl_pct"] is not None else None,
+        "Realisiert": round(analysis["realized_pl"], 2) if analysis.get("realized_pl") else None,
+        "Trend": analysis["trend"],
+        "Wave": "✅" if analysis["is_wave"] else "❌",
+        "Signal": analysis["wave"],
+    }
+
+
+def analyze_position(pos, thresholds, position=None):
+    """
+    Eine Portfolio-Position analysieren → (analysis, Stückzahl, Einstand).
+    position: Lot-Stand aus lot_ledger (sonst aus den Trades der Position).
+    """
+    if position is None:
+        position = lot_ledger.summarize(pos.get("trades", []))
+    total_shares, avg_price = position["shares"], position["cost_basis"]
+    analysis = analyze_ticker(
+        name=pos["name"],
+        ticker=pos["ticker"],
+        buy_price=avg_price,
+        thresholds=thresholds,
+    )
+    analysis["realized_pl"] = position["realized"]
+    return analysis, total_shares, avg_price
+
+
+@perf.timed("build_portfolio_overview")
 def build_portfolio_overview(cfg, thresholds):
-    """Portfolio-Analysen und Tabellenzeilen berechnen."""
+    """Portfolio-Analysen und Tabellenzeilen berechnen (Stücke & Einstand aus dem Lot-Buch)."""
     portfolio = cfg.get("portfolio", [])
+    positions = lot_ledger.positions_for(cfg)
     analyses_portfolio = {}
     rows = []
     gesamt_wert = 0.0
     gesamt_einsatz = 0.0
 
     for pos in portfolio:
-        trades = pos.get("trades", [])
-        total_shares, avg_price = summarize_trades(trades)
-
-        analysis = analyze_ticker(
-            name=pos["name"],
-            ticker=pos["ticker"],
-            buy_price=avg_price,
-            thresholds=thresholds,
-        )
+        position = positions.get(pos["ticker"].upper())
+        analysis, total_shares, avg_price = analyze_position(pos, thresholds, position)
         analyses_portfolio[pos["ticker"].upper()] = (analysis, total_shares)
 
-        # aktueller Kurs & Werte
-        kurs = analysis["price"] or 0.0
-        wert = (total_shares or 0) * kurs
-        einsatz = (total_shares or 0) * (avg_price or 0)
-
-        gesamt_wert += wert
-        gesamt_einsatz += einsatz
-
-        rows.append({
-            "Name": analysis["name"],
-            "Ticker": analysis["ticker"],
-            "Stücke": total_shares,
-            "Einstand (EK)": round(avg_price, 2) if avg_price else None,
-
-            # WICHTIG: diese Keys werden im UI benutzt
-            "Aktueller Kurs": round(kurs, 2) if kurs else None,
-            "Kurs": round(kurs, 2) if kurs else None,
-            "Wert gesamt": round(wert, 2) if wert else None,
-
-            "P/L %": round(analysis["pl_pct"], 1) if analysis["pl_pct"] is not None else None,
-            "Trend": analysis["trend"],
-            "Wave": "✅" if analysis["is_wave"] else "❌",
-            "Signal": analysis["wave"],
-        })
+        gesamt_wert += (total_shares or 0) * (analysis["price"] or 0.0)
+        gesamt_einsatz += (total_shares or 0) * (avg_price or 0)
+        rows.append(build_portfolio_row(analysis, total_shares))
 
     return portfolio, analyses_portfolio, rows, gesamt_wert, gesamt_einsatz
\ No newline at end of file
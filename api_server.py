@@ -0,0 +1,261 @@
+"""
+Lokale JSON-HTTP-API auf Basis des geteilten Caches / Analyse-Snapshots.
+
+    python api_server.py                     # http://127.0.0.1:8765
+    python api_server.py --host 0.0.0.0      # auch für Handy im LAN
+
+Endpunkte (alle GET):
+    /api/health            Snapshot-Stand
+    /api/radar?sort=sts|las&limit=N
+    /api/portfolio
+    /api/ticker/<TICKER>
+    /api/macro
+    /api/ladder
+
+Jede Antwort trägt ein ETag; mit If-None-Match antwortet der Server 304,
+ohne den Body neu zu bauen. Gerechnet wird nie pro Request – Grundlage ist
+immer der zuletzt geschriebene Snapshot (Cache-Warmer, Batch-CLI oder APP).
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import price_panel
+from config_utils import CONFIG_PATH, load_ai_universe, load_config
+from analysis_core import set_read_only
+from ladder_engine import compute_daily_ladder_actions
+from snapshot import latest_context, snapshot_age
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Fertige Antworten pro (Route, Datenstand): key -> (etag, body)
+_RESPONSES = {}
+_RESPONSES_LOCK = threading.Lock()
+_RESPONSES_MAX = 512
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _clean(obj):
+    """NaN/Inf → None, Tupel → Listen (striktes JSON für alle Clients)."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    return obj
+
+
+def _encode(payload):
+    body = json.dumps(_clean(payload), ensure_ascii=False, default=str).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return etag, body
+
+
+def _config_mtime():
+    try:
+        return CONFIG_PATH.stat().st_mtime
+    except OSError:
+        return None
+
+
+# -------------------------------------------------------------------
+# Routen
+# -------------------------------------------------------------------
+
+def _require_context():
+    ctx = latest_context()
+    if ctx is None:
+        raise ApiError(503, "Noch kein Analyse-Snapshot vorhanden – Cache-Warmer oder APP einmal laufen lassen.")
+    return ctx
+
+
+def route_health(ctx, _query):
+    return {
+        "created_at": ctx["created_at"],
+        "age_s": round(snapshot_age(ctx), 1),
+        "radar_rows": len(ctx["radar_rows"]),
+        "portfolio_rows": len(ctx["portfolio_rows"]),
+    }
+
+
+def route_radar(ctx, query):
+    sort = (query.get("sort", ["sts"])[0] or "sts").lower()
+    key = "LAS (Long-Term AGI)" if sort == "las" else "STS (Short-Term)"
+    rows = sorted(ctx["radar_rows"], key=lambda r: r.get(key) or 0.0, reverse=True)
+
+    limit = query.get("limit", [None])[0]
+    if limit:
+        try:
+            rows = rows[: max(0, int(limit))]
+        except ValueError:
+            raise ApiError(400, "limit muss eine Zahl sein")
+
+    return {"created_at": ctx["created_at"], "sort": sort, "rows": rows}
+
+
+def route_portfolio(ctx, _query):
+    rows = []
+    for row in ctx["portfolio_rows"]:
+        sts, las = ctx["scores"].get(row["Ticker"].upper(), (None, None))
+        rows.append({**row, "STS (Short-Term)": sts, "LAS (Long-Term AGI)": las})
+    return {
+        "created_at": ctx["created_at"],
+        "gesamt_wert": ctx["gesamt_wert"],
+        "gesamt_einsatz": ctx["gesamt_einsatz"],
+        "rows": rows,
+    }
+
+
+def route_macro(ctx, _query):
+    return {"created_at": ctx["created_at"], **ctx["macro"]}
+
+
+def route_ladder(ctx, _query):
+    ladder_progress = load_config().get("ladder_progress", {})
+    return {
+        "created_at": ctx["created_at"],
+        "actions": compute_daily_ladder_actions(ctx["portfolio_rows"], ladder_progress),
+    }
+
+
+def route_ticker(ctx, _query, ticker):
+    ticker = ticker.upper()
+    found = ctx["portfolio_analyses"].get(ticker)
+    if found is not None:
+        analysis, total_shares = found
+        return {"created_at": ctx["created_at"], "total_shares": total_shares, "analysis": analysis}
+
+    # Universe-Werte nur aus dem Snapshot – nie pro Request rechnen oder laden
+    analysis = (ctx.get("radar_analyses") or {}).get(ticker)
+    if analysis is not None:
+        return {"created_at": ctx["created_at"], "total_shares": 0, "analysis": analysis}
+
+    in_universe = any(
+        (e.get("ticker") or "").upper() == ticker for e in load_ai_universe().get("ai_universe", [])
+    )
+    if in_universe:
+        raise ApiError(503, f"Ticker {ticker} ist noch nicht im Analyse-Snapshot")
+    raise ApiError(404, f"Ticker {ticker} weder im Portfolio noch im AI-Universe")
+
+
+ROUTES = {
+    "health": route_health,
+    "radar": route_radar,
+    "portfolio": route_portfolio,
+    "macro": route_macro,
+    "ladder": route_ladder,
+}
+
+
+def resolve(path, query):
+    """(etag, body) für einen Request – gebaut nur einmal pro Datenstand."""
+    parts = [p for p in path.split("/") if p]
+    if len(parts) < 2 or parts[0] != "api":
+        raise ApiError(404, "unbekannter Pfad")
+
+    ctx = _require_context()
+    name = parts[1]
+    # Ladder hängt zusätzlich am Fortschritt in config.json
+    version = (ctx["created_at"], ctx.get("fingerprint"), _config_mtime() if name == "ladder" else None)
+    # health enthält das Alter und ändert sich damit laufend
+    cache_key = None if name == "health" else (path, tuple(sorted(query.items())), version)
+
+    if cache_key is not None:
+        with _RESPONSES_LOCK:
+            hit = _RESPONSES.get(cache_key)
+        if hit is not None:
+            return hit
+
+    if name == "ticker" and len(parts) == 3:
+        payload = route_ticker(ctx, query, unquote(parts[2]))
+    elif name in ROUTES and len(parts) == 2:
+        payload = ROUTES[name](ctx, query)
+    else:
+        raise ApiError(404, "unbekannter Pfad")
+
+    result = _encode(payload)
+    if cache_key is not None:
+        with _RESPONSES_LOCK:
+            if len(_RESPONSES) >= _RESPONSES_MAX:
+                _RESPONSES.clear()
+            _RESPONSES[cache_key] = result
+    return result
+
+
+# -------------------------------------------------------------------
+# HTTP-Handler
+# -------------------------------------------------------------------
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "AGIDashboardAPI/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: tuple(v) for k, v in parse_qs(url.query).items()}
+        try:
+            etag, body = resolve(url.path, query)
+        except ApiError as e:
+            self._send(e.status, json.dumps({"error": e.message}, ensure_ascii=False).encode("utf-8"))
+            return
+        except Exception as e:
+            self._send(500, json.dumps({"error": repr(e)}).encode("utf-8"))
+            return
+
+        if_none_match = self.headers.get("If-None-Match", "")
+        if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+            self._send(304, None, etag)
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) if body else 0))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        # ruhig bleiben – Polling würde sonst das Terminal fluten
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokale JSON-API der AGI & AI Trading APP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    # Die API rechnet nie selbst nach – alles kommt aus dem geteilten Cache
+    set_read_only(True)
+    price_panel.activate()
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"API läuft auf http://{args.host}:{args.port}/api/ …")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark-Suite für analysis_core auf synthetischen Marktdaten (ohne Netzwerk).
+
+    python bench_analysis.py                          # 10, 174, 1000, 5000 Ticker
+    python bench_analysis.py --sizes 10,174 --repeat 3
+    python bench_analysis.py --replay captures/2025-12-05   # aufgezeichneter Markttag
+
+Ergebnisse landen als JSON unter bench_results/ (inkl. Git-Version) und werden
+mit dem letzten vorherigen Lauf verglichen, damit Regressionen auffallen.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analysis_core
+import cache_store
+import data_providers
+from config_utils import rebuild_portfolio_from_journal
+from ladder_engine import compute_daily_ladder_actions
+from synthetic_market import (
+    SyntheticProvider,
+    synthetic_journal,
+    synthetic_universe,
+)
+
+DEFAULT_SIZES = (10, 174, 1000, 5000)
+RESULTS_DIR = Path("bench_results")
+THRESHOLDS = {"run_up_pct": 30, "dip_pct": -30}
+
+# Anteil des Universums, der als Portfolio-Position im Journal landet
+PORTFOLIO_SHARE = 0.1
+TRADES_PER_POSITION = 8
+
+
+def git_version():
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=10,
+        )
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def best_of(fn, repeat):
+    """Schnellste von `repeat` Messungen (Sekunden) + Ergebnis des letzten Laufs."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class SyntheticEnvironment:
+    """Daten-Provider (Standard: synthetisch) aktivieren, Caches in ein Temp-Verzeichnis legen."""
+
+    def __init__(self, provider=None):
+        self.provider = provider or SyntheticProvider()
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory(prefix="agi-bench-")
+        root = Path(self.tmp.name)
+        self.saved = cache_store.CACHE_DIR
+        self.previous_provider = data_providers.set_provider(self.provider)
+        cache_store.CACHE_DIR = root
+        self._clear_caches()
+        return self
+
+    def __exit__(self, *exc):
+        cache_store.CACHE_DIR = self.saved
+        data_providers.set_provider(self.previous_provider)
+        self._clear_caches()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _clear_caches():
+        analysis_core.FUND_CACHE.clear()
+        analysis_core.EARNINGS_CACHE.clear()
+        analysis_core.MACRO_CACHE.clear()
+
+
+def bench_size(n, repeat, provider=None):
+    """Alle Benchmarks für ein Universum mit n Tickern."""
+    universe = synthetic_universe(n)
+    if isinstance(provider, data_providers.ReplayProvider):
+        # aufgezeichnete Ticker statt SYN…-Symbolen; Journal bleibt synthetisch
+        universe = [
+            {**entry, "name": t, "ticker": t}
+            for entry, t in zip(universe, provider.tickers()[:n])
+        ]
+    tickers = [e["ticker"] for e in universe]
+    positions = tickers[: max(1, int(n * PORTFOLIO_SHARE))]
+    journal = synthetic_journal(positions, trades_per_ticker=TRADES_PER_POSITION)
+    results = {}
+
+    def record(name, seconds, items):
+        results[name] = {
+            "total_s": round(seconds, 4),
+            "items": items,
+            "per_item_us": round(seconds / max(items, 1) * 1e6, 1),
+        }
+
+    with SyntheticEnvironment(provider):
+        # Kaltstart: Kursspeicher + Caches füllen (synthetisch, kein Netzwerk)
+        t0 = time.perf_counter()
+        analysis_core.prefetch_market_data(tickers)
+        analysis_core.compute_macro_context()
+        record("prefetch_cold", time.perf_counter() - t0, n)
+
+        histories = {t: analysis_core.fetch_history(t) for t in tickers}
+
+        seconds, analyses = best_of(
+            lambda: [
+                analysis_core.analyze_ticker(e["name"], e["ticker"], thresholds=THRESHOLDS)
+                for e in universe
+            ],
+            repeat,
+        )
+        record("analyze_ticker", seconds, n)
+
+        seconds, _ = best_of(
+            lambda: [analysis_core.detect_wave_stock(h) for h in histories.values()],
+            repeat,
+        )
+        record("detect_wave_stock", seconds, n)
+
+        macro = analysis_core.compute_macro_context()
+        seconds, _ = best_of(
+            lambda: [analysis_core.score_dual_candidate(a, THRESHOLDS, macro) for a in analyses],
+            repeat,
+        )
+        record("score_dual_candidate", seconds, n)
+
+        cfg = {"journal": journal, "portfolio": []}
+        seconds, _ = best_of(lambda: rebuild_portfolio_from_journal(cfg), repeat)
+        record("rebuild_portfolio_from_journal", seconds, len(journal))
+
+        seconds, overview = best_of(
+            lambda: analysis_core.build_portfolio_overview(cfg, THRESHOLDS),
+            repeat,
+        )
+        record("build_portfolio_overview", seconds, len(cfg["portfolio"]))
+
+        rows = overview[2]
+        seconds, _ = best_of(lambda: compute_daily_ladder_actions(rows, {}), repeat)
+        record("compute_daily_ladder_actions", seconds, len(rows))
+
+    return results
+
+
+def latest_previous(results_dir):
+    files = sorted(results_dir.glob("bench_*.json"))
+    if not files:
+        return None
+    try:
+        return json.loads(files[-1].read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def print_report(current, previous):
+    prev_results = (previous or {}).get("results", {})
+    print(f"\nBenchmark {current['version']} ({current['created_at']})")
+    if previous:
+        print(f"Vergleich mit {previous.get('version')} ({previous.get('created_at')})")
+    for size, benches in current["results"].items():
+        print(f"\n== {size} Ticker ==")
+        for name, r in benches.items():
+            line = f"  {name:<32} {r['total_s']:>9.4f}s  {r['per_item_us']:>11.1f} µs/Item"
+            old = prev_results.get(size, {}).get(name)
+            if old and old["total_s"] > 0:
+                delta = (r["total_s"] - old["total_s"]) / old["total_s"] * 100
+                line += f"  ({delta:+.1f}% vs. vorher)"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks für analysis_core (synthetische Daten)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=1, help="Messungen pro Benchmark (bestes zählt)")
+    parser.add_argument("--out", default=str(RESULTS_DIR))
+    parser.add_argument("--replay", help="Aufzeichnung statt synthetischer Daten abspielen")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    provider = None
+    if args.replay:
+        provider = data_providers.ReplayProvider(args.replay)
+        available = len(provider.tickers())
+        sizes = sorted({min(n, available) for n in sizes if available})
+    out_dir = Path(args.out)
+    previous = latest_previous(out_dir)
+
+    results = {}
+    for n in sizes:
+        print(f"… {n} Ticker", file=sys.stderr)
+        results[str(n)] = bench_size(n, max(1, args.repeat), provider)
+
+    current = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "version": git_version(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "provider": provider.name if provider else "synthetic",
+        "results": results,
+    }
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = out_dir / f"bench_{stamp}_{current['version']}.json"
+    path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+
+    print_report(current, previous)
+    print(f"\nGespeichert: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# -------------------------------------------------------------------
+# Persistenter Daten-Cache (Fundamentals, Earnings, Makro, Kurse)
+# -------------------------------------------------------------------
+#
+# Eine SQLite-Datenbank im WAL-Modus unter cache/market_cache.sqlite3, die
+# sich alle Prozesse auf dem Host teilen (mehrere Streamlit-Worker,
+# Cache-Warmer, Batch-CLI, API). Leser blockieren Schreiber nicht; was ein
+# Prozess aktualisiert, sehen alle anderen beim nächsten Zugriff.
+#
+# Tabelle entries:   (namespace, key) -> value (JSON), fetched_at (unix-ts)
+# Kursdaten legt price_store in derselben Datenbank ab.
+#
+# AGI_CACHE_DIR verlegt alle Caches (auch Kursspeicher & Snapshot), z.B. für
+# Replay-Läufe gegen einen eingefrorenen Markttag.
+
+CACHE_DIR = Path(os.environ.get("AGI_CACHE_DIR") or "cache")
+DB_NAME = "market_cache.sqlite3"
+
+# So lange wartet ein Schreiber auf die Sperre eines anderen Prozesses (ms)
+BUSY_TIMEOUT_MS = 10000
+
+_LOCAL = threading.local()  # pro Thread: {db-Pfad: Connection}
+_SCHEMA = []                # weitere Tabellen (price_store registriert sich)
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = set()        # db-Pfade mit angelegtem Schema
+
+
+def db_path():
+    return CACHE_DIR / DB_NAME
+
+
+def register_schema(sql):
+    """CREATE-Statements anderer Module, die in derselben Datenbank liegen."""
+    _SCHEMA.append(sql)
+
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        namespace  TEXT NOT NULL,
+        key        TEXT NOT NULL,
+        value      TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """
+)
+
+
+def connect():
+    """Verbindung des aktuellen Threads zur Cache-Datenbank (bei Bedarf anlegen)."""
+    path = db_path()
+    conns = getattr(_LOCAL, "conns", None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    conn = conns.get(path)
+    if conn is not None:
+        return conn
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    with _INIT_LOCK:
+        if path not in _INITIALIZED:
+            for sql in _SCHEMA:
+                conn.execute(sql)
+            _import_legacy_json(conn)
+            _INITIALIZED.add(path)
+
+    conns[path] = conn
+    return conn
+
+
+def _import_legacy_json(conn):
+    """Einmalig die früheren cache/<namespace>.json-Dateien übernehmen."""
+    for path in CACHE_DIR.glob("*.json"):
+        if path.name == "analysis_snapshot.json":
+            continue
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+            rows = [
+                (path.stem, key, json.dumps(e["value"], ensure_ascii=False), e["fetched_at"])
+                for key, e in entries.items()
+            ]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            continue
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries (namespace, key, value, fetched_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        path.rename(path.with_name(path.name + ".imported"))
+
+
+def get(namespace, key):
+    """(value, fetched_at) liefern oder None, wenn nichts gespeichert ist."""
+    row = connect().execute(
+        "SELECT value, fetched_at FROM entries WHERE namespace = ? AND key = ?",
+        (namespace, key),
+    ).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0]), row[1]
+
+
+def items(namespace):
+    """Alle Einträge eines Namespaces als {key: (value, fetched_at)}."""
+    rows = connect().execute(
+        "SELECT key, value, fetched_at FROM entries WHERE namespace = ?", (namespace,)
+    ).fetchall()
+    return {key: (json.loads(value), fetched_at) for key, value, fetched_at in rows}
+
+
+def put(namespace, key, value):
+    """Wert mit aktuellem Zeitstempel speichern."""
+    connect().execute(
+        "INSERT OR REPLACE INTO entries (namespace, key, value, fetched_at) VALUES (?, ?, ?, ?)",
+        (namespace, key, json.dumps(value, ensure_ascii=False), time.time()),
+    )
+
+
+def put_many(namespace, values):
+    """Mehrere Werte {key: value} in einer Transaktion speichern."""
+    fetched_at = time.time()
+    rows = [
+        (namespace, key, json.dumps(value, ensure_ascii=False), fetched_at)
+        for key, value in values.items()
+    ]
+    conn = connect()
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, fetched_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def delete(namespace, key):
+    """Eintrag entfernen (no-op, wenn nicht vorhanden)."""
+    connect().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
@@ -0,0 +1,210 @@
+"""
+Cache-Warmer: aktualisiert Kursdaten, Fundamentals, Earnings und Makro-Kontext
+für Universe + Portfolio außerhalb der Streamlit-APP und schreibt danach einen
+frischen Analyse-Snapshot. Zwischen den festen Läufen lädt der Daemon nur die
+fälligen Ticker nach (adaptive Kadenz pro Ticker, siehe refresh_scheduler).
+
+    python cache_warmer.py             # Daemon nach Zeitplan (config.json → "warmer")
+    python cache_warmer.py --once      # einmal aufwärmen und beenden
+    python cache_warmer.py --schedule  # aktuellen Refresh-Plan anzeigen
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import perf
+import price_panel
+import refresh_scheduler
+from config_utils import DEFAULT_WARMER, load_ai_universe, load_config
+from analysis_core import (
+    compute_macro_context,
+    prefetch_market_data,
+    refresh_histories,
+    screen_tickers,
+    set_read_only,
+)
+from snapshot import build_analysis_context, load_snapshot, save_snapshot
+
+log = logging.getLogger("cache_warmer")
+
+
+def warm_tickers(cfg):
+    """
+    Alle Ticker aus Portfolio + AI-Universe (Portfolio zuerst, ohne Duplikate),
+    Zombie-/Untradable-Werte aus dem Universe aussortiert (Vorfilter).
+    """
+    portfolio = [(pos.get("ticker") or "").upper() for pos in cfg.get("portfolio", [])]
+    tickers = list(portfolio)
+    for entry in load_ai_universe().get("ai_universe", []):
+        tickers.append((entry.get("ticker") or "").upper())
+    tickers, dropped = screen_tickers(tickers, keep=portfolio)
+    if dropped:
+        log.debug("Vorfilter: %d Ticker aussortiert (%s)", len(dropped), ", ".join(dropped))
+    return tickers
+
+
+def warm_once(cfg):
+    """Einen kompletten Aufwärm-Lauf durchführen."""
+    started = time.time()
+    tickers = warm_tickers(cfg)
+    log.info("Aufwärmen von %d Tickern …", len(tickers))
+
+    run = perf.start_run("warmer")
+    try:
+        compute_macro_context(force=True)
+
+        failed = prefetch_market_data(tickers, force=True)
+        panel = price_panel.publish_panel(tickers)
+        log.info("Kurs-Panel v%d: %d Ticker × %d Tage", panel["version"], *panel["shape"][2:0:-1])
+
+        thresholds = cfg.get("thresholds", {"run_up_pct": 30, "dip_pct": -30})
+        save_snapshot(build_analysis_context(cfg, thresholds))
+    finally:
+        summary = perf.finish_run(run)
+
+    log.info(
+        "Fertig in %.1fs – %d ok, %d ohne Daten%s – %d Netzwerk-Aufrufe, %.1f MB",
+        time.time() - started,
+        len(tickers) - len(failed),
+        len(failed),
+        f" ({', '.join(failed)})" if failed else "",
+        summary["network"]["calls"],
+        summary["network"]["bytes"] / 1e6,
+    )
+
+
+def refresh_due(cfg):
+    """
+    Ein Tick des adaptiven Schedulers: fällige Ticker (Portfolio & nahe Level
+    zuerst) nachladen, danach Panel und Snapshot aus dem Cache neu bauen.
+    Liefert die geladenen Ticker.
+    """
+    warmer_cfg = cfg.get("warmer", DEFAULT_WARMER)
+    budget = int(warmer_cfg.get("budget", DEFAULT_WARMER["budget"]))
+    tickers = warm_tickers(cfg)
+
+    schedule = refresh_scheduler.build_schedule(cfg, tickers, load_snapshot())
+    due = refresh_scheduler.due_tickers(schedule, budget)
+    if not due:
+        return []
+
+    started = time.time()
+    run = perf.start_run("scheduler")
+    try:
+        histories = refresh_histories(due)
+        price_panel.publish_panel(tickers)
+
+        # Snapshot nur aus dem Cache – das Budget gilt auch für den Neuaufbau
+        thresholds = cfg.get("thresholds", {"run_up_pct": 30, "dip_pct": -30})
+        set_read_only(True)
+        try:
+            save_snapshot(build_analysis_context(cfg, thresholds))
+        finally:
+            set_read_only(False)
+    finally:
+        summary = perf.finish_run(run)
+
+    log.info(
+        "Refresh: %d/%d fällige Ticker in %.1fs (%s) – %d Netzwerk-Aufrufe",
+        sum(1 for t in due if histories.get(t) is not None),
+        len(due),
+        time.time() - started,
+        ", ".join(due[:10]) + (" …" if len(due) > 10 else ""),
+        summary["network"]["calls"],
+    )
+    return due
+
+
+def print_schedule(cfg):
+    """Refresh-Plan pro Stufe und die nächsten fälligen Ticker ausgeben."""
+    now = time.time()
+    schedule = refresh_scheduler.build_schedule(cfg, warm_tickers(cfg), load_snapshot(), now)
+    for label, info in refresh_scheduler.tier_summary(schedule, now).items():
+        print(
+            f"{label:<24} {info['tickers']:>4} Ticker  "
+            f"Ø Kadenz {info['cadence_min']:>6.1f} min  nächster in {info['next_due_min']:.1f} min"
+        )
+    print()
+    for entry in schedule[:20]:
+        vol = entry["avg_range_pct"]
+        print(
+            f"{entry['ticker']:<10} Stufe {entry['tier']}  Score {entry['score']:>5.1f}  "
+            f"Range {vol if vol is None else round(vol, 2)!s:>6}  "
+            f"Kadenz {entry['cadence'] / 60:>6.1f} min  "
+            f"fällig in {max(0.0, entry['due_at'] - now) / 60:.1f} min"
+        )
+
+
+def next_run(now, times, tz):
+    """Nächsten Zeitpunkt aus der Liste 'HH:MM' (in Zeitzone tz) bestimmen."""
+    local_now = now.astimezone(tz)
+    candidates = []
+    for day_offset in (0, 1):
+        day = local_now.date() + timedelta(days=day_offset)
+        for t in times:
+            hour, minute = (int(x) for x in t.split(":"))
+            at = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+            if at > local_now:
+                candidates.append(at)
+    return min(candidates)
+
+
+def run_daemon():
+    """
+    Endlosschleife: zu jedem geplanten Zeitpunkt einmal komplett aufwärmen,
+    dazwischen alle tick_minutes die fälligen Ticker nachladen.
+    """
+    while True:
+        # Config bei jedem Lauf neu lesen → neue Trades / geänderter Zeitplan
+        warmer_cfg = load_config().get("warmer", DEFAULT_WARMER)
+        tz = ZoneInfo(warmer_cfg.get("timezone", DEFAULT_WARMER["timezone"]))
+        times = warmer_cfg.get("times") or DEFAULT_WARMER["times"]
+        adaptive = warmer_cfg.get("adaptive", DEFAULT_WARMER["adaptive"])
+        tick = 60.0 * float(warmer_cfg.get("tick_minutes", DEFAULT_WARMER["tick_minutes"]))
+
+        at = next_run(datetime.now(tz), times, tz)
+        log.info("Nächster Lauf: %s", at.strftime("%Y-%m-%d %H:%M %Z"))
+
+        # in kurzen Schritten schlafen, damit Uhr-Sprünge (Standby) nicht stören
+        next_tick = time.time() + tick
+        while datetime.now(tz) < at:
+            time.sleep(min(60.0, max(1.0, (at - datetime.now(tz)).total_seconds())))
+            if adaptive and time.time() >= next_tick and datetime.now(tz) < at:
+                try:
+                    refresh_due(load_config())
+                except Exception:
+                    log.exception("Refresh-Tick fehlgeschlagen")
+                next_tick = time.time() + tick
+
+        try:
+            warm_once(load_config())
+        except Exception:
+            log.exception("Aufwärm-Lauf fehlgeschlagen")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache-Warmer für die AGI & AI Trading APP")
+    parser.add_argument("--once", action="store_true", help="einmal aufwärmen und beenden")
+    parser.add_argument(
+        "--schedule", action="store_true", help="adaptiven Refresh-Plan anzeigen und beenden"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    if args.schedule:
+        print_schedule(load_config())
+    elif args.once:
+        warm_once(load_config())
+    else:
+        run_daemon()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from price_store import slice_period
+
+# -------------------------------------------------------------------
+# Chart-Zeiträume & Downsampling
+# -------------------------------------------------------------------
+
+# Label im UI → Zeitraum im Kursspeicher
+CHART_RANGES = {
+    "1M": "1mo",
+    "3M": "3mo",
+    "6M": "6mo",
+    "YTD": "ytd",
+    "1J": "1y",
+    "3J": "3y",
+    "5J": "5y",
+    "MAX": "max",
+}
+
+# Obergrenze an Punkten, die an Altair geschickt werden
+CHART_MAX_POINTS = 500
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: wählt n_out Punkte so aus, dass die
+    Form der Kurve (Hochs, Tiefs, Knicke) erhalten bleibt.
+    Liefert die Indizes der ausgewählten Punkte.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    # Innere Punkte gleichmäßig auf n_out - 2 Buckets verteilen
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Durchschnittspunkt des nächsten Buckets (letzter Bucket → Endpunkt)
+        if i + 2 < len(edges):
+            nxt_start, nxt_end = edges[i + 1], edges[i + 2]
+            avg_x = x[nxt_start:nxt_end].mean()
+            avg_y = y[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Punkt mit der größten Dreiecksfläche zu (a, Durchschnitt) wählen
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs(
+            (x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return idx
+
+
+def downsample_lttb(series, n_out=CHART_MAX_POINTS):
+    """Zeitreihe (DatetimeIndex) formerhaltend auf max. n_out Punkte reduzieren."""
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    x = series.index.asi8.astype(np.float64)
+    y = series.to_numpy(dtype=np.float64)
+    return series.iloc[lttb_indices(x, y, n_out)]
+
+
+def chart_frame(hist, range_label, max_points=CHART_MAX_POINTS):
+    """
+    Chart-fertiges DataFrame (Datum, Kurs) für den gewählten Zeitraum.
+    Lange Zeiträume werden per LTTB auf max_points begrenzt.
+    """
+    if hist is None or hist.empty:
+        return pd.DataFrame(columns=["Datum", "Kurs"])
+
+    period = CHART_RANGES.get(range_label, "1y")
+    closes = slice_period(hist, period)["Close"]
+    closes = downsample_lttb(closes, max_points)
+
+    df = closes.reset_index()
+    df.columns = ["Datum", "Kurs"]
+    return df
+
+
+def equity_chart_frames(history, range_label, max_points=CHART_MAX_POINTS):
+    """
+    Chart-fertige DataFrames für die Depotwert-Historie im gewählten Zeitraum:
+    (Datum, Reihe, Wert) für Depotwert & Kapital und (Datum, Drawdown %).
+    Ausgedünnt per LTTB über den Depotwert, damit Spitzen erhalten bleiben.
+    """
+    if history is None or history.empty:
+        return (
+            pd.DataFrame(columns=["Datum", "Reihe", "Wert"]),
+            pd.DataFrame(columns=["Datum", "Drawdown %"]),
+        )
+
+    period = CHART_RANGES.get(range_label, "max")
+    history = slice_period(history, period)
+    if len(history) > max_points:
+        x = history.index.asi8.astype(np.float64)
+        y = history["Depotwert"].to_numpy(dtype=np.float64)
+        history = history.iloc[lttb_indices(x, y, max_points)]
+
+    values = (
+        history[["Depotwert", "Kapital"]]
+        .rename_axis("Datum")
+        .reset_index()
+        .melt(id_vars="Datum", var_name="Reihe", value_name="Wert")
+    )
+    drawdown = pd.DataFrame(
+        {"Datum": history.index, "Drawdown %": history["Drawdown"].to_numpy() * 100}
+    )
+    return values, drawdown
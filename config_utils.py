@@ -4,6 +4,21 @@ from pathlib import Path
 CONFIG_PATH = Path("config.json")
 AI_UNIVERSE_PATH = Path("ai_universe.json")
 
+# Cache-Warmer: Zeitplan (Uhrzeiten in der angegebenen Zeitzone).
+# enabled=True → die APP liest nur noch aus dem Cache, der Warmer aktualisiert.
+DEFAULT_WARMER = {
+    "enabled": False,
+    "timezone": "Europe/Berlin",
+    "times": ["22:30", "07:30"],  # nach US-Schluss, vor XETRA-Eröffnung
+    # Zwischen den Läufen: fällige Ticker nach adaptiver Kadenz (refresh_scheduler)
+    "adaptive": True,
+    "tick_minutes": 5,
+    "budget": 40,                 # höchstens so viele Ticker pro Tick
+}
+
+# Empfänger für Journal-Änderungen: listener(cfg, tickers)
+_JOURNAL_LISTENERS = []
+
 
 def load_config():
     """Konfiguration laden oder Defaults erzeugen."""
@@ -15,6 +30,8 @@ def load_config():
             "thresholds": {"run_up_pct": 30, "dip_pct": -30},
             "journal": [],
             "ladder_progress": {},  # neu: Fortschritt pro Aktie für Ladder-Stufen
+            "cost_method": "fifo",  # Einstand nach Teilverkäufen: "fifo" oder "average"
+            "warmer": dict(DEFAULT_WARMER),
         }
 
     with open(CONFIG_PATH, "r") as f:
@@ -27,6 +44,8 @@ def load_config():
     cfg.setdefault("thresholds", {"run_up_pct": 30, "dip_pct": -30})
     cfg.setdefault("journal", [])
     cfg.setdefault("ladder_progress", {})
+    cfg.setdefault("cost_method", "fifo")
+    cfg.setdefault("warmer", dict(DEFAULT_WARMER))
 
     return cfg
 
@@ -107,4 +126,31 @@ def rebuild_portfolio_from_journal(cfg):
             pos["targets"] = old_targets[ticker]
 
     # Final ins Config-Objekt schreiben
-    cfg["portfolio"] = list(positions.values())
\ No newline at end of file
+    cfg["portfolio"] = list(positions.values())
+
+
+# --------------------------------------------------------------
+# JOURNAL-ÄNDERUNGEN (Change-Events)
+# --------------------------------------------------------------
+
+
+def on_journal_change(listener):
+    """
+    listener(cfg, tickers) nach jeder gespeicherten Journal-Änderung aufrufen
+    (z.B. snapshot: nur die betroffenen Ticker neu rechnen).
+    """
+    if listener not in _JOURNAL_LISTENERS:
+        _JOURNAL_LISTENERS.append(listener)
+
+
+def commit_journal_change(cfg, tickers):
+    """
+    Nach einer Änderung am Journal: Portfolio neu aufbauen, speichern und
+    allen Empfängern die betroffenen Ticker melden.
+    """
+    rebuild_portfolio_from_journal(cfg)
+    save_config(cfg)
+
+    tickers = sorted({(t or "").upper() for t in tickers if t})
+    for listener in list(_JOURNAL_LISTENERS):
+        listener(cfg, tickers)
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import threading
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+import cache_store
+import price_panel
+
+# -------------------------------------------------------------------
+# Korrelation & Cluster über das Universe (einmal pro Tag)
+# -------------------------------------------------------------------
+#
+# Viele Radar-Signale sind dieselbe Wette (GPUs, Chip-Fertigung, ...).
+# Deshalb einmal am Tag:
+#   1. Tage×Ticker-Matrix der Log-Renditen (letzte CORR_WINDOW Tage,
+#      ausgerichtet wie im Kurs-Panel), pro Spalte standardisiert → Z
+#   2. Korrelationsmatrix in einem Matrix-Produkt: C = Zᵀ Z (normiert)
+#   3. Average-Linkage-Clustering auf der Distanz 1 − C; Cluster werden
+#      nur verschmolzen, solange die mittlere Korrelation ≥ CLUSTER_MIN_CORR
+# Matrix und Cluster liegen unter cache/correlation/ (npz, pro Tag und
+# Ticker-Menge); Radar und Top-3 wählen damit je Cluster den besten Wert.
+
+CORR_SUBDIR = "correlation"
+CORR_WINDOW = 252          # Handelstage
+MIN_OBSERVATIONS = 60      # Ticker mit weniger Renditen bleiben Einzel-Cluster
+CLUSTER_MIN_CORR = 0.6     # mittlere Korrelation, ab der Werte ein Cluster bilden
+
+_STATE = {}
+_LOCK = threading.Lock()
+
+
+def correlation_matrix(closes, window=CORR_WINDOW, min_obs=MIN_OBSERVATIONS):
+    """
+    Korrelation der Tagesrenditen aus einer Tage×Ticker-Matrix von
+    Schlusskursen (NaN = kein Kurs). Liefert (Matrix, gültige Spalten).
+    Fehlende Renditen zählen als Mittelwert (0 nach Standardisierung).
+    """
+    closes = np.asarray(closes, dtype=np.float64)[-(window + 1):]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(closes), axis=0)
+    returns[~np.isfinite(returns)] = np.nan
+
+    valid = np.count_nonzero(~np.isnan(returns), axis=0) >= min_obs
+    std = np.zeros(len(valid))
+    if valid.any():
+        std[valid] = np.nanstd(returns[:, valid], axis=0)
+    valid &= std > 0
+    z = (returns[:, valid] - np.nanmean(returns[:, valid], axis=0)) / std[valid]
+    z = np.nan_to_num(z)
+
+    corr = z.T @ z
+    norm = np.sqrt(np.diag(corr))
+    corr /= np.outer(norm, norm)
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr, valid
+
+
+def cluster_labels(corr, min_corr=CLUSTER_MIN_CORR):
+    """
+    Average-Linkage-Clustering (Lance-Williams) auf 1 − Korrelation.
+    Liefert pro Spalte eine Cluster-Nummer (0 = größter Cluster).
+    """
+    n = len(corr)
+    dist = 1.0 - np.asarray(corr, dtype=np.float64)
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(n)
+    labels = np.arange(n)
+    max_distance = 1.0 - min_corr
+
+    for _ in range(n - 1):
+        i, j = divmod(int(np.argmin(dist)), n)
+        if dist[i, j] > max_distance:
+            break
+        merged = (sizes[i] * dist[i] + sizes[j] * dist[j]) / (sizes[i] + sizes[j])
+        dist[i, :] = merged
+        dist[:, i] = merged
+        dist[i, i] = np.inf
+        dist[j, :] = np.inf
+        dist[:, j] = np.inf
+        sizes[i] += sizes[j]
+        labels[labels == j] = i
+
+    # nach Größe durchnummerieren
+    order = [label for label, _ in Counter(labels.tolist()).most_common()]
+    rank = {label: k for k, label in enumerate(order)}
+    return np.array([rank[label] for label in labels])
+
+
+# -------------------------------------------------------------------
+# Tages-Cache (Datei + Speicher)
+# -------------------------------------------------------------------
+
+def _cache_path():
+    return cache_store.CACHE_DIR / CORR_SUBDIR / "universe_corr.npz"
+
+
+def _cache_key(tickers):
+    digest = hashlib.sha1(",".join(tickers).encode("utf-8")).hexdigest()[:16]
+    return f"{date.today().isoformat()}:{digest}"
+
+
+def _load_cached(key):
+    try:
+        with np.load(_cache_path(), allow_pickle=False) as data:
+            if str(data["key"]) != key:
+                return None
+            return {
+                "key": key,
+                "tickers": data["tickers"].tolist(),
+                "corr": data["corr"],
+                "labels": data["labels"],
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_cached(result):
+    path = _cache_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            key=np.array(result["key"]),
+            tickers=np.array(result["tickers"]),
+            corr=result["corr"],
+            labels=result["labels"],
+        )
+    os.replace(tmp, path)
+
+
+def _close_matrix(tickers):
+    """Tage×Ticker-Schlusskurse: aus dem geteilten Panel, sonst aus dem Kursspeicher."""
+    panel = price_panel.active_panel()
+    if panel is not None and all(t in panel for t in tickers):
+        columns = [panel.ticker_index[t] for t in tickers]
+        return panel.matrix("Close")[-(CORR_WINDOW + 1):, columns]
+
+    header, values = price_panel.build_panel(tickers, period="2y")
+    closes = values[price_panel.PANEL_COLUMNS.index("Close")]
+    index = {t: i for i, t in enumerate(header["tickers"])}
+    matrix = np.full((len(closes), len(tickers)), np.nan)
+    for k, ticker in enumerate(tickers):
+        if ticker in index:
+            matrix[:, k] = closes[:, index[ticker]]
+    return matrix
+
+
+def universe_correlation(tickers):
+    """
+    Korrelationsmatrix und Cluster-Nummern für tickers (einmal pro Tag,
+    danach aus Speicher bzw. cache/correlation/).
+    → {"tickers", "corr" (n×n), "labels" (n)}; Ticker ohne genug Kurse
+    bekommen eine eigene Cluster-Nummer und Korrelation NaN.
+    """
+    tickers = sorted(dict.fromkeys(t.upper() for t in tickers if t))
+    key = _cache_key(tickers)
+
+    with _LOCK:
+        if _STATE.get("key") == key:
+            return _STATE
+        result = _load_cached(key)
+        if result is None:
+            corr, valid = correlation_matrix(_close_matrix(tickers))
+            full = np.full((len(tickers), len(tickers)), np.nan)
+            full[np.ix_(valid, valid)] = corr
+            labels = np.empty(len(tickers), dtype=np.int64)
+            labels[valid] = cluster_labels(corr)
+            labels[~valid] = np.arange(int(valid.sum()), len(tickers))
+            result = {"key": key, "tickers": tickers, "corr": full, "labels": labels}
+            _save_cached(result)
+        _STATE.clear()
+        _STATE.update(result)
+        return _STATE
+
+
+def universe_clusters(universe):
+    """
+    Cluster-Bezeichnung pro Ticker des Universe, z.B. "K1 · AI Compute / GPUs"
+    (häufigste Kategorie im Cluster).
+    """
+    category = {
+        (e.get("ticker") or "").upper(): e.get("category") or "n/a"
+        for e in universe
+        if e.get("ticker")
+    }
+    result = universe_correlation(list(category))
+    members = {}
+    for ticker, label in zip(result["tickers"], result["labels"].tolist()):
+        members.setdefault(label, []).append(ticker)
+
+    names = {}
+    for label, tickers in members.items():
+        dominant = Counter(category[t] for t in tickers).most_common(1)[0][0]
+        name = f"K{label + 1} · {dominant}"
+        for ticker in tickers:
+            names[ticker] = name
+    return names
+
+
+def diversified(items, clusters, n=3, ticker_of=lambda item: item["Ticker"]):
+    """
+    Die ersten n items (bereits nach Güte sortiert), höchstens einer pro
+    Cluster; reichen die Cluster nicht, wird mit den nächstbesten aufgefüllt.
+    """
+    picked, seen, rest = [], set(), []
+    for item in items:
+        ticker = (ticker_of(item) or "").upper()
+        cluster = clusters.get(ticker, ticker)
+        if cluster in seen:
+            rest.append(item)
+            continue
+        seen.add(cluster)
+        picked.append(item)
+        if len(picked) == n:
+            return picked
+    return picked + rest[: n - len(picked)]
@@ -0,0 +1,383 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import market_calendar
+import perf
+import price_store
+import transport
+
+# -------------------------------------------------------------------
+# Marktdaten-Provider (live / aufzeichnen / abspielen)
+# -------------------------------------------------------------------
+#
+# analysis_core spricht nie direkt mit yfinance, sondern mit dem aktiven
+# Provider. Ausgewählt wird er per Umgebungsvariable:
+#
+#   AGI_DATA_PROVIDER=yfinance                 # Standard: live
+#   AGI_DATA_PROVIDER=record:captures/2025-12-05
+#   AGI_DATA_PROVIDER=replay:captures/2025-12-05
+#   AGI_DATA_PROVIDER=sim:synthetic@1440        # Zeitraffer-Feed, siehe feed_simulator
+#
+# Für Replay-Läufe empfiehlt sich ein eigenes Cache-Verzeichnis, damit der
+# eingefrorene Markttag nicht im Live-Cache landet:
+#
+#   AGI_DATA_PROVIDER=replay:captures/2025-12-05 \
+#   AGI_CACHE_DIR=captures/2025-12-05/cache streamlit run agi_dashboard.py
+#
+# Aufzeichnungen liegen pro Antworttyp als Pickle unter
+# <dir>/<kind>/<TICKER>.pkl, dazu <dir>/manifest.json mit dem Markttag.
+
+PROVIDER_ENV = "AGI_DATA_PROVIDER"
+
+CAPTURE_KINDS = ("history", "financials", "balance_sheet", "calendar")
+
+# Kalendertage für quotes(): reicht für Kurs + ∅ Volumen über 20 Handelstage
+QUOTE_DAYS = 35
+
+# Kalendertage für latest_bars(): letzter Bar auch über Wochenende/Feiertage
+LATEST_BAR_DAYS = 7
+
+
+class MarketDataProvider(ABC):
+    """
+    Schnittstelle für alle Provider.
+    - history(ticker, period, start)   Daily-OHLCV (DatetimeIndex)
+    - download(tickers, start)         mehrere Ticker, Spalten (Ticker, Feld)
+    - quotes(tickers)                  leichte Kursdaten (letzte Wochen) für den Vorfilter
+    - latest_bars(tickers)             jüngste Daily-Bars inkl. laufendem Handelstag
+    - financials / balance_sheet       DataFrames wie bei yfinance
+    - calendar                         DataFrame mit Zeile 'Earnings Date'
+    - today()                          Markttag, auf den sich "heute" bezieht
+    history, financials, balance_sheet und calendar muss jeder Provider
+    selbst liefern (sonst schlägt schon das Erzeugen fehl).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def history(self, ticker, period=None, start=None):
+        raise NotImplementedError
+
+    def download(self, tickers, start=None):
+        frames = {t: self.history(t, start=start) for t in tickers}
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def quotes(self, tickers):
+        """Nur die letzten QUOTE_DAYS Daily-Bars, gebündelt wie download()."""
+        start = self.today() - timedelta(days=QUOTE_DAYS)
+        return self.download(tickers, start=start.isoformat())
+
+    def latest_bars(self, tickers):
+        """
+        Die Bars der letzten Tage für alle Ticker in einem Abruf – während der
+        Handelszeit ist der letzte Bar der laufende Tag (vorläufig).
+        """
+        start = self.today() - timedelta(days=LATEST_BAR_DAYS)
+        return self.download(tickers, start=start.isoformat())
+
+    @abstractmethod
+    def financials(self, ticker):
+        raise NotImplementedError
+
+    @abstractmethod
+    def balance_sheet(self, ticker):
+        raise NotImplementedError
+
+    @abstractmethod
+    def calendar(self, ticker):
+        raise NotImplementedError
+
+    def today(self):
+        return datetime.utcnow().date()
+
+    def session_day(self, ticker):
+        """Tag des noch vorläufigen Daily-Bars von ticker (oder None)."""
+        return market_calendar.session_day(ticker)
+
+
+def _normalize_calendar(cal):
+    """
+    Neuere yfinance-Versionen liefern den Kalender als dict
+    ({'Earnings Date': [date, ...], ...}) → in das DataFrame-Format bringen.
+    """
+    if not isinstance(cal, dict):
+        return cal
+    dates = cal.get("Earnings Date") or []
+    if not isinstance(dates, (list, tuple)):
+        dates = [dates]
+    if not dates:
+        return pd.DataFrame()
+    return pd.DataFrame(
+        {i: [pd.Timestamp(d)] for i, d in enumerate(dates)}, index=["Earnings Date"]
+    )
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Live-Daten über yfinance (einzige Stelle mit Netzwerkzugriff).
+    Alle Abrufe laufen über transport: geteilte Session, Rate-Limit,
+    Wiederholungen und Timeouts.
+    """
+
+    name = "yfinance"
+
+    def _ticker(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker, session=transport.session())
+
+    def history(self, ticker, period=None, start=None):
+        kwargs = {"interval": "1d", "timeout": transport.REQUEST_TIMEOUT}
+        if start is not None:
+            kwargs["start"] = start
+        else:
+            kwargs["period"] = period or "max"
+        data = transport.request("history", lambda: self._ticker(ticker).history(**kwargs))
+        perf.record_network("history", data)
+        return data
+
+    def download(self, tickers, start=None):
+        import yfinance as yf
+
+        data = transport.request(
+            "history_batch",
+            yf.download,
+            list(tickers),
+            start=start,
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=True,
+            actions=True,
+            progress=False,
+            threads=True,
+            timeout=transport.REQUEST_TIMEOUT,
+            session=transport.session(),
+        )
+        perf.record_network("history_batch", data)
+        return data
+
+    def financials(self, ticker):
+        fin = transport.request("financials", lambda: self._ticker(ticker).financials)
+        perf.record_network("financials", fin)
+        return fin
+
+    def balance_sheet(self, ticker):
+        bs = transport.request("balance_sheet", lambda: self._ticker(ticker).balance_sheet)
+        perf.record_network("balance_sheet", bs)
+        return bs
+
+    def calendar(self, ticker):
+        cal = transport.request("calendar", lambda: self._ticker(ticker).calendar)
+        perf.record_network("calendar", cal)
+        return _normalize_calendar(cal)
+
+
+# -------------------------------------------------------------------
+# Aufzeichnen & Abspielen
+# -------------------------------------------------------------------
+
+def _capture_path(root, kind, ticker):
+    safe = ticker.upper().replace("/", "_")
+    return Path(root) / kind / f"{safe}.pkl"
+
+
+def _read_manifest(root):
+    try:
+        with open(Path(root) / "manifest.json", "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class RecordingProvider(MarketDataProvider):
+    """Reicht an einen anderen Provider durch und speichert jede Antwort mit."""
+
+    name = "record"
+
+    def __init__(self, root, inner=None):
+        self.root = Path(root)
+        self.inner = inner or YFinanceProvider()
+        self.lock = threading.Lock()
+
+    def _save(self, kind, ticker, value):
+        path = _capture_path(self.root, kind, ticker)
+        with self.lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if kind == "history":
+                try:
+                    stored = pd.read_pickle(path)
+                except Exception:
+                    stored = None
+                if stored is not None and not stored.empty:
+                    value = price_store.merge_history(stored, price_store.align_index(value.copy(), stored))
+            tmp = path.with_suffix(".tmp")
+            pd.to_pickle(value, tmp)
+            os.replace(tmp, path)
+            self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = _read_manifest(self.root)
+        manifest.update(
+            {
+                "as_of": self.inner.today().isoformat(),
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "source": self.inner.name,
+            }
+        )
+        with open(self.root / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def history(self, ticker, period=None, start=None):
+        data = self.inner.history(ticker, period=period, start=start)
+        if data is not None and not data.empty:
+            self._save("history", ticker, data)
+        return data
+
+    def download(self, tickers, start=None):
+        data = self.inner.download(tickers, start=start)
+        if data is None or data.empty:
+            return data
+        if isinstance(data.columns, pd.MultiIndex):
+            present = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker in present:
+                    part = data[ticker].dropna(how="all")
+                    if not part.empty:
+                        self._save("history", ticker, part)
+        elif len(tickers) == 1:
+            self._save("history", tickers[0], data.dropna(how="all"))
+        return data
+
+    def financials(self, ticker):
+        value = self.inner.financials(ticker)
+        self._save("financials", ticker, value)
+        return value
+
+    def balance_sheet(self, ticker):
+        value = self.inner.balance_sheet(ticker)
+        self._save("balance_sheet", ticker, value)
+        return value
+
+    def calendar(self, ticker):
+        value = self.inner.calendar(ticker)
+        self._save("calendar", ticker, value)
+        return value
+
+    def today(self):
+        return self.inner.today()
+
+    def session_day(self, ticker):
+        return self.inner.session_day(ticker)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Spielt Aufzeichnungen ohne Netzwerk ab. Kurse werden am Markttag aus dem
+    Manifest abgeschnitten (oder an as_of, falls angegeben).
+    Fehlende Aufzeichnungen verhalten sich wie unbekannte Ticker bei yfinance.
+    """
+
+    name = "replay"
+
+    def __init__(self, root, as_of=None):
+        self.root = Path(root)
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Aufzeichnung {self.root} nicht gefunden")
+        as_of = as_of or _read_manifest(self.root).get("as_of")
+        self.as_of = date.fromisoformat(as_of) if isinstance(as_of, str) else as_of
+
+    def _load(self, kind, ticker):
+        path = _capture_path(self.root, kind, ticker)
+        if not path.exists():
+            return None
+        return pd.read_pickle(path)
+
+    def history(self, ticker, period=None, start=None):
+        data = self._load("history", ticker)
+        if data is None or data.empty:
+            return pd.DataFrame()
+        if self.as_of is not None:
+            data = data[data.index.date <= self.as_of]
+        if start is not None:
+            data = data[data.index.date >= pd.Timestamp(start).date()]
+        elif period not in (None, "max"):
+            data = price_store.slice_period(data, period)
+        return data
+
+    def financials(self, ticker):
+        value = self._load("financials", ticker)
+        return pd.DataFrame() if value is None else value
+
+    def balance_sheet(self, ticker):
+        value = self._load("balance_sheet", ticker)
+        return pd.DataFrame() if value is None else value
+
+    def calendar(self, ticker):
+        value = self._load("calendar", ticker)
+        return pd.DataFrame() if value is None else value
+
+    def tickers(self):
+        """Alle Ticker mit aufgezeichneter Historie."""
+        return sorted(p.stem for p in (self.root / "history").glob("*.pkl"))
+
+    def today(self):
+        return self.as_of or super().today()
+
+    def session_day(self, ticker):
+        return None  # Aufzeichnung ändert sich nicht mehr
+
+
+# -------------------------------------------------------------------
+# Aktiver Provider
+# -------------------------------------------------------------------
+
+_PROVIDER = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def provider_from_spec(spec):
+    """'yfinance' | 'record:<dir>' | 'replay:<dir>' | 'sim:<quelle>[@tempo]' → Provider-Instanz."""
+    spec = (spec or "yfinance").strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind in ("", "yfinance", "live"):
+        return YFinanceProvider()
+    if kind in ("record", "replay") and not arg:
+        raise ValueError(f"{PROVIDER_ENV}={spec}: Verzeichnis fehlt (z.B. {kind}:captures/heute)")
+    if kind == "record":
+        return RecordingProvider(arg)
+    if kind == "replay":
+        return ReplayProvider(arg)
+    if kind == "sim":
+        # Import erst hier: feed_simulator baut selbst auf diesem Modul auf
+        from feed_simulator import simulated_provider_from_spec
+
+        return simulated_provider_from_spec(arg)
+    raise ValueError(f"Unbekannter Daten-Provider: {spec}")
+
+
+def get_provider():
+    global _PROVIDER
+    if _PROVIDER is None:
+        with _PROVIDER_LOCK:
+            if _PROVIDER is None:
+                _PROVIDER = provider_from_spec(os.environ.get(PROVIDER_ENV))
+    return _PROVIDER
+
+
+def set_provider(provider):
+    """Provider wechseln (liefert den bisherigen zurück, z.B. für Benchmarks)."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        previous = _PROVIDER
+        _PROVIDER = provider
+    return previous
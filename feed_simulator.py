@@ -0,0 +1,412 @@
+"""
+Lokaler Kurs-Feed: spielt aufgezeichnete oder synthetische Daily-Bars als
+Intraday-Kurse im Zeitraffer ab – über dieselbe Provider-Schnittstelle wie
+yfinance, ganz ohne Netzwerk.
+
+    python feed_simulator.py                           # Lasttest: 200 synthetische Ticker, 1 Tag/Minute, 30 s
+    python feed_simulator.py --tickers 1000 --fast     # ohne Echtzeit-Takt: maximaler Durchsatz
+    python feed_simulator.py --source captures/2025-12-05 --speed 2880 --seconds 60
+    python feed_simulator.py --emit | python alert_engine.py --stdin   # Ticks als Strom
+
+Als Daten-Provider für APP, Cache-Warmer oder Alert-Engine:
+
+    AGI_DATA_PROVIDER=sim:synthetic@1440 AGI_CACHE_DIR=cache-sim streamlit run agi_dashboard.py
+"""
+
+import argparse
+import bisect
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import analysis_core
+import live_quotes
+import price_store
+from alert_engine import AlertEngine, build_triggers
+from data_providers import MarketDataProvider, ReplayProvider
+from synthetic_market import SyntheticProvider, synthetic_universe
+
+# -------------------------------------------------------------------
+# Simulierte Uhr & Intraday-Pfad
+# -------------------------------------------------------------------
+#
+# Jeder abgespielte Handelstag dauert SECONDS_PER_DAY Sim-Sekunden;
+# speed = Sim-Sekunden pro echter Sekunde (1440 → ein Tag pro Minute).
+# Wochenenden und Feiertage werden übersprungen. Innerhalb eines Tages
+# läuft der Kurs stückweise linear Open → Tief → Hoch → Close (Aufwärtstag)
+# bzw. Open → Hoch → Tief → Close (Abwärtstag); der vorläufige Bar enthält
+# High/Low bis zum aktuellen Zeitpunkt und das anteilige Volumen.
+
+SECONDS_PER_DAY = 24 * 60 * 60
+DEFAULT_SPEED = 1440
+DEFAULT_DAYS = 20        # abgespielte Handelstage
+DEFAULT_TICKERS = 200
+# Handelstage vor dem ersten Sim-Tag in den Tick-Arrays (deckt quotes() ab)
+LOOKBACK_DAYS = 30
+THRESHOLDS = {"run_up_pct": 30, "dip_pct": -30}
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def intraday_bar(o, h, l, c, v, frac):
+    """
+    Vorläufiger Bar nach dem Anteil frac (0..1) des Handelstags →
+    (Kurs, High, Low, Volumen); skalar oder als Arrays über viele Ticker.
+    """
+    o, h, l, c, v = (np.asarray(x, dtype=float) for x in (o, h, l, c, v))
+    up = c >= o
+    points = (o, np.where(up, l, h), np.where(up, h, l), c)
+    segment = min(int(frac * 3), 2)
+    step = frac * 3 - segment
+    price = points[segment] + (points[segment + 1] - points[segment]) * step
+    visited = np.stack(points[:segment + 1] + (price,))
+    return price, visited.max(axis=0), visited.min(axis=0), v * frac
+
+
+class SimClock:
+    """Sim-Zeit = echte Zeit × speed (+ manuell vorgespult, z.B. speed=0 im Schnelllauf)."""
+
+    def __init__(self, days, speed=DEFAULT_SPEED):
+        self.days = days
+        self.speed = speed
+        self.started = time.time()
+        self.offset = 0.0
+
+    def elapsed(self):
+        return (time.time() - self.started) * self.speed + self.offset
+
+    def advance(self, seconds):
+        self.offset += seconds
+
+    def finished(self):
+        return self.elapsed() >= self.days * SECONDS_PER_DAY
+
+    def position(self):
+        """(Tag-Index, Anteil des Tages); nach dem letzten Tag bleibt der Feed beim Close stehen."""
+        elapsed = self.elapsed()
+        if elapsed >= self.days * SECONDS_PER_DAY:
+            return self.days - 1, 1.0
+        day, seconds = divmod(max(0.0, elapsed), SECONDS_PER_DAY)
+        return int(day), seconds / SECONDS_PER_DAY
+
+
+# -------------------------------------------------------------------
+# Provider
+# -------------------------------------------------------------------
+
+class SimulatedProvider(MarketDataProvider):
+    """
+    Spielt die letzten `days` Handelstage der Quelle (Replay oder synthetisch)
+    im Zeitraffer ab. history()/download()/latest_bars() liefern alle Bars vor
+    dem Sim-Tag plus den vorläufigen Bar des laufenden Tages; Fundamentals
+    kommen unverändert aus der Quelle.
+    """
+
+    name = "sim"
+
+    def __init__(self, source, days=DEFAULT_DAYS, speed=DEFAULT_SPEED):
+        self.source = source
+        self.axis = list(pd.bdate_range(end=source.today(), periods=days + LOOKBACK_DAYS).date)
+        self.dates = self.axis[LOOKBACK_DAYS:]
+        self.clock = SimClock(days, speed)
+        self._frames = {}
+        self._matrices = {}
+        self._lock = threading.Lock()
+
+    def frame(self, ticker):
+        """Komplette Historie der Quelle (einmal geladen)."""
+        ticker = ticker.upper()
+        data = self._frames.get(ticker)
+        if data is None:
+            data = self.source.history(ticker, period="max")
+            data = pd.DataFrame() if data is None else data
+            with self._lock:
+                self._frames[ticker] = data
+        return data
+
+    def today(self):
+        return self.dates[self.clock.position()[0]]
+
+    def session_day(self, ticker):
+        """Der Bar des Sim-Tags ist vorläufig, bis der letzte Tag abgespielt ist."""
+        return None if self.clock.finished() else self.today()
+
+    def timestamp(self):
+        """Sim-Zeitpunkt als Unix-Zeit (für Alerts, Cooldowns)."""
+        day, frac = self.clock.position()
+        return pd.Timestamp(self.dates[day]).timestamp() + frac * SECONDS_PER_DAY
+
+    def history(self, ticker, period=None, start=None):
+        data = self.frame(ticker)
+        if data.empty:
+            return data
+        day, frac = self.clock.position()
+        today = self.dates[day]
+        dates = data.index.date
+        bar = data[dates == today]
+        data = data[dates < today]
+        if not bar.empty:
+            row = bar.iloc[0]
+            price, high, low, volume = intraday_bar(
+                row["Open"], row["High"], row["Low"], row["Close"], row["Volume"], frac
+            )
+            bar = bar.copy()
+            bar.loc[bar.index[0], ["High", "Low", "Close", "Volume"]] = [
+                float(high), float(low), float(price), float(volume)
+            ]
+            data = pd.concat([data, bar])
+
+        if start is not None:
+            data = data[data.index.date >= pd.Timestamp(start).date()]
+        elif period not in (None, "max"):
+            data = price_store.slice_period(data, period)
+        return data
+
+    def financials(self, ticker):
+        return self.source.financials(ticker)
+
+    def balance_sheet(self, ticker):
+        return self.source.balance_sheet(ticker)
+
+    def calendar(self, ticker):
+        return self.source.calendar(ticker)
+
+    # ---------------------------------------------------------------
+    # Tick-Strom (vektorisiert über alle Ticker)
+    # ---------------------------------------------------------------
+
+    def _matrix(self, tickers):
+        """OHLCV als Arrays (Tage × Ticker) über self.axis, NaN wo kein Bar."""
+        key = tuple(tickers)
+        matrix = self._matrices.get(key)
+        if matrix is None:
+            index = pd.Index(self.axis)
+            columns = {field: [] for field in FIELDS}
+            for ticker in tickers:
+                data = self.frame(ticker)
+                if data.empty:
+                    for field in FIELDS:
+                        columns[field].append(np.full(len(index), np.nan))
+                    continue
+                data = data[~data.index.duplicated(keep="last")]
+                data = data.set_axis(data.index.date).reindex(index)
+                for field in FIELDS:
+                    columns[field].append(data[field].to_numpy(dtype=float))
+            matrix = {field: np.column_stack(values) for field, values in columns.items()}
+            self._matrices[key] = matrix
+        return matrix
+
+    def download(self, tickers, start=None):
+        """
+        Kurze Zeiträume (quotes, latest_bars) direkt aus den Tick-Arrays statt
+        über history() pro Ticker – so misst ein Lasttest den Quote-Pfad und
+        nicht den Simulator. Längere Zeiträume wie in der Basisklasse.
+        """
+        if start is None or pd.Timestamp(start).date() < self.axis[0]:
+            return super().download(tickers, start=start)
+        tickers = [t.upper() for t in tickers]
+        matrix = self._matrix(tickers)
+        day, frac = self.clock.position()
+        last = LOOKBACK_DAYS + day
+        first = min(bisect.bisect_left(self.axis, pd.Timestamp(start).date()), last)
+        bars = {field: matrix[field][first:last + 1].copy() for field in FIELDS}
+        price, high, low, volume = intraday_bar(*(matrix[f][last] for f in FIELDS), frac)
+        bars["High"][-1], bars["Low"][-1] = high, low
+        bars["Close"][-1], bars["Volume"][-1] = price, volume
+
+        index = pd.DatetimeIndex(self.axis[first:last + 1], name="Date")
+        values = np.stack([bars[f] for f in FIELDS], axis=2).reshape(len(index), -1)
+        columns = pd.MultiIndex.from_product([tickers, FIELDS])
+        data = pd.DataFrame(values, index=index, columns=columns)
+        return data.dropna(axis=1, how="all")
+
+    def snapshot_quotes(self, tickers):
+        """Aktueller vorläufiger Bar aller Ticker → {ticker: quote} wie live_quotes."""
+        tickers = [t.upper() for t in tickers]
+        matrix = self._matrix(tickers)
+        day, frac = self.clock.position()
+        row = LOOKBACK_DAYS + day
+        price, high, low, volume = intraday_bar(*(matrix[f][row] for f in FIELDS), frac)
+        date = self.dates[day].isoformat()
+        quotes = {}
+        for i, ticker in enumerate(tickers):
+            if np.isnan(price[i]):
+                continue
+            quotes[ticker] = {
+                "date": date,
+                "Open": float(matrix["Open"][row, i]),
+                "High": float(high[i]),
+                "Low": float(low[i]),
+                "Close": float(price[i]),
+                "Volume": float(volume[i]),
+            }
+        return quotes
+
+    def ticks(self, tickers, interval=1.0):
+        """
+        Endloser Strom (ticker, kurs, sim-zeit) im Echtzeit-Takt: alle
+        `interval` Sekunden ein Kurs pro Ticker, bis der letzte Tag abgespielt ist.
+        """
+        while True:
+            finished = self.clock.finished()
+            at = self.timestamp()
+            for ticker, quote in self.snapshot_quotes(tickers).items():
+                yield ticker, quote["Close"], at
+            if finished:
+                return
+            time.sleep(interval)
+
+
+def simulated_provider_from_spec(spec, days=DEFAULT_DAYS):
+    """'synthetic[@tempo]' | '<aufzeichnung>[@tempo]' → SimulatedProvider."""
+    source, _, speed = (spec or "synthetic").partition("@")
+    speed = float(speed) if speed else DEFAULT_SPEED
+    if source in ("", "synthetic"):
+        return SimulatedProvider(SyntheticProvider(), days=days, speed=speed)
+    return SimulatedProvider(ReplayProvider(source), days=days, speed=speed)
+
+
+# -------------------------------------------------------------------
+# Lasttest: Alerts, Live-Overlay, inkrementelle Indikatoren
+# -------------------------------------------------------------------
+
+class _CountingSink:
+    def __init__(self):
+        self.count = 0
+
+    def emit(self, alert):
+        self.count += 1
+
+
+def _stage(latencies, wall):
+    values = np.asarray(latencies) * 1e6
+    return {
+        "count": len(values),
+        "per_sec": round(len(values) / wall, 1) if wall else None,
+        "p50_us": round(float(np.percentile(values, 50)), 1) if len(values) else None,
+        "p99_us": round(float(np.percentile(values, 99)), 1) if len(values) else None,
+    }
+
+
+def load_test(provider, tickers, seconds=30.0, interval=1.0, fast=False, step=600):
+    """
+    Feed abspielen und messen, was jeder Live-Pfad pro Tick kostet:
+      alerts   AlertEngine.update pro Kurs (Trigger aus den Analysen)
+      quotes   live_quotes.refresh_quotes – ein latest_bars-Abruf + Cache pro Tick
+      splice   Live-Kurs als vorläufigen Bar an die Historie hängen (Chart)
+      apply    analysis_core.apply_quote pro Kurs (inkrementelle Indikatoren)
+    fast=True: ohne Echtzeit-Takt, pro Tick `step` Sim-Sekunden weiter.
+    """
+    from bench_analysis import SyntheticEnvironment  # Temp-Cache, Provider aktivieren
+
+    with SyntheticEnvironment(provider):
+        started = time.perf_counter()
+        analyses = {t: analysis_core.analyze_ticker(t, t, thresholds=THRESHOLDS) for t in tickers}
+        histories = {t: analysis_core.fetch_history(t) for t in tickers}
+        setup = time.perf_counter() - started
+
+        sink = _CountingSink()
+        engine = AlertEngine([sink])
+        engine.load(*build_triggers({"radar_analyses": analyses}, {}))
+
+        if fast:
+            provider.clock.speed = 0.0
+        latencies = {"alerts": [], "quotes": [], "splice": [], "apply": []}
+        ticks = 0
+        wall_started = time.perf_counter()
+        deadline = wall_started + seconds
+        while True:
+            tick_started = time.perf_counter()
+            t0 = time.perf_counter()
+            quotes = live_quotes.refresh_quotes(tickers)
+            latencies["quotes"].append(time.perf_counter() - t0)
+
+            at = provider.timestamp()
+            for ticker, quote in quotes.items():
+                t0 = time.perf_counter()
+                engine.update(ticker, quote["Close"], at)
+                t1 = time.perf_counter()
+                live_quotes.splice(histories.get(ticker), quote)
+                t2 = time.perf_counter()
+                if ticker in analyses:
+                    analyses[ticker] = analysis_core.apply_quote(analyses[ticker], quote, THRESHOLDS)
+                t3 = time.perf_counter()
+                latencies["alerts"].append(t1 - t0)
+                latencies["splice"].append(t2 - t1)
+                latencies["apply"].append(t3 - t2)
+            ticks += 1
+
+            if provider.clock.finished() or time.perf_counter() >= deadline:
+                break
+            if fast:
+                provider.clock.advance(step)
+            else:
+                time.sleep(max(0.0, interval - (time.perf_counter() - tick_started)))
+        wall = time.perf_counter() - wall_started
+
+    day, frac = provider.clock.position()
+    return {
+        "tickers": len(tickers),
+        "setup_s": round(setup, 2),
+        "wall_s": round(wall, 2),
+        "ticks": ticks,
+        "sim_days": round(day + frac, 2),
+        "alerts_fired": sink.count,
+        "stages": {name: _stage(values, wall) for name, values in latencies.items()},
+    }
+
+
+def print_report(result):
+    print(
+        f"\nFeed-Lasttest: {result['tickers']} Ticker, {result['ticks']} Ticks, "
+        f"{result['sim_days']} Sim-Tage in {result['wall_s']} s (Setup {result['setup_s']} s), "
+        f"{result['alerts_fired']} Alerts"
+    )
+    for name, stage in result["stages"].items():
+        if not stage["count"]:
+            continue
+        print(
+            f"  {name:<8} {stage['count']:>9} × {stage['per_sec']:>11.1f}/s  "
+            f"p50 {stage['p50_us']:>9.1f} µs  p99 {stage['p99_us']:>9.1f} µs"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulierter Kurs-Feed & Lasttest der Live-Pfade")
+    parser.add_argument("--source", default="synthetic", help="'synthetic' oder Aufzeichnungs-Verzeichnis")
+    parser.add_argument("--tickers", type=int, default=DEFAULT_TICKERS, help="Anzahl Ticker")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="abgespielte Handelstage")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED,
+                        help="Sim-Sekunden pro Sekunde (1440 = 1 Tag/Minute)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="maximale Laufzeit")
+    parser.add_argument("--interval", type=float, default=1.0, help="Sekunden zwischen zwei Ticks")
+    parser.add_argument("--fast", action="store_true", help="ohne Echtzeit-Takt abspielen")
+    parser.add_argument("--step", type=float, default=600, help="Sim-Sekunden pro Tick bei --fast")
+    parser.add_argument("--emit", action="store_true",
+                        help="Ticks als 'TICKER,KURS,ZEIT' auf stdout ausgeben (statt Lasttest)")
+    args = parser.parse_args()
+
+    provider = simulated_provider_from_spec(f"{args.source}@{args.speed}", days=args.days)
+    if isinstance(provider.source, ReplayProvider):
+        tickers = provider.source.tickers()[:args.tickers]
+    else:
+        tickers = [e["ticker"] for e in synthetic_universe(args.tickers)]
+
+    if args.emit:
+        try:
+            for ticker, price, at in provider.ticks(tickers, args.interval):
+                print(f"{ticker},{price:.4f},{at:.0f}", flush=True)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        return 0
+
+    print(f"… {len(tickers)} Ticker analysieren", file=sys.stderr)
+    print_report(load_test(provider, tickers, args.seconds, args.interval, args.fast, args.step))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
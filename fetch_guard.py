@@ -0,0 +1,266 @@
+import threading
+import time
+
+import cache_store
+from data_providers import MarketDataProvider, get_provider
+
+# -------------------------------------------------------------------
+# Negativ-Cache & Circuit Breaker vor dem Daten-Provider
+# -------------------------------------------------------------------
+#
+# Negativ-Cache: pro (Art, Ticker) werden Fehlschläge im cache_store
+# (Namespace "failures") gezählt. Bis retry_at wird nicht erneut gefragt;
+# die Wartezeit verdoppelt sich mit jedem weiteren Fehlschlag.
+#
+# Circuit Breaker: häufen sich Fehler des Providers (oder meldet er ein
+# Rate-Limit), werden für eine Abkühlphase gar keine Remote-Aufrufe mehr
+# gemacht. Danach darf ein Probeaufruf durch; scheitert er, wird die
+# Abkühlphase verdoppelt.
+
+FAILURE_NS = "failures"
+
+BACKOFF_BASE = 15 * 60        # erste Wartezeit nach einem Fehlschlag (Sekunden)
+BACKOFF_MAX = 24 * 60 * 60    # längste Wartezeit
+
+BREAKER_THRESHOLD = 5          # aufeinanderfolgende Fehler bis zum Öffnen
+BREAKER_COOLDOWN = 60          # erste Abkühlphase (Sekunden)
+BREAKER_COOLDOWN_MAX = 15 * 60
+
+_BREAKER_LOCK = threading.Lock()
+_BREAKER = {
+    "errors": 0,          # aufeinanderfolgende Fehler
+    "open_until": 0.0,
+    "cooldown": BREAKER_COOLDOWN,
+    "half_open": False,   # Abkühlphase vorbei, nächster Aufruf ist der Probeaufruf
+    "trips": 0,
+    "last_error": None,
+}
+
+
+class FetchSkipped(Exception):
+    """Aufruf wurde bewusst nicht gemacht (kein Provider-Fehler)."""
+
+
+class CircuitOpenError(FetchSkipped):
+    pass
+
+
+class TickerBlockedError(FetchSkipped):
+    pass
+
+
+def is_rate_limit(error):
+    text = f"{type(error).__name__} {error}"
+    return "RateLimit" in text or "Too Many Requests" in text or "429" in text
+
+
+# -------------------------------------------------------------------
+# Negativ-Cache
+# -------------------------------------------------------------------
+
+def _key(kind, ticker):
+    return f"{kind}:{ticker.upper()}"
+
+
+def failure_info(ticker, kind):
+    stored = cache_store.get(FAILURE_NS, _key(kind, ticker))
+    return None if stored is None else stored[0]
+
+
+def is_blocked(ticker, kind):
+    info = failure_info(ticker, kind)
+    return info is not None and time.time() < info["retry_at"]
+
+
+def is_provider_failure(error, ticker, kind):
+    """
+    Kam eine Exception vom Provider (bzw. wurde der Aufruf übersprungen)?
+    Parserfehler auf gültigen Antworten zählen nicht dazu.
+    """
+    if isinstance(error, FetchSkipped):
+        return True
+    return is_blocked(ticker, kind) or breaker_state()["state"] == "open"
+
+
+def record_failure(ticker, kind, error):
+    """Fehlschlag zählen und die nächste Wartezeit festlegen."""
+    now = time.time()
+    info = failure_info(ticker, kind) or {"failures": 0, "first_failed_at": now}
+    failures = info["failures"] + 1
+    backoff = min(BACKOFF_BASE * 2 ** (failures - 1), BACKOFF_MAX)
+    cache_store.put(
+        FAILURE_NS,
+        _key(kind, ticker),
+        {
+            "failures": failures,
+            "first_failed_at": info["first_failed_at"],
+            "retry_at": now + backoff,
+            "error": str(error)[:200],
+        },
+    )
+
+
+def record_success(ticker, kind):
+    if failure_info(ticker, kind) is not None:
+        cache_store.delete(FAILURE_NS, _key(kind, ticker))
+
+
+def broken_symbols():
+    """Alle Ticker mit Fehlschlägen, die meisten zuerst (für Diagnose & Radar)."""
+    now = time.time()
+    out = []
+    for key, (info, _ts) in cache_store.items(FAILURE_NS).items():
+        kind, _, ticker = key.partition(":")
+        out.append(
+            {
+                "ticker": ticker,
+                "kind": kind,
+                "failures": info["failures"],
+                "error": info["error"],
+                "since": info["first_failed_at"],
+                "retry_in_s": max(0.0, info["retry_at"] - now),
+            }
+        )
+    return sorted(out, key=lambda x: (-x["failures"], x["ticker"]))
+
+
+# -------------------------------------------------------------------
+# Circuit Breaker
+# -------------------------------------------------------------------
+
+def breaker_allows():
+    with _BREAKER_LOCK:
+        if _BREAKER["open_until"] == 0.0:
+            return True
+        if time.time() < _BREAKER["open_until"]:
+            return False
+        _BREAKER["open_until"] = 0.0
+        _BREAKER["half_open"] = True
+        return True
+
+
+def _trip(now):
+    _BREAKER["open_until"] = now + _BREAKER["cooldown"]
+    _BREAKER["cooldown"] = min(_BREAKER["cooldown"] * 2, BREAKER_COOLDOWN_MAX)
+    _BREAKER["errors"] = 0
+    _BREAKER["half_open"] = False
+    _BREAKER["trips"] += 1
+
+
+def breaker_failure(error, rate_limited=False):
+    with _BREAKER_LOCK:
+        _BREAKER["last_error"] = str(error)[:200]
+        _BREAKER["errors"] += 1
+        if rate_limited or _BREAKER["half_open"] or _BREAKER["errors"] >= BREAKER_THRESHOLD:
+            _trip(time.time())
+
+
+def breaker_success():
+    with _BREAKER_LOCK:
+        _BREAKER["errors"] = 0
+        if _BREAKER["half_open"]:
+            _BREAKER["half_open"] = False
+            _BREAKER["cooldown"] = BREAKER_COOLDOWN
+
+
+def breaker_state():
+    with _BREAKER_LOCK:
+        open_for = max(0.0, _BREAKER["open_until"] - time.time())
+        if open_for > 0:
+            state = "open"
+        elif _BREAKER["half_open"]:
+            state = "half_open"
+        else:
+            state = "closed"
+        return {
+            "state": state,
+            "open_for_s": open_for,
+            "consecutive_errors": _BREAKER["errors"],
+            "trips": _BREAKER["trips"],
+            "last_error": _BREAKER["last_error"],
+        }
+
+
+def reset_breaker():
+    with _BREAKER_LOCK:
+        _BREAKER.update(
+            errors=0, open_until=0.0, cooldown=BREAKER_COOLDOWN, half_open=False, last_error=None
+        )
+
+
+# -------------------------------------------------------------------
+# Provider-Hülle
+# -------------------------------------------------------------------
+
+class GuardedProvider(MarketDataProvider):
+    """
+    Legt Negativ-Cache und Circuit Breaker um einen Provider.
+    Übersprungene Aufrufe werfen FetchSkipped – Aufrufer behandeln das wie
+    jeden anderen Fehler (gespeicherten Stand nutzen bzw. None).
+    Arten im Negativ-Cache: history, fundamentals, earnings.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    def _call(self, ticker, kind, fn, *args, **kwargs):
+        if not breaker_allows():
+            raise CircuitOpenError(f"Provider pausiert ({breaker_state()['last_error']})")
+        if ticker and is_blocked(ticker, kind):
+            raise TickerBlockedError(f"{ticker}: Retry erst nach Backoff")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            rate_limited = is_rate_limit(e)
+            breaker_failure(e, rate_limited)
+            # Rate-Limits sind nicht die Schuld des Tickers
+            if ticker and not rate_limited:
+                record_failure(ticker, kind, e)
+            raise
+        breaker_success()
+        return result
+
+    def history(self, ticker, period=None, start=None):
+        data = self._call(ticker, "history", self.inner.history, ticker, period=period, start=start)
+        if data is not None and not data.empty:
+            record_success(ticker, "history")
+        elif start is None:
+            # komplette Historie leer → delistet oder Tippfehler
+            record_failure(ticker, "history", "keine Kursdaten")
+        return data
+
+    def download(self, tickers, start=None):
+        return self._call(None, "history", self.inner.download, tickers, start=start)
+
+    def financials(self, ticker):
+        return self._call(ticker, "fundamentals", self.inner.financials, ticker)
+
+    def balance_sheet(self, ticker):
+        value = self._call(ticker, "fundamentals", self.inner.balance_sheet, ticker)
+        record_success(ticker, "fundamentals")
+        return value
+
+    def calendar(self, ticker):
+        value = self._call(ticker, "earnings", self.inner.calendar, ticker)
+        record_success(ticker, "earnings")
+        return value
+
+    def today(self):
+        return self.inner.today()
+
+    def session_day(self, ticker):
+        return self.inner.session_day(ticker)
+
+
+_GUARDED = {}  # id(Provider) -> (Provider, GuardedProvider)
+
+
+def guarded_provider():
+    """Aktiven Provider mit Negativ-Cache & Circuit Breaker."""
+    inner = get_provider()
+    entry = _GUARDED.get(id(inner))
+    if entry is None or entry[0] is not inner:
+        entry = (inner, GuardedProvider(inner))
+        _GUARDED[id(inner)] = entry
+    return entry[1]
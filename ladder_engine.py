@@ -0,0 +1,191 @@
+from config_utils import load_ai_universe
+
+# ---------------------------------------------------------------
+# Ladder-Sell-Engine – Basislogik
+# ---------------------------------------------------------------
+
+LADDER_LEVELS = [0.30, 0.50, 0.75, 1.00, 1.50, 2.00]  # +30 %, +50 %, ...
+
+
+def _get_exposure_map():
+    uni = load_ai_universe()
+    exposure_map = {}
+    for entry in uni.get("ai_universe", []):
+        ticker = (entry.get("ticker") or "").upper()
+        if ticker:
+            exposure_map[ticker] = entry.get("exposure")
+    return exposure_map
+
+
+def _core_and_ladder_pct(exposure):
+    """
+    Core- und Ladder-Anteile anhand AI-Exposure:
+    - 9–10: 20 % Core behalten, 80 % laddern
+    - 7–8 : 10 % Core behalten, 90 % laddern
+    - 1–6 : 0 % Core, 100 % laddern (Komplett-Verkauf über Zeit)
+    """
+    if exposure is None:
+        return 0.0, 1.0
+    if exposure >= 9:
+        return 0.20, 0.80
+    if exposure >= 7:
+        return 0.10, 0.90
+    return 0.0, 1.0
+
+
+def compute_ladder_signals(rows):
+    """
+    Alte Übersicht: Ladder-Engine ohne Fortschrittstracking.
+    Wird weiterhin im Portfolio-Tab als Gesamtübersicht verwendet.
+    """
+    exposure_map = _get_exposure_map()
+    signals = []
+
+    for r in rows:
+        ticker = r.get("Ticker")
+        name = r.get("Name")
+        shares = r.get("Stücke") or 0
+        pl_pct = r.get("P/L %")
+
+        if not ticker or shares <= 0:
+            continue
+        if pl_pct is None or pl_pct <= 0:
+            continue
+
+        exposure = exposure_map.get((ticker or "").upper())
+        core_pct, ladder_pct = _core_and_ladder_pct(exposure)
+
+        ladder_shares = int(shares * ladder_pct)
+        if ladder_shares <= 0:
+            continue
+
+        profit_frac = pl_pct / 100
+        reached = sum(1 for lvl in LADDER_LEVELS if profit_frac >= lvl)
+        if reached == 0:
+            continue
+
+        frac = reached / len(LADDER_LEVELS)
+        to_sell = int(ladder_shares * frac)
+        if to_sell <= 0:
+            continue
+
+        if core_pct >= 0.19:
+            core_text = "20 % Core halten (Exposure 9–10)"
+        elif core_pct >= 0.09:
+            core_text = "10 % Core halten (Exposure 7–8)"
+        else:
+            core_text = "kein Core – komplette Position über Ladder verwalten"
+
+        signals.append(
+            {
+                "Name": name,
+                "Ticker": ticker,
+                "Exposure": exposure,
+                "Gewinn %": round(pl_pct, 1),
+                "Empfohlen zu verkaufen": to_sell,
+                "Core-Hinweis": core_text,
+            }
+        )
+
+    return signals
+
+
+# ---------------------------------------------------------------
+# Ladder-Sell-Engine – tagesaktuelle Aktionen mit Fortschritt
+# ---------------------------------------------------------------
+
+
+def compute_daily_ladder_actions(rows, ladder_progress):
+    exposure_map = _get_exposure_map()
+    signals = []
+
+    for r in rows:
+        ticker_raw = r.get("Ticker")
+        ticker = (ticker_raw or "").upper()
+        name = r.get("Name")
+        shares = r.get("Stücke") or 0
+        pl_pct = r.get("P/L %")
+
+        if not ticker or shares <= 0:
+            continue
+        if pl_pct is None or pl_pct <= 0:
+            continue
+
+        exposure = exposure_map.get(ticker)
+        core_pct, ladder_pct = _core_and_ladder_pct(exposure)
+
+        ladder_shares = int(shares * ladder_pct)
+        if ladder_shares <= 0:
+            continue
+
+        profit_frac = pl_pct / 100
+        max_levels = len(LADDER_LEVELS)
+        levels_done = int(ladder_progress.get(ticker, 0))
+
+        if levels_done >= max_levels:
+            continue
+
+        next_level_threshold = LADDER_LEVELS[levels_done]
+        if profit_frac < next_level_threshold:
+            continue
+
+        frac_done = levels_done / max_levels
+        frac_after = (levels_done + 1) / max_levels
+        to_sell_before = int(ladder_shares * frac_done)
+        to_sell_after = int(ladder_shares * frac_after)
+        to_sell = max(0, to_sell_after - to_sell_before)
+
+        if to_sell <= 0:
+            continue
+
+        if core_pct >= 0.19:
+            core_text = "20 % Core halten (Exposure 9–10)"
+        elif core_pct >= 0.09:
+            core_text = "10 % Core halten (Exposure 7–8)"
+        else:
+            core_text = "kein Core – komplette Position über Ladder verwalten"
+
+        signals.append(
+            {
+                "Name": name,
+                "Ticker": ticker_raw,
+                "TickerKey": ticker,
+                "Exposure": exposure,
+                "Gewinn %": round(pl_pct, 1),
+                "Aktuelle Stufe": f"{levels_done}/{max_levels}",
+                "Nächste Stufe": f"{levels_done + 1}/{max_levels}",
+                "Schwelle nächste Stufe (%)": int(next_level_threshold * 100),
+                "Empfohlen zu verkaufen": to_sell,
+                "Core-Hinweis": core_text,
+            }
+        )
+
+    return signals
+
+
+def next_ladder_trigger(ticker, shares, buy_price, ladder_progress, exposure_map=None):
+    """
+    Kurs, ab dem compute_daily_ladder_actions für diese Position die nächste
+    Stufe meldet → (Kurs, Stufe) oder None (keine weitere Stufe / nichts zu verkaufen).
+    """
+    ticker = (ticker or "").upper()
+    if not ticker or not shares or shares <= 0 or not buy_price:
+        return None
+
+    exposure_map = exposure_map if exposure_map is not None else _get_exposure_map()
+    _core_pct, ladder_pct = _core_and_ladder_pct(exposure_map.get(ticker))
+    ladder_shares = int(shares * ladder_pct)
+    if ladder_shares <= 0:
+        return None
+
+    max_levels = len(LADDER_LEVELS)
+    levels_done = int(ladder_progress.get(ticker, 0))
+    if levels_done >= max_levels:
+        return None
+
+    frac_done = levels_done / max_levels
+    frac_after = (levels_done + 1) / max_levels
+    if int(ladder_shares * frac_after) - int(ladder_shares * frac_done) <= 0:
+        return None
+
+    return buy_price * (1 + LADDER_LEVELS[levels_done]), levels_done + 1
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import cache_store
+from fetch_guard import guarded_provider
+
+# -------------------------------------------------------------------
+# Live-Kurse (intraday) über der gecachten Daily-Historie
+# -------------------------------------------------------------------
+#
+# Statt für einen aktuellen Kurs die Historie jedes Tickers neu zu laden,
+# holt refresh_quotes() für alle Ticker auf einmal nur die jüngsten Bars
+# (provider.latest_bars, ein Abruf) und legt den letzten Bar pro Ticker im
+# geteilten Cache ab (Namespace "quotes"). Alle Sessions und Prozesse
+# nutzen denselben Stand, höchstens alle QUOTE_MAX_AGE Sekunden wird neu
+# geladen.
+#
+# splice() hängt einen Quote als vorläufigen letzten Bar an eine Historie;
+# analysis_core.apply_quote rechnet daraus nur die kursabhängigen Felder neu.
+
+QUOTE_NS = "quotes"
+QUOTE_MAX_AGE = 60  # Sekunden
+
+_LOCK = threading.Lock()  # ein Abruf gleichzeitig pro Prozess
+
+
+QUOTE_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _last_bar(bars):
+    bars = bars.dropna(subset=["Close"]) if "Close" in bars else bars.iloc[0:0]
+    if bars.empty:
+        return None
+    last = bars.iloc[-1]
+    quote = {"date": bars.index[-1].strftime("%Y-%m-%d")}
+    for column in QUOTE_FIELDS:
+        value = last.get(column)
+        quote[column] = None if value is None or pd.isna(value) else float(value)
+    return quote
+
+
+def _last_bars(data, tickers):
+    """
+    Letzter Bar mit Close pro Ticker aus einem download()-Frame (Spalten
+    Ticker, Feld) – vektorisiert über alle Ticker statt ein Teil-Frame pro Ticker.
+    """
+    present = set(data.columns.get_level_values(0))
+    tickers = [t for t in tickers if t in present]
+    if not tickers or "Close" not in data.columns.get_level_values(1):
+        return {}
+
+    values = {}
+    for column in QUOTE_FIELDS:
+        if column in data.columns.get_level_values(1):
+            frame = data.xs(column, axis=1, level=1).reindex(columns=tickers)
+            values[column] = frame.to_numpy(dtype=float)
+    valid = ~np.isnan(values["Close"])
+    last = len(valid) - 1 - valid[::-1].argmax(axis=0)
+    dates = data.index.strftime("%Y-%m-%d")
+
+    quotes = {}
+    for j, ticker in enumerate(tickers):
+        i = last[j]
+        if not valid[i, j]:
+            continue
+        quote = {"date": dates[i]}
+        for column in QUOTE_FIELDS:
+            value = values[column][i, j] if column in values else np.nan
+            quote[column] = None if np.isnan(value) else float(value)
+        quotes[ticker] = quote
+    return quotes
+
+
+def refresh_quotes(tickers):
+    """Jüngsten Bar aller Ticker in einem Abruf holen und cachen → {ticker: quote}."""
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    if not tickers:
+        return {}
+    try:
+        data = guarded_provider().latest_bars(tickers)
+    except Exception:
+        return {}
+    if data is None or data.empty:
+        return {}
+
+    if isinstance(data.columns, pd.MultiIndex):
+        quotes = _last_bars(data, tickers)
+    elif len(tickers) == 1:
+        quote = _last_bar(data)
+        quotes = {} if quote is None else {tickers[0]: quote}
+    else:
+        quotes = {}
+    if quotes:
+        cache_store.put_many(QUOTE_NS, quotes)
+    return quotes
+
+
+def cached_quote(ticker, max_age=QUOTE_MAX_AGE):
+    """Gecachter Quote, falls jünger als max_age (None = egal wie alt)."""
+    stored = cache_store.get(QUOTE_NS, ticker.upper())
+    if stored is None:
+        return None
+    quote, fetched_at = stored
+    if max_age is not None and time.time() - fetched_at >= max_age:
+        return None
+    return {**quote, "fetched_at": fetched_at}
+
+
+def get_quotes(tickers, max_age=QUOTE_MAX_AGE):
+    """
+    Aktuelle Quotes für viele Ticker: aus dem Cache, fehlende/veraltete in
+    einem gemeinsamen Abruf nachladen.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    quotes = {}
+    for ticker in tickers:
+        quote = cached_quote(ticker, max_age)
+        if quote is not None:
+            quotes[ticker] = quote
+
+    missing = [t for t in tickers if t not in quotes]
+    if missing:
+        with _LOCK:
+            fetched_at = time.time()
+            for ticker, quote in refresh_quotes(missing).items():
+                quotes[ticker] = {**quote, "fetched_at": fetched_at}
+    return quotes
+
+
+def splice(hist, quote):
+    """
+    Quote als vorläufigen letzten Bar einsetzen: gleicher Tag → ersetzen,
+    neuer Tag → anhängen, älter → Historie unverändert.
+    """
+    if hist is None or hist.empty or not quote or quote.get("Close") is None:
+        return hist
+    last = hist.index[-1]
+    day = pd.Timestamp(quote["date"])
+    if last.tzinfo is not None:
+        day = day.tz_localize(last.tzinfo)
+    if day.normalize() < last.normalize():
+        return hist
+
+    row = {c: quote.get(c) for c in ("Open", "High", "Low", "Close", "Volume") if c in hist.columns}
+    if day.normalize() == last.normalize():
+        data = hist.copy()
+        for column, value in row.items():
+            if value is not None:
+                data.loc[last, column] = value
+    else:
+        index = pd.DatetimeIndex([day], name=hist.index.name)
+        data = pd.concat([hist, pd.DataFrame([row], index=index)])
+    data.attrs["provisional"] = True
+    return data
@@ -0,0 +1,201 @@
+import threading
+from array import array
+
+# -------------------------------------------------------------------
+# Lot-Buchhaltung über das Trade-Journal (FIFO / Durchschnittskosten)
+# -------------------------------------------------------------------
+#
+# Jeder Kauf eröffnet ein Lot (Stückzahl, Kaufkurs). Ein Verkauf schließt
+# bei "fifo" die ältesten Lots zuerst, bei "average" anteilig zum
+# Durchschnittskurs. Daraus ergeben sich pro Ticker offene Stücke, Einstand
+# der offenen Lots und realisierter Gewinn/Verlust; unrealisiert ist
+# (Kurs − Einstand) × offene Stücke.
+#
+# Lots liegen pro Ticker in array('d')-Spalten mit einem Kopf-Index: Kaufen
+# hängt an, Verkaufen schiebt den Kopf weiter, verbrauchte Lots werden nur
+# gelegentlich abgeschnitten. Offene Stücke und Einstand laufen als Summen
+# mit, Abfragen kosten also nichts.
+#
+# Das Buch merkt sich, wie weit das Journal verbucht ist, und verbucht bei
+# neuen Einträgen (hinten angehängt, nicht rückdatiert) nur diese. Wurden
+# ältere Einträge gelöscht/geändert oder rückdatiert, wird neu aufgebaut.
+
+COST_METHODS = ("fifo", "average")
+DEFAULT_COST_METHOD = "fifo"
+
+EPSILON = 1e-9
+COMPACT_AFTER = 1024  # verbrauchte Lots, ab denen die Arrays gekürzt werden
+
+_BOOKS = {}  # Methode -> LotBook (pro Prozess)
+_LOCK = threading.Lock()
+
+
+class _Position:
+    __slots__ = ("shares", "prices", "head", "open_shares", "open_cost", "realized", "unmatched")
+
+    def __init__(self):
+        self.shares = array("d")
+        self.prices = array("d")
+        self.head = 0
+        self.open_shares = 0.0
+        self.open_cost = 0.0
+        self.realized = 0.0
+        self.unmatched = 0.0  # Verkäufe ohne offene Stücke (nicht verbucht)
+
+
+class LotBook:
+    """Offene Lots und realisierter G/V pro Ticker für eine Kostenmethode."""
+
+    def __init__(self, method=DEFAULT_COST_METHOD):
+        if method not in COST_METHODS:
+            raise ValueError(f"Unbekannte Kostenmethode: {method}")
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self.positions = {}
+        self.applied = 0        # verbuchte Journal-Einträge
+        self.last_entry = None  # zuletzt verbuchter Eintrag (Prüfung auf Änderungen)
+        self.last_date = ""
+
+    # ---------------------------------------------------------------
+    # Buchen
+    # ---------------------------------------------------------------
+
+    def book(self, ticker, shares, price):
+        """Kauf (shares > 0) oder Verkauf (shares < 0) verbuchen."""
+        pos = self.positions.get(ticker)
+        if pos is None:
+            pos = self.positions[ticker] = _Position()
+        if shares > 0:
+            self._buy(pos, shares, price)
+        elif shares < 0:
+            self._sell(pos, -shares, price)
+
+    def _buy(self, pos, shares, price):
+        pos.open_shares += shares
+        pos.open_cost += shares * price
+        if self.method == "fifo":
+            pos.shares.append(shares)
+            pos.prices.append(price)
+
+    def _sell(self, pos, shares, price):
+        matched = min(shares, pos.open_shares)
+        pos.unmatched += shares - matched
+        if matched <= EPSILON:
+            return
+
+        if self.method == "average":
+            avg = pos.open_cost / pos.open_shares
+            pos.realized += matched * (price - avg)
+            pos.open_cost -= matched * avg
+        else:
+            remaining = matched
+            lots, prices = pos.shares, pos.prices
+            while remaining > EPSILON and pos.head < len(lots):
+                take = min(remaining, lots[pos.head])
+                pos.realized += take * (price - prices[pos.head])
+                pos.open_cost -= take * prices[pos.head]
+                lots[pos.head] -= take
+                remaining -= take
+                if lots[pos.head] <= EPSILON:
+                    pos.head += 1
+            if pos.head >= COMPACT_AFTER and pos.head * 2 >= len(lots):
+                del lots[:pos.head]
+                del prices[:pos.head]
+                pos.head = 0
+
+        pos.open_shares -= matched
+        if pos.open_shares <= EPSILON:
+            pos.open_shares = pos.open_cost = 0.0
+            if self.method == "fifo":
+                del pos.shares[:]
+                del pos.prices[:]
+                pos.head = 0
+
+    def apply(self, entry):
+        """Einen Journal-Eintrag verbuchen (Vorzeichen wie rebuild_portfolio_from_journal)."""
+        ticker = (entry.get("ticker") or "").upper()
+        if not ticker:
+            return
+        shares = abs(float(entry.get("shares") or 0))
+        if entry.get("type", "Kauf") == "Verkauf":
+            shares = -shares
+        self.book(ticker, shares, float(entry.get("price") or 0))
+
+    # ---------------------------------------------------------------
+    # Journal nachführen
+    # ---------------------------------------------------------------
+
+    def sync(self, journal):
+        """Buch auf den Stand des Journals bringen (inkrementell, wenn möglich)."""
+        new = journal[self.applied:]
+        unchanged = (
+            len(journal) >= self.applied
+            and (self.applied == 0 or journal[self.applied - 1] == self.last_entry)
+        )
+        dates = [e.get("date") or "" for e in new]
+        in_order = all(a <= b for a, b in zip([self.last_date] + dates, dates))
+        if not (unchanged and in_order):
+            self.reset()
+            new = sorted(journal, key=lambda e: e.get("date") or "")
+
+        for entry in new:
+            self.apply(entry)
+            self.last_date = max(self.last_date, entry.get("date") or "")
+        self.applied = len(journal)
+        self.last_entry = dict(journal[-1]) if journal else None
+        return self
+
+    # ---------------------------------------------------------------
+    # Abfragen
+    # ---------------------------------------------------------------
+
+    def position(self, ticker):
+        """Offene Stücke, Einstand, investiertes Kapital, realisierter G/V eines Tickers."""
+        pos = self.positions.get((ticker or "").upper())
+        if pos is None:
+            return None
+        shares = pos.open_shares
+        return {
+            "shares": shares,
+            "cost_basis": pos.open_cost / shares if shares > EPSILON else None,
+            "invested": pos.open_cost,
+            "realized": pos.realized,
+            "lots": (len(pos.shares) - pos.head) if self.method == "fifo" else int(shares > EPSILON),
+            "unmatched": pos.unmatched,
+        }
+
+    def summary(self):
+        return {ticker: self.position(ticker) for ticker in self.positions}
+
+
+def unrealized(position, price):
+    """Unrealisierter G/V der offenen Lots zum Kurs price."""
+    if not position or not price or position["cost_basis"] is None:
+        return None
+    return (price - position["cost_basis"]) * position["shares"]
+
+
+def positions_for(cfg):
+    """
+    Lot-Stand aller Ticker aus dem Journal der Config → {ticker: position}.
+    Das Buch wird pro Prozess gehalten und nur um neue Einträge ergänzt.
+    """
+    method = cfg.get("cost_method", DEFAULT_COST_METHOD)
+    with _LOCK:
+        book = _BOOKS.get(method)
+        if book is None:
+            book = _BOOKS[method] = LotBook(method)
+        return book.sync(cfg.get("journal", [])).summary()
+
+
+def summarize(trades, method=DEFAULT_COST_METHOD):
+    """Lot-Stand aus einer Trade-Liste einer Position (Stückzahl mit Vorzeichen)."""
+    book = LotBook(method)
+    for trade in sorted(trades, key=lambda t: t.get("date") or ""):
+        book.book("_", float(trade.get("shares") or 0), float(trade.get("price") or 0))
+    return book.position("_") or {
+        "shares": 0.0, "cost_basis": None, "invested": 0.0,
+        "realized": 0.0, "lots": 0, "unmatched": 0.0,
+    }
@@ -0,0 +1,251 @@
+import functools
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# -------------------------------------------------------------------
+# Börsenkalender: wann kann es einen neuen Daily-Bar geben?
+# -------------------------------------------------------------------
+#
+# Ein gespeicherter Daily-Stand bleibt gültig, bis nach ihm ein weiterer
+# Handelstag geschlossen hat (+ BAR_SETTLE, bis der Bar beim Provider
+# final ist). Am Wochenende, an Feiertagen und während des Handelstags
+# vor dem Schluss ist also kein Abruf nötig.
+#
+# Börse pro Ticker-Suffix; Feiertage regelbasiert (keine Zusatz-Pakete).
+
+BAR_SETTLE = timedelta(minutes=30)
+
+# Unbekannte Suffixe: altes, rein zeitbasiertes Verhalten (Sekunden)
+FALLBACK_MAX_AGE = 4 * 60 * 60
+
+EXCHANGES = {
+    "US": {"tz": "America/New_York", "open": (9, 30), "close": (16, 0)},
+    "XETRA": {"tz": "Europe/Berlin", "open": (9, 0), "close": (17, 30)},
+    "LSE": {"tz": "Europe/London", "open": (8, 0), "close": (16, 30)},
+    "EURONEXT": {"tz": "Europe/Paris", "open": (9, 0), "close": (17, 30)},
+    "SIX": {"tz": "Europe/Zurich", "open": (9, 0), "close": (17, 30)},
+    "TSX": {"tz": "America/Toronto", "open": (9, 30), "close": (16, 0)},
+    "NSE": {"tz": "Asia/Kolkata", "open": (9, 15), "close": (15, 30)},
+    "TSE": {"tz": "Asia/Tokyo", "open": (9, 0), "close": (15, 30)},
+    "HKEX": {"tz": "Asia/Hong_Kong", "open": (9, 30), "close": (16, 0)},
+    "KRX": {"tz": "Asia/Seoul", "open": (9, 0), "close": (15, 30)},
+    "TWSE": {"tz": "Asia/Taipei", "open": (9, 0), "close": (13, 30)},
+    "ASX": {"tz": "Australia/Sydney", "open": (10, 0), "close": (16, 0)},
+}
+
+SUFFIX_EXCHANGE = {
+    "": "US",
+    "DE": "XETRA", "F": "XETRA", "BE": "XETRA", "MU": "XETRA", "SG": "XETRA",
+    "L": "LSE", "IL": "LSE",
+    "PA": "EURONEXT", "AS": "EURONEXT", "BR": "EURONEXT", "LS": "EURONEXT",
+    "SW": "SIX",
+    "TO": "TSX", "V": "TSX",
+    "NS": "NSE", "BO": "NSE",
+    "T": "TSE",
+    "HK": "HKEX",
+    "KS": "KRX", "KQ": "KRX",
+    "TW": "TWSE", "TWO": "TWSE",
+    "AX": "ASX",
+}
+
+
+def exchange_for(ticker):
+    """Börse zum Ticker (Indizes wie ^GSPC → US); None bei unbekanntem Suffix."""
+    ticker = ticker.upper()
+    suffix = ticker.rsplit(".", 1)[1] if "." in ticker and not ticker.startswith("^") else ""
+    return SUFFIX_EXCHANGE.get(suffix)
+
+
+# -------------------------------------------------------------------
+# Feiertage
+# -------------------------------------------------------------------
+
+def easter_sunday(year):
+    """Ostersonntag (gregorianisch, anonymer Algorithmus)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ter Wochentag im Monat (n=-1: letzter). weekday: Mo=0 … So=6."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _us_observed(day):
+    """NYSE: Samstag → Freitag davor, Sonntag → Montag danach."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _us_holidays(year):
+    easter = easter_sunday(year)
+    days = {
+        _nth_weekday(year, 1, 0, 3),   # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),   # Presidents Day
+        easter - timedelta(days=2),    # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _us_observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),   # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _us_observed(date(year, 12, 25)),
+    }
+    # Neujahr auf Samstag wird nicht am Freitag davor nachgeholt
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_us_observed(new_year))
+    if year >= 2022:
+        days.add(_us_observed(date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def _xetra_holidays(year):
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1),
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        date(year, 5, 1),
+        date(year, 12, 24),
+        date(year, 12, 25),
+        date(year, 12, 26),
+        date(year, 12, 31),
+    }
+
+
+def _uk_holidays(year):
+    easter = easter_sunday(year)
+    new_year = date(year, 1, 1)
+    while new_year.weekday() >= 5:
+        new_year += timedelta(days=1)
+    days = {
+        new_year,
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        _nth_weekday(year, 5, 0, 1),   # Early May
+        _nth_weekday(year, 5, 0, -1),  # Spring Bank Holiday
+        _nth_weekday(year, 8, 0, -1),  # Summer Bank Holiday
+    }
+    # Weihnachten/Boxing Day mit Ersatztagen
+    christmas, boxing = date(year, 12, 25), date(year, 12, 26)
+    if christmas.weekday() == 5:
+        christmas, boxing = christmas + timedelta(days=2), boxing + timedelta(days=2)
+    elif christmas.weekday() == 6:
+        christmas, boxing = christmas + timedelta(days=2), boxing
+    elif boxing.weekday() == 5:
+        boxing += timedelta(days=2)
+    days.update({christmas, boxing})
+    return days
+
+
+def _euronext_holidays(year):
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1),
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        date(year, 5, 1),
+        date(year, 12, 25),
+        date(year, 12, 26),
+    }
+
+
+HOLIDAY_RULES = {
+    "US": _us_holidays,
+    "XETRA": _xetra_holidays,
+    "LSE": _uk_holidays,
+    "EURONEXT": _euronext_holidays,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def holidays(exchange, year):
+    """Feiertage einer Börse (ohne Regeln: nur Wochenenden)."""
+    rule = HOLIDAY_RULES.get(exchange)
+    return frozenset(rule(year)) if rule else frozenset()
+
+
+def is_trading_day(exchange, day):
+    return day.weekday() < 5 and day not in holidays(exchange, day.year)
+
+
+# -------------------------------------------------------------------
+# Gültigkeit
+# -------------------------------------------------------------------
+
+def last_bar_time(exchange, now=None):
+    """Zeitpunkt, ab dem der jüngste fertige Daily-Bar beim Provider vorliegt."""
+    cfg = EXCHANGES[exchange]
+    tz = ZoneInfo(cfg["tz"])
+    local = (now or datetime.now(timezone.utc)).astimezone(tz)
+    day = local.date()
+    hour, minute = cfg["close"]
+    while True:
+        if is_trading_day(exchange, day):
+            ready = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz) + BAR_SETTLE
+            if ready <= local:
+                return ready
+        day -= timedelta(days=1)
+
+
+def is_current(ticker, fetched_at, now=None):
+    """
+    Ist ein um fetched_at (Unix-Zeit) geladener Daily-Stand noch aktuell?
+    True, solange seitdem kein weiterer Bar fertig geworden ist.
+    """
+    exchange = exchange_for(ticker)
+    if exchange is None:
+        current = now.timestamp() if now else time.time()
+        return current - fetched_at < FALLBACK_MAX_AGE
+    return fetched_at >= last_bar_time(exchange, now).timestamp()
+
+
+def is_session_open(ticker, now=None):
+    """Läuft an der Börse des Tickers gerade der Handel (Intraday-Bar in Arbeit)?"""
+    exchange = exchange_for(ticker)
+    if exchange is None:
+        return False
+    cfg = EXCHANGES[exchange]
+    tz = ZoneInfo(cfg["tz"])
+    local = (now or datetime.now(timezone.utc)).astimezone(tz)
+    if not is_trading_day(exchange, local.date()):
+        return False
+    day = local.date()
+    opens = datetime(day.year, day.month, day.day, *cfg["open"], tzinfo=tz)
+    closes = datetime(day.year, day.month, day.day, *cfg["close"], tzinfo=tz)
+    return opens <= local < closes
+
+
+def session_day(ticker, now=None):
+    """
+    Handelstag, dessen Daily-Bar noch vorläufig ist (Handel läuft bzw. der
+    Bar ist seit dem Schluss noch keine BAR_SETTLE alt), sonst None.
+    """
+    exchange = exchange_for(ticker)
+    if exchange is None:
+        return None
+    cfg = EXCHANGES[exchange]
+    tz = ZoneInfo(cfg["tz"])
+    local = (now or datetime.now(timezone.utc)).astimezone(tz)
+    day = local.date()
+    if not is_trading_day(exchange, day):
+        return None
+    opens = datetime(day.year, day.month, day.day, *cfg["open"], tzinfo=tz)
+    closes = datetime(day.year, day.month, day.day, *cfg["close"], tzinfo=tz)
+    return day if opens <= local < closes + BAR_SETTLE else None
@@ -0,0 +1,212 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# -------------------------------------------------------------------
+# Hot-Path-Instrumentierung: Timing-Spans + Netzwerk-Zähler pro Lauf
+# -------------------------------------------------------------------
+#
+# Ein "Lauf" ist ein Streamlit-Rerun, eine Hintergrund-Aktualisierung oder
+# ein Batch-/Warmer-Lauf. Spans und Netzwerk-Aufrufe landen im Lauf des
+# aktuellen Threads; Worker-Threads hängen sich per bind() an.
+
+PERF_LOG_PATH = Path("logs") / "perf.jsonl"
+
+# So viele langsamste Einzel-Spans pro Lauf ins Log schreiben
+LOG_TOP_SPANS = 50
+
+_LOCAL = threading.local()
+_LAST_RUNS = {}  # Lauf-Name -> Zusammenfassung
+_LAST_RUNS_LOCK = threading.Lock()
+
+
+class Run:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.t0 = time.perf_counter()
+        self.spans = []  # (stage, ticker, tab, seconds, outer)
+        self.net_calls = {}  # kind -> [calls, bytes]
+        self.lock = threading.Lock()
+
+    def add_span(self, stage, ticker, tab, seconds, outer=True):
+        with self.lock:
+            self.spans.append((stage, ticker, tab, seconds, outer))
+
+    def add_network(self, kind, nbytes):
+        with self.lock:
+            entry = self.net_calls.setdefault(kind, [0, 0])
+            entry[0] += 1
+            entry[1] += int(nbytes or 0)
+
+    def summary(self):
+        with self.lock:
+            spans = list(self.spans)
+            net = {k: list(v) for k, v in self.net_calls.items()}
+
+        stages = {}
+        tickers = {}
+        tabs = {}
+        for stage, ticker, tab, sec, outer in spans:
+            agg = stages.setdefault(stage, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            agg["count"] += 1
+            agg["total_s"] += sec
+            agg["max_s"] = max(agg["max_s"], sec)
+            # verschachtelte Spans (fetch_* in analyze_ticker) nicht doppelt zählen
+            if ticker and outer:
+                tickers[ticker] = tickers.get(ticker, 0.0) + sec
+            if tab:
+                tabs[tab] = tabs.get(tab, 0.0) + sec
+
+        for agg in stages.values():
+            agg["total_s"] = round(agg["total_s"], 4)
+            agg["max_s"] = round(agg["max_s"], 4)
+
+        slowest = sorted(spans, key=lambda s: s[3], reverse=True)[:LOG_TOP_SPANS]
+        return {
+            "run": self.name,
+            "started_at": self.started_at,
+            "duration_s": round(time.perf_counter() - self.t0, 4),
+            "stages": stages,
+            "tabs": {k: round(v, 4) for k, v in tabs.items()},
+            "slowest_tickers": [
+                {"ticker": t, "total_s": round(sec, 4)}
+                for t, sec in sorted(tickers.items(), key=lambda x: x[1], reverse=True)[:20]
+            ],
+            "slowest_spans": [
+                {"stage": s, "ticker": t, "tab": tab, "seconds": round(sec, 4)}
+                for s, t, tab, sec, _outer in slowest
+            ],
+            "network": {
+                "calls": sum(v[0] for v in net.values()),
+                "bytes": sum(v[1] for v in net.values()),
+                "by_kind": {k: {"calls": v[0], "bytes": v[1]} for k, v in net.items()},
+            },
+        }
+
+
+def current_run():
+    return getattr(_LOCAL, "run", None)
+
+
+def start_run(name):
+    """Neuen Lauf für den aktuellen Thread beginnen."""
+    run = Run(name)
+    _LOCAL.run = run
+    return run
+
+
+def finish_run(run=None, log=True):
+    """Lauf abschließen, als 'letzter Lauf' merken und ins JSON-Log schreiben."""
+    run = run or current_run()
+    if run is None:
+        return None
+    if current_run() is run:
+        _LOCAL.run = None
+
+    summary = run.summary()
+    with _LAST_RUNS_LOCK:
+        _LAST_RUNS[run.name] = summary
+
+    if log:
+        try:
+            PERF_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(PERF_LOG_PATH, "a") as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+    return summary
+
+
+def last_runs():
+    with _LAST_RUNS_LOCK:
+        return dict(_LAST_RUNS)
+
+
+def bind(fn):
+    """fn so verpacken, dass es im Worker-Thread in den aktuellen Lauf schreibt."""
+    run = current_run()
+
+    def wrapper(*args, **kwargs):
+        previous = current_run()
+        _LOCAL.run = run
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _LOCAL.run = previous
+
+    return wrapper
+
+
+@contextmanager
+def span(stage, ticker=None, tab=None):
+    """Dauer eines Abschnitts im aktuellen Lauf erfassen (ohne Lauf: no-op)."""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_span(stage, ticker, tab, time.perf_counter() - t0)
+
+
+def timed(stage, ticker_arg=None):
+    """
+    Decorator-Variante von span(). ticker_arg benennt den Parameter, aus dem
+    der Ticker gelesen wird (bei einem dict – z.B. einer Analyse – dessen 'ticker').
+    """
+    def deco(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is None:
+                return fn(*args, **kwargs)
+
+            ticker = None
+            if ticker_arg:
+                value = sig.bind_partial(*args, **kwargs).arguments.get(ticker_arg)
+                ticker = value.get("ticker") if isinstance(value, dict) else value
+
+            depth = getattr(_LOCAL, "ticker_depth", 0)
+            if ticker:
+                _LOCAL.ticker_depth = depth + 1
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _LOCAL.ticker_depth = depth
+                run.add_span(stage, ticker, None, time.perf_counter() - t0, outer=depth == 0)
+
+        return wrapper
+
+    return deco
+
+
+def payload_bytes(obj):
+    """Grobe Größe einer Antwort (DataFrame/Series/dict) in Bytes."""
+    if obj is None:
+        return 0
+    try:
+        if hasattr(obj, "memory_usage"):
+            usage = obj.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        return len(json.dumps(obj, default=str))
+    except Exception:
+        return 0
+
+
+def record_network(kind, payload=None, nbytes=None):
+    """Einen Upstream-Aufruf zählen (Bytes geschätzt aus der Antwort)."""
+    run = current_run()
+    if run is None:
+        return
+    run.add_network(kind, nbytes if nbytes is not None else payload_bytes(payload))
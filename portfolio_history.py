@@ -0,0 +1,214 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+import price_store
+
+# -------------------------------------------------------------------
+# Portfolio-Historie: täglicher Depotwert & Equity-Kurve
+# -------------------------------------------------------------------
+#
+# Journal (Stück-Änderungen pro Handelstag) und Schlusskurse aus dem
+# Kursspeicher als Tage×Ticker-Matrizen; daraus in einem vektorisierten
+# Durchgang:
+#   Bestand    kumulierte Stück-Änderungen
+#   Depotwert  Σ Bestand × Close (Kurse vorwärts gefüllt)
+#   Kapital    kumulierter Netto-Einsatz (Käufe − Verkaufserlöse)
+#   Rendite    zeitgewichtet: (Wert_t − Wert_t−1 − Zufluss_t) / (Wert_t−1 + Käufe_t),
+#              Käufe zählen zu Tagesbeginn, Verkaufserlöse zum Tagesende
+#   Equity     ∏ (1 + Rendite), Drawdown = Equity / bisheriges Hoch − 1
+#
+# Trades an Tagen ohne Bar zählen zum nächsten Handelstag; Ticker ohne
+# gespeicherte Kurse (noch nicht geladen, delistet) bleiben außen vor, bis
+# ihre Historie da ist (dann wird komplett neu gerechnet). Das Ergebnis
+# bleibt pro Prozess im Speicher: Bei unverändertem Journal werden nur
+# Historien neu gelesen, die seither gespeichert wurden, und nur neue Tage
+# angehängt (Startwerte = Endstand der bisherigen Rechnung). Ändern sich
+# ältere Kurse (Split, Neuladen) oder das Journal, wird komplett neu gerechnet.
+
+_STATE = {}
+_LOCK = threading.Lock()
+
+
+def _journal_key(journal):
+    last = json.dumps(journal[-1], sort_keys=True, ensure_ascii=False) if journal else ""
+    return len(journal), last
+
+
+def _trades(journal):
+    """Journal → DataFrame (date, ticker, shares mit Vorzeichen, amount)."""
+    records = []
+    for entry in journal:
+        ticker = (entry.get("ticker") or "").upper()
+        if not ticker or not entry.get("date"):
+            continue
+        shares = abs(float(entry.get("shares") or 0))
+        if entry.get("type", "Kauf") == "Verkauf":
+            shares = -shares
+        records.append((entry["date"], ticker, shares, shares * float(entry.get("price") or 0)))
+    trades = pd.DataFrame(records, columns=["date", "ticker", "shares", "amount"])
+    trades["date"] = pd.to_datetime(trades["date"])
+    return trades
+
+
+def close_series(ticker):
+    """Schlusskurse aus dem Kursspeicher (Tages-Index ohne Zeitzone), None ohne Daten."""
+    data = price_store.load_history(ticker)
+    if data is None or data.empty:
+        return None
+    index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+    closes = data["Close"].set_axis(index.normalize())
+    return closes[~closes.index.duplicated(keep="last")]
+
+
+def _valuate(closes, deltas, flows, start):
+    """
+    Kern-Rechnung über Tage×Ticker-Arrays ab einem Startzustand
+    (Bestand, Kapital, letzter Wert, Equity, Hoch, letzte Kurse).
+    """
+    # Kurse vorwärts füllen, beginnend beim letzten bekannten Kurs
+    filled = np.vstack([start["last_close"], closes])
+    mask = np.isnan(filled)
+    rows = np.where(~mask, np.arange(len(filled))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = filled[rows, np.arange(filled.shape[1])][1:]
+
+    holdings = start["holdings"] + np.cumsum(deltas, axis=0)
+    value = np.nansum(holdings * filled, axis=1)
+    invested = start["invested"] + np.cumsum(flows)
+
+    previous = np.concatenate([[start["value"]], value[:-1]])
+    base = previous + np.maximum(flows, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(base > 0, (value - previous - flows) / base, 0.0)
+    equity = start["equity"] * np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.maximum(equity, start["peak"]))
+
+    frame = pd.DataFrame(
+        {
+            "Depotwert": value,
+            "Kapital": invested,
+            "G/V": value - invested,
+            "Rendite": returns,
+            "Equity": equity,
+            "Drawdown": equity / peak - 1,
+        }
+    )
+    end = {
+        "holdings": holdings[-1] if len(holdings) else start["holdings"],
+        "invested": float(invested[-1]) if len(invested) else start["invested"],
+        "value": float(value[-1]) if len(value) else start["value"],
+        "equity": float(equity[-1]) if len(equity) else start["equity"],
+        "peak": float(peak[-1]) if len(peak) else start["peak"],
+        "last_close": filled[-1] if len(filled) else start["last_close"],
+    }
+    return frame, end
+
+
+def _initial_state(n):
+    return {
+        "holdings": np.zeros(n),
+        "invested": 0.0,
+        "value": 0.0,
+        "equity": 1.0,
+        "peak": 1.0,
+        "last_close": np.full(n, np.nan),
+    }
+
+
+def portfolio_history(cfg):
+    """
+    Täglicher Depotwert, Kapital, G/V, Rendite, Equity und Drawdown ab dem
+    ersten Trade (DataFrame mit Datums-Index) oder None ohne Journal/Kurse.
+    Ticker ohne gespeicherte Kurse fehlen in der Rechnung und stehen in
+    frame.attrs["missing"].
+    """
+    journal = cfg.get("journal", [])
+    trades = _trades(journal)
+    if trades.empty:
+        return None
+
+    key = _journal_key(journal)
+    tickers = sorted(trades["ticker"].unique())
+    stamps = {t: price_store.history_updated_at(t) for t in tickers}
+
+    with _LOCK:
+        state = _STATE if _STATE.get("tickers") == tickers else {}
+        if state and state["key"] == key and state["stamps"] == stamps:
+            return state["frame"]
+
+        series = dict(state.get("series", {}))
+        for ticker in tickers:
+            if ticker not in series or stamps[ticker] != state["stamps"].get(ticker):
+                series[ticker] = close_series(ticker)
+        available = {t: s for t, s in series.items() if s is not None}
+        if not available:
+            return None
+
+        first = trades["date"].min()
+        closes = pd.DataFrame(available).reindex(columns=tickers)
+        closes = closes[closes.index >= first].sort_index()
+        if closes.empty:
+            return None
+        dates = closes.index
+        values = closes.to_numpy(dtype=np.float64)
+
+        # Trades dem nächsten Handelstag zuordnen (später als der letzte Bar → noch
+        # nicht bewertet), frühestens dem ersten Bar des Tickers. Ticker ohne
+        # Kurse bleiben ganz draußen – sonst stünde ihr Einsatz als Verlust da.
+        columns = pd.Index(tickers).get_indexer(trades["ticker"])
+        has_close = ~np.isnan(values)
+        first_row = np.where(has_close.any(axis=0), has_close.argmax(axis=0), len(dates))
+        rows = np.maximum(dates.searchsorted(trades["date"]), first_row[columns])
+        valued = rows < len(dates)
+        deltas = np.zeros(values.shape)
+        flows = np.zeros(len(dates))
+        np.add.at(deltas, (rows[valued], columns[valued]), trades["shares"].to_numpy()[valued])
+        np.add.at(flows, rows[valued], trades["amount"].to_numpy()[valued])
+
+        # Nur neue Tage? → ab dem letzten Endstand weiterrechnen
+        old = state.get("frame")
+        done = 0
+        if (
+            old is not None
+            and state["key"] == key
+            and len(old) <= len(dates)
+            and dates[:len(old)].equals(old.index)
+            and np.array_equal(state["closes"], values[:len(old)], equal_nan=True)
+        ):
+            done = len(old)
+
+        start = state["end"] if done else _initial_state(len(tickers))
+        frame, end = _valuate(values[done:], deltas[done:], flows[done:], start)
+        frame.index = dates[done:]
+        frame.index.name = "Datum"
+        if done:
+            frame = pd.concat([old, frame])
+        frame.attrs["missing"] = [t for t in tickers if t not in available]
+
+        _STATE.clear()
+        _STATE.update({
+            "key": key,
+            "tickers": tickers,
+            "stamps": stamps,
+            "series": series,
+            "closes": values,
+            "frame": frame,
+            "end": end,
+        })
+        return frame
+
+
+def history_summary(history):
+    """Kennzahlen der Equity-Kurve für die Anzeige."""
+    if history is None or history.empty:
+        return None
+    last = history.iloc[-1]
+    return {
+        "Rendite gesamt": (last["Equity"] - 1) * 100,
+        "Max. Drawdown": history["Drawdown"].min() * 100,
+        "Drawdown aktuell": last["Drawdown"] * 100,
+        "G/V": last["G/V"],
+    }
@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import cache_store
+import price_store
+
+# -------------------------------------------------------------------
+# Geteiltes Kurs-Panel (Memory-Mapped, Nur-Lesen)
+# -------------------------------------------------------------------
+#
+# Die Daily-Kurse vieler Ticker als ein Block float64 der Form
+# (Spalten × Tage × Ticker) – pro Spalte also eine Tage×Ticker-Matrix –
+# unter cache/panel/panel_v<version>_<id>.f8, dazu ein kleiner JSON-Header
+# (Ticker, Tage, Spalten, Version, Datei) und current.json als Zeiger auf
+# die aktuelle Version. Jede Veröffentlichung schreibt eine eigene Datei,
+# so können Warmer und Batch-CLI gleichzeitig veröffentlichen, ohne dass
+# current.json auf fremde Daten zeigt (der letzte Zeiger gewinnt).
+#
+# Veröffentlicht wird vom Cache-Warmer bzw. der Batch-CLI. Alle anderen
+# Prozesse (Streamlit-Worker, API, Process-Pool-Tasks) mappen dieselbe
+# Datei per np.memmap: das OS teilt die Seiten, statt dass jeder Prozess
+# seine eigene Kopie entpickelt.
+
+PANEL_SUBDIR = "panel"
+PANEL_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Zeitraum im Panel; längere Zeiträume (Charts) kommen aus dem Kursspeicher
+PANEL_PERIOD = "3y"
+PANEL_PERIODS = ("1mo", "3mo", "6mo", "ytd", "1y", "2y", "3y")
+
+# Alte Versionen, die für noch laufende Leser liegen bleiben
+KEEP_VERSIONS = 2
+
+# So oft prüfen aktive Leser, ob eine neue Version veröffentlicht wurde (Sekunden)
+RECHECK_INTERVAL = 30
+
+
+def panel_dir():
+    return cache_store.CACHE_DIR / PANEL_SUBDIR
+
+
+class PricePanel:
+    """Nur-Lesen-Sicht auf ein veröffentlichtes Panel."""
+
+    def __init__(self, header, values):
+        self.header = header
+        self.version = header["version"]
+        self.values = values  # (Spalten, Tage, Ticker)
+        self.tickers = header["tickers"]
+        self.columns = header["columns"]
+        self.dates = pd.DatetimeIndex(pd.to_datetime(header["dates"]), name="Date")
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.column_index = {c: i for i, c in enumerate(self.columns)}
+        self.first_row = header["first_row"]
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self.ticker_index
+
+    def matrix(self, column="Close"):
+        """Tage×Ticker-Matrix einer Spalte (zero-copy)."""
+        return self.values[self.column_index[column]]
+
+    def series(self, ticker, column="Close"):
+        """Eine Spalte eines Tickers als numpy-View (zero-copy, strided)."""
+        return self.values[self.column_index[column], :, self.ticker_index[ticker.upper()]]
+
+    def history(self, ticker, period=None):
+        """Historie eines Tickers als DataFrame im Format des Kursspeichers."""
+        i = self.ticker_index.get(ticker.upper())
+        if i is None:
+            return None
+        start = self.first_row[i]
+        block = self.values[:, start:, i]
+        valid = ~np.isnan(block[self.column_index["Close"]])
+        data = pd.DataFrame(
+            {c: block[j][valid] for j, c in enumerate(self.columns)},
+            index=self.dates[start:][valid],
+        )
+        if data.empty:
+            return None
+        return price_store.slice_period(data, period)
+
+
+# -------------------------------------------------------------------
+# Bauen & Veröffentlichen (Cache-Warmer / Batch)
+# -------------------------------------------------------------------
+
+def build_panel(tickers, period=PANEL_PERIOD):
+    """Panel-Daten aus dem Kursspeicher: (header ohne Version, values)."""
+    frames = {}
+    for ticker in dict.fromkeys(t.upper() for t in tickers if t):
+        data = price_store.load_history(ticker)
+        if data is None or data.empty:
+            continue
+        data = price_store.slice_period(data, period)
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        data = data.set_axis(index.normalize(), axis=0)
+        frames[ticker] = data[~data.index.duplicated(keep="last")]
+
+    names = list(frames)
+    dates = pd.DatetimeIndex([])
+    for data in frames.values():
+        dates = dates.union(data.index)
+
+    values = np.full((len(PANEL_COLUMNS), len(dates), len(names)), np.nan, dtype=np.float64)
+    first_row = []
+    for i, ticker in enumerate(names):
+        data = frames[ticker].reindex(dates)
+        for j, column in enumerate(PANEL_COLUMNS):
+            if column in data:
+                values[j, :, i] = data[column].to_numpy(dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(values[PANEL_COLUMNS.index("Close"), :, i]))
+        first_row.append(int(valid[0]) if len(valid) else len(dates))
+
+    header = {
+        "tickers": names,
+        "dates": [d.strftime("%Y-%m-%d") for d in dates],
+        "columns": list(PANEL_COLUMNS),
+        "first_row": first_row,
+        "shape": list(values.shape),
+        "dtype": "float64",
+        "period": period,
+    }
+    return header, values
+
+
+def _read_current():
+    try:
+        with open(panel_dir() / "current.json", "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publish_panel(tickers, period=PANEL_PERIOD):
+    """Panel bauen, als neue Version schreiben und atomar umschalten."""
+    header, values = build_panel(tickers, period)
+    directory = panel_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    current = _read_current()
+    version = (current["version"] + 1) if current else 1
+    header["version"] = version
+    header["created_at"] = datetime.now().isoformat(timespec="seconds")
+    header["data_file"] = f"panel_v{version}_{os.getpid()}_{uuid.uuid4().hex[:8]}.f8"
+
+    data_path = directory / header["data_file"]
+    tmp = data_path.with_name(f"{data_path.name}.{os.getpid()}.tmp")
+    values.tofile(tmp)
+    os.replace(tmp, data_path)
+
+    pointer = directory / "current.json"
+    tmp = pointer.with_name(f"current.json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(header, f)
+    os.replace(tmp, pointer)
+
+    # ältere Versionen aufräumen (gemappte Dateien bleiben für Leser gültig),
+    # nie die Datei, auf die current.json gerade zeigt
+    current = _read_current() or {}
+    for old in directory.glob("panel_v*.f8"):
+        try:
+            old_version = int(old.stem[len("panel_v"):].split("_")[0])
+        except ValueError:
+            continue
+        if old_version <= version - KEEP_VERSIONS and old.name != current.get("data_file"):
+            old.unlink(missing_ok=True)
+    return header
+
+
+# -------------------------------------------------------------------
+# Anhängen (Leser)
+# -------------------------------------------------------------------
+
+_ATTACHED = {"panel": None, "checked_at": 0.0, "active": False}
+_ATTACH_LOCK = threading.Lock()
+
+
+def attach_panel():
+    """Aktuelle Version zero-copy mappen (None, wenn noch nichts veröffentlicht ist)."""
+    header = _read_current()
+    if header is None:
+        return None
+    path = panel_dir() / header["data_file"]
+    try:
+        if header["shape"][1] == 0 or header["shape"][2] == 0:
+            values = np.empty(header["shape"], dtype=header["dtype"])
+        else:
+            values = np.memmap(path, dtype=header["dtype"], mode="r", shape=tuple(header["shape"]))
+    except (OSError, ValueError):
+        return None
+    return PricePanel(header, values)
+
+
+def activate():
+    """Diesen Prozess aus dem geteilten Panel lesen lassen (siehe fetch_history)."""
+    _ATTACHED["active"] = True
+
+
+def active_panel():
+    """Angehängtes Panel; neue Versionen werden spätestens nach RECHECK_INTERVAL übernommen."""
+    if not _ATTACHED["active"]:
+        return None
+    now = time.monotonic()
+    if now - _ATTACHED["checked_at"] < RECHECK_INTERVAL:
+        return _ATTACHED["panel"]
+
+    with _ATTACH_LOCK:
+        if now - _ATTACHED["checked_at"] >= RECHECK_INTERVAL:
+            panel = _ATTACHED["panel"]
+            current = _read_current()
+            if current is not None and (
+                panel is None or current["data_file"] != panel.header["data_file"]
+            ):
+                panel = attach_panel() or panel
+            _ATTACHED["panel"] = panel
+            _ATTACHED["checked_at"] = now
+    return _ATTACHED["panel"]
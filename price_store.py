@@ -0,0 +1,166 @@
+import pickle
+import time
+
+import pandas as pd
+
+import cache_store
+import market_calendar
+
+# -------------------------------------------------------------------
+# Lokaler Kursdaten-Speicher (Daily-Historie pro Ticker)
+# -------------------------------------------------------------------
+#
+# Die komplette verfügbare Historie eines Tickers liegt als Pickle-Blob in
+# der geteilten Cache-Datenbank (Tabelle histories, siehe cache_store).
+# Analyse und Charts schneiden sich daraus nur den benötigten Zeitraum
+# heraus, statt jedes Mal neu zu laden. Aktuell ist eine Historie, solange
+# nach updated_at kein neuer Handelstag geschlossen hat (market_calendar).
+
+# Früherer Speicherort (eine .pkl pro Ticker) – wird bei Bedarf übernommen
+LEGACY_PRICE_SUBDIR = "prices"
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "3y": pd.DateOffset(years=3),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+cache_store.register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS histories (
+        ticker     TEXT PRIMARY KEY,
+        data       BLOB NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """
+)
+
+
+def _key(ticker):
+    return ticker.upper()
+
+
+def _import_legacy(ticker):
+    """Historie aus cache/prices/<TICKER>.pkl übernehmen (einmalig)."""
+    path = cache_store.CACHE_DIR / LEGACY_PRICE_SUBDIR / f"{_key(ticker).replace('/', '_')}.pkl"
+    if not path.exists():
+        return None
+    try:
+        data = pd.read_pickle(path)
+        mtime = path.stat().st_mtime
+    except Exception:
+        return None
+    _write(ticker, data, mtime)
+    path.unlink()
+    return data
+
+
+def _write(ticker, data, updated_at):
+    cache_store.connect().execute(
+        "INSERT OR REPLACE INTO histories (ticker, data, updated_at) VALUES (?, ?, ?)",
+        (_key(ticker), pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), updated_at),
+    )
+
+
+def load_history(ticker):
+    """Gespeicherte Historie laden (None, wenn nichts vorhanden ist)."""
+    row = cache_store.connect().execute(
+        "SELECT data FROM histories WHERE ticker = ?", (_key(ticker),)
+    ).fetchone()
+    if row is None:
+        return _import_legacy(ticker)
+    try:
+        return pickle.loads(row[0])
+    except Exception:
+        # kaputter Eintrag → wie "nicht vorhanden" behandeln
+        return None
+
+
+def save_history(ticker, data):
+    """Historie speichern (eine Transaktion – Leser sehen alt oder neu)."""
+    _write(ticker, data, time.time())
+
+
+def touch_history(ticker):
+    """Zeitstempel erneuern, wenn ein Update keine neuen Bars geliefert hat."""
+    cache_store.connect().execute(
+        "UPDATE histories SET updated_at = ? WHERE ticker = ?", (time.time(), _key(ticker))
+    )
+
+
+def history_age(ticker):
+    """Alter der gespeicherten Historie in Sekunden (None = nicht vorhanden)."""
+    row = cache_store.connect().execute(
+        "SELECT updated_at FROM histories WHERE ticker = ?", (_key(ticker),)
+    ).fetchone()
+    if row is None:
+        if _import_legacy(ticker) is None:
+            return None
+        return history_age(ticker)
+    return time.time() - row[0]
+
+
+def history_updated_at(ticker):
+    """Zeitpunkt (Unix-Zeit) des letzten Speicherns, None = nicht vorhanden."""
+    row = cache_store.connect().execute(
+        "SELECT updated_at FROM histories WHERE ticker = ?", (_key(ticker),)
+    ).fetchone()
+    return None if row is None else row[0]
+
+
+def has_history(ticker):
+    return history_age(ticker) is not None
+
+
+def is_fresh(ticker):
+    """Kann es seit dem letzten Speichern einen neuen Daily-Bar geben?"""
+    age = history_age(ticker)
+    return age is not None and market_calendar.is_current(ticker, time.time() - age)
+
+
+def merge_history(old, new):
+    """Neue Bars anhängen; bei Überschneidung gewinnt der neuere Stand."""
+    if old is None or old.empty:
+        return new
+    if new is None or new.empty:
+        return old
+    merged = pd.concat([old, new])
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+def align_index(new, like):
+    """Index neuer Bars an die Zeitzone der gespeicherten Historie angleichen."""
+    tz = like.index.tz
+    if tz is None:
+        return new
+    if new.index.tz is None:
+        new.index = new.index.tz_localize(tz)
+    else:
+        new.index = new.index.tz_convert(tz)
+    return new
+
+
+def slice_period(data, period):
+    """
+    Zeitraum aus einer Historie schneiden.
+    period: '1mo', '3mo', '6mo', 'ytd', '1y', '2y', '3y', '5y', '10y', 'max'
+    """
+    if data is None or data.empty or period in (None, "max"):
+        return data
+
+    last = data.index[-1]
+    if period == "ytd":
+        start = last.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        offset = PERIOD_OFFSETS.get(period)
+        if offset is None:
+            return data
+        start = last - offset
+
+    return data[data.index > start]
@@ -0,0 +1,208 @@
+import heapq
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import market_calendar
+import price_panel
+import price_store
+from analysis_core import detect_wave_stock
+from fetch_guard import is_blocked
+
+# -------------------------------------------------------------------
+# Adaptiver Refresh-Scheduler (Cache-Warmer)
+# -------------------------------------------------------------------
+#
+# Statt alle Ticker nur zu festen Uhrzeiten gleich oft zu laden, bekommt
+# jeder Ticker eine eigene Kadenz:
+#   Stufe 0: Portfolio-Positionen und Werte nahe an Ladder-Ziel/TP/Re-Entry
+#   Stufe 1: hohe STS/LAS
+#   Stufe 2: der Rest
+# Die Basis-Kadenz der Stufe wird mit der Volatilität skaliert
+# (avg_range_pct wie in detect_wave_stock): unruhige Werte öfter, ruhige
+# seltener. Fällige Ticker kommen in eine Prioritäts-Queue (heapq) nach
+# Stufe und Score; pro Tick werden höchstens `budget` Ticker geladen.
+#
+# Fällig ist ein Ticker nur, wenn es überhaupt etwas Neues geben kann:
+# seine Börse ist offen (Intraday-Bar) oder seit dem letzten Laden ist ein
+# weiterer Bar fertig geworden (market_calendar). Den Intraday-Bar legt
+# refresh_histories nur ins Live-Overlay (live_quotes), nie in den Speicher.
+
+TIER_CADENCE = {
+    0: 30 * 60,        # Sekunden
+    1: 2 * 60 * 60,
+    2: 8 * 60 * 60,
+}
+TIER_LABELS = {0: "Portfolio / nahe Level", 1: "hohe STS/LAS", 2: "Rest"}
+
+NEAR_LEVEL_PCT = 3.0   # Abstand zu Ziel/TP/Re-Entry, ab dem ein Wert Stufe 0 wird
+HIGH_STS = 50
+HIGH_LAS = 60
+
+# Volatilität, bei der die Basis-Kadenz gilt (= Wellen-Schwelle), und Grenzen
+REFERENCE_RANGE_PCT = 4.0
+CADENCE_SCALE = (0.5, 2.0)
+VOLATILITY_DAYS = 252
+
+
+def _near(price, level):
+    return bool(price) and bool(level) and abs(price - level) / level * 100 <= NEAR_LEVEL_PCT
+
+
+def classify_tiers(cfg, tickers, ctx=None):
+    """
+    {ticker: (stufe, score)} aus Portfolio und dem letzten Analyse-Kontext
+    (Snapshot). Ohne Kontext landen alle Nicht-Positionen in Stufe 2.
+    """
+    ctx = ctx or {}
+    tiers = {t: (2, 0.0) for t in tickers}
+
+    for row in ctx.get("radar_rows", []):
+        ticker = (row.get("Ticker") or "").upper()
+        if ticker not in tiers:
+            continue
+        sts = row.get("STS (Short-Term)") or 0
+        las = row.get("LAS (Long-Term AGI)") or 0
+        price = row.get("Kurs")
+        if _near(price, row.get("TP-Level")) or _near(price, row.get("Re-Entry-Level")):
+            tier = 0
+        elif sts >= HIGH_STS or las >= HIGH_LAS:
+            tier = 1
+        else:
+            tier = 2
+        tiers[ticker] = (tier, float(max(sts, las)))
+
+    analyses = ctx.get("portfolio_analyses", {})
+    for pos in cfg.get("portfolio", []):
+        ticker = (pos.get("ticker") or "").upper()
+        if ticker not in tiers:
+            continue
+        analysis = (analyses.get(ticker) or ({}, 0))[0]
+        price = analysis.get("price")
+        near = any(
+            _near(price, analysis.get(key))
+            for key in ("next_target", "wave_tp_level", "wave_reentry_level")
+        )
+        # nahe an einem Level vor den übrigen Positionen
+        tiers[ticker] = (0, 100.0 if near else max(tiers[ticker][1], 50.0))
+    return tiers
+
+
+def range_volatility(tickers):
+    """
+    avg_range_pct pro Ticker (None = zu wenig Daten): vektorisiert über das
+    Kurs-Panel, für Ticker außerhalb des Panels aus dem Kursspeicher.
+    """
+    result = {}
+    panel = price_panel.attach_panel()
+    in_panel = [t for t in tickers if panel is not None and t in panel]
+    if in_panel:
+        cols = [panel.ticker_index[t] for t in in_panel]
+        rows = slice(-VOLATILITY_DAYS, None)
+        high = panel.matrix("High")[rows][:, cols]
+        low = panel.matrix("Low")[rows][:, cols]
+        close = panel.matrix("Close")[rows][:, cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ranges = (high - low) / close * 100
+        valid = ~np.isnan(ranges)
+        counts = valid.sum(axis=0)
+        sums = np.where(valid, ranges, 0.0).sum(axis=0)
+        for ticker, total, count in zip(in_panel, sums, counts):
+            # gleiche Mindestlänge wie detect_wave_stock
+            result[ticker] = float(total / count) if count >= 80 else None
+
+    for ticker in tickers:
+        if ticker in result:
+            continue
+        data = price_store.load_history(ticker)
+        if data is None or data.empty:
+            result[ticker] = None
+            continue
+        _, avg_range_pct, _ = detect_wave_stock(price_store.slice_period(data, "1y"))
+        result[ticker] = avg_range_pct
+    return result
+
+
+def cadence(tier, avg_range_pct):
+    """Refresh-Intervall in Sekunden für Stufe + Volatilität."""
+    base = TIER_CADENCE[tier]
+    if not avg_range_pct:
+        return base
+    lo, hi = CADENCE_SCALE
+    return base * min(hi, max(lo, REFERENCE_RANGE_PCT / avg_range_pct))
+
+
+def build_schedule(cfg, tickers, ctx=None, now=None):
+    """
+    Zeitplan aller Ticker: Liste von Dicts mit Stufe, Score, Volatilität,
+    Kadenz und Fälligkeit (Unix-Zeit), sortiert nach Fälligkeit.
+    """
+    now = now or time.time()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    tiers = classify_tiers(cfg, tickers, ctx)
+    volatility = range_volatility(tickers)
+
+    schedule = []
+    for ticker in tickers:
+        tier, score = tiers[ticker]
+        every = cadence(tier, volatility.get(ticker))
+        age = price_store.history_age(ticker)
+        schedule.append({
+            "ticker": ticker,
+            "tier": tier,
+            "score": score,
+            "avg_range_pct": volatility.get(ticker),
+            "cadence": every,
+            "due_at": now if age is None else now - age + every,
+        })
+    schedule.sort(key=lambda e: e["due_at"])
+    return schedule
+
+
+def _can_change(ticker, now):
+    """Kann es seit dem letzten Laden neue Kursdaten geben?"""
+    if not price_store.has_history(ticker):
+        return True
+    if market_calendar.is_session_open(ticker, now):
+        return True
+    return not price_store.is_fresh(ticker)
+
+
+def due_tickers(schedule, budget, now=None):
+    """
+    Fällige Ticker in Prioritätsreihenfolge (Stufe, Score, Überfälligkeit),
+    höchstens budget Stück. Gesperrte Ticker (Negativ-Cache) kosten kein Budget.
+    """
+    now = now or time.time()
+    now_dt = datetime.fromtimestamp(now, timezone.utc)
+
+    queue = []
+    for entry in schedule:
+        if entry["due_at"] > now:
+            break  # schedule ist nach Fälligkeit sortiert
+        ticker = entry["ticker"]
+        if is_blocked(ticker, "history") or not _can_change(ticker, now_dt):
+            continue
+        heapq.heappush(queue, (entry["tier"], -entry["score"], entry["due_at"], ticker))
+
+    due = []
+    while queue and len(due) < budget:
+        due.append(heapq.heappop(queue)[3])
+    return due
+
+
+def tier_summary(schedule, now=None):
+    """Pro Stufe: Anzahl, mittlere Kadenz (Minuten) und nächste Fälligkeit."""
+    now = now or time.time()
+    summary = {}
+    for tier, label in TIER_LABELS.items():
+        entries = [e for e in schedule if e["tier"] == tier]
+        if not entries:
+            continue
+        summary[label] = {
+            "tickers": len(entries),
+            "cadence_min": round(sum(e["cadence"] for e in entries) / len(entries) / 60, 1),
+            "next_due_min": round(max(0.0, min(e["due_at"] for e in entries) - now) / 60, 1),
+        }
+    return summary
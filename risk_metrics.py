@@ -0,0 +1,148 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import lot_ledger
+import price_store
+from portfolio_history import close_series
+
+# -------------------------------------------------------------------
+# Portfolio-Risiko gegen den Markt (^GSPC)
+# -------------------------------------------------------------------
+#
+# Grundlage ist ein Tage×Ticker-Panel der Tagesrenditen der offenen
+# Positionen (letzte RISK_WINDOW Handelstage des Benchmarks, Kurse
+# vorwärts gefüllt) plus die Benchmark-Renditen. Gewichte = aktuelle
+# Marktwerte der offenen Lots. Alles über Matrix-Produkte:
+#   Σ       = Rcᵀ Rc / (T−1)            Kovarianz der Positionen
+#   σ_p²    = wᵀ Σ w                     Portfolio-Varianz
+#   β_p     = wᵀ Cov(R, b) / Var(b)      Beta, dazu Korrelation
+#   Anteil  = w ⊙ (Σ w) / σ_p²           Risikobeitrag je Position (Σ = 100 %)
+# VaR/CVaR historisch aus den Tagesrenditen R w des heutigen Portfolios.
+#
+# Ergebnis bleibt pro Prozess im Speicher und wird nur neu gerechnet, wenn
+# sich Bestände (Journal) oder gespeicherte Historien (neuer Bar) ändern.
+
+BENCHMARK = "^GSPC"
+RISK_WINDOW = 252          # Handelstage (≈ 1 Jahr)
+MIN_OBSERVATIONS = 30      # darunter keine Kennzahlen
+VAR_CONFIDENCE = 0.95
+TRADING_DAYS = 252         # Annualisierung der Volatilität
+
+_CACHE = {}
+_LOCK = threading.Lock()
+
+
+def _open_shares(cfg):
+    positions = lot_ledger.positions_for(cfg)
+    return {
+        ticker: pos["shares"]
+        for ticker, pos in sorted(positions.items())
+        if pos["shares"] > lot_ledger.EPSILON
+    }
+
+
+def compute_risk(closes, bench, shares, window=RISK_WINDOW, confidence=VAR_CONFIDENCE):
+    """
+    Risiko-Kennzahlen aus Schlusskursen (DataFrame Tage×Ticker, vorwärts
+    gefüllt), Benchmark-Schlusskursen (Series, gleicher Index) und offenen
+    Stücken {ticker: shares}. None bei zu wenig Daten.
+    """
+    prices = closes.iloc[-1].to_numpy(dtype=np.float64)
+    held = np.array([shares.get(t, 0.0) for t in closes.columns])
+    values = np.where(np.isnan(prices), 0.0, held * prices)
+    total = float(values.sum())
+    if total <= 0:
+        return None
+    w = values / total
+
+    returns = closes.pct_change().iloc[1:].tail(window)
+    bench_returns = bench.pct_change().iloc[1:].tail(window).to_numpy(dtype=np.float64)
+    R = np.nan_to_num(returns.to_numpy(dtype=np.float64))
+    b = np.nan_to_num(bench_returns)
+    n = len(R)
+    if n < MIN_OBSERVATIONS:
+        return None
+
+    Rc = R - R.mean(axis=0)
+    bc = b - b.mean()
+    cov = Rc.T @ Rc / (n - 1)
+    cov_bench = Rc.T @ bc / (n - 1)
+    var_bench = float(bc @ bc) / (n - 1)
+
+    sigma_w = cov @ w
+    var_p = float(w @ sigma_w)
+    cov_p = float(w @ cov_bench)
+
+    daily = R @ w
+    q = float(np.quantile(daily, 1 - confidence))
+    tail = daily[daily <= q]
+    var_pct = -q * 100
+    cvar_pct = -float(tail.mean()) * 100 if len(tail) else var_pct
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas = cov_bench / var_bench if var_bench > 0 else np.full(len(w), np.nan)
+        shares_of_risk = w * sigma_w / var_p if var_p > 0 else np.zeros(len(w))
+    vols = np.sqrt(np.diag(cov) * TRADING_DAYS) * 100
+
+    def number(x):
+        return None if x is None or not np.isfinite(x) else float(x)
+
+    return {
+        "as_of": closes.index[-1].strftime("%Y-%m-%d"),
+        "observations": n,
+        "confidence": confidence,
+        "value": total,
+        "volatility_pct": float(np.sqrt(var_p * TRADING_DAYS) * 100),
+        "bench_volatility_pct": float(np.sqrt(var_bench * TRADING_DAYS) * 100),
+        "beta": number(cov_p / var_bench) if var_bench > 0 else None,
+        "correlation": number(cov_p / np.sqrt(var_p * var_bench)) if var_p > 0 and var_bench > 0 else None,
+        "var_pct": var_pct,
+        "cvar_pct": cvar_pct,
+        "var_usd": var_pct / 100 * total,
+        "cvar_usd": cvar_pct / 100 * total,
+        "positions": {
+            ticker: {
+                "weight_pct": float(w[i] * 100),
+                "volatility_pct": number(vols[i]),
+                "beta": number(betas[i]),
+                "risk_share_pct": number(shares_of_risk[i] * 100),
+            }
+            for i, ticker in enumerate(closes.columns)
+            if w[i] > 0
+        },
+    }
+
+
+def portfolio_risk(cfg):
+    """
+    Risiko-Kennzahlen des aktuellen Depots gegen BENCHMARK (siehe compute_risk).
+    Benchmark und Positionen kommen aus dem Kursspeicher; None ohne Daten.
+    """
+    shares = _open_shares(cfg)
+    if not shares:
+        return None
+
+    tickers = list(shares)
+    stamps = {t: price_store.history_updated_at(t) for t in tickers + [BENCHMARK]}
+    key = (tuple(shares.items()), tuple(stamps.items()))
+
+    with _LOCK:
+        if _CACHE.get("key") == key:
+            return _CACHE["result"]
+
+        bench = close_series(BENCHMARK)
+        series = {t: close_series(t) for t in tickers}
+        series = {t: s for t, s in series.items() if s is not None}
+        result = None
+        if bench is not None and series:
+            bench = bench.tail(RISK_WINDOW + 1)
+            # auf die Handelstage des Benchmarks ausrichten, Lücken vorwärts füllen
+            closes = pd.DataFrame(series)
+            closes = closes.reindex(closes.index.union(bench.index)).ffill().reindex(bench.index)
+            result = compute_risk(closes, bench, shares)
+
+        _CACHE.clear()
+        _CACHE.update({"key": key, "result": result})
+        return result
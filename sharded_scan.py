@@ -0,0 +1,127 @@
+import heapq
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import perf
+import price_panel
+import transport
+from analysis_core import (
+    PREFETCH_WORKERS,
+    build_radar_rows,
+    prefetch_market_data,
+    screen_tickers,
+)
+
+# -------------------------------------------------------------------
+# Universe-Scan über mehrere Prozesse (Shards)
+# -------------------------------------------------------------------
+#
+# Bei großen Universes ist ein einzelner Prozess – auch mit parallelem I/O –
+# durch pandas CPU-gebunden. Hier wird das Universe reihum auf Worker-
+# Prozesse verteilt; jeder lädt, analysiert und scort sein Stück selbst und
+# liefert nur kompakte Radar-Zeilen zurück (keine Historien). Der
+# Koordinator führt die je Shard sortierten Listen per heapq.merge zum
+# globalen STS/LAS-Ranking zusammen (optional nur die Top-k).
+#
+# Worker starten per "spawn": keine geerbten SQLite-/HTTP-Verbindungen.
+# Provider und Cache-Verzeichnis kommen über die Umgebungsvariablen
+# (AGI_DATA_PROVIDER, AGI_CACHE_DIR). Das Rate-Limit des Transports wird
+# auf die Shards aufgeteilt, damit es in Summe gleich bleibt. Ohne Prefetch
+# lesen die Worker aus dem geteilten Kurs-Panel (price_panel), sonst aus
+# dem Kursspeicher, den sie gerade selbst aktualisieren.
+
+STS_COLUMN = "STS (Short-Term)"
+LAS_COLUMN = "LAS (Long-Term AGI)"
+
+
+def sts_key(row):
+    """Sortierschlüssel des globalen Rankings: STS, dann LAS absteigend."""
+    return (-row[STS_COLUMN], -row[LAS_COLUMN], row["Ticker"])
+
+
+def las_key(row):
+    return (-row[LAS_COLUMN], -row[STS_COLUMN], row["Ticker"])
+
+
+def top_k_rows(rows, k):
+    """
+    Die k besten Zeilen nach STS plus die k besten nach LAS (Reihenfolge
+    nach STS). Aus den Top-k aller Shards ergeben sich so exakt die globalen Top-k.
+    """
+    rows = sorted(rows, key=sts_key)
+    if not k:
+        return rows
+    keep = {id(r) for r in rows[:k]}
+    keep.update(id(r) for r in heapq.nsmallest(k, rows, key=las_key))
+    return [r for r in rows if id(r) in keep]
+
+
+def shard_universe(universe, shards):
+    """Universe reihum aufteilen (gleich große, gemischte Stücke)."""
+    shards = max(1, min(shards, len(universe)))
+    return [universe[i::shards] for i in range(shards)]
+
+
+def _init_worker(shards, use_panel=False):
+    transport.BUCKET = transport.TokenBucket(
+        transport.RATE_PER_SEC / shards, max(1.0, transport.RATE_BURST / shards)
+    )
+    if use_panel:
+        price_panel.activate()
+
+
+def scan_shard(index, entries, thresholds, macro, top_k=None, prefetch=True,
+               max_workers=PREFETCH_WORKERS):
+    """Ein Shard: vorfiltern, laden, analysieren, scoren → kompakte Zeilen."""
+    started = time.perf_counter()
+    run = perf.start_run(f"scan_shard_{index}")
+    try:
+        if prefetch:
+            tickers, _dropped = screen_tickers([e["ticker"] for e in entries if e.get("ticker")])
+            prefetch_market_data(tickers, max_workers=max_workers)
+        rows = build_radar_rows(entries, thresholds, macro)
+    finally:
+        summary = perf.finish_run(run, log=False)
+
+    return {
+        "shard": index,
+        "tickers": len(entries),
+        "rows": top_k_rows(rows, top_k),
+        "radar_rows": len(rows),
+        "seconds": round(time.perf_counter() - started, 3),
+        "network_calls": summary["network"]["calls"],
+    }
+
+
+def scan_universe(universe, thresholds, macro, shards, top_k=None, prefetch=True,
+                  max_workers=PREFETCH_WORKERS):
+    """
+    Universe auf `shards` Prozesse verteilen und das globale Ranking bilden.
+    Liefert (Radar-Zeilen nach STS sortiert, Statistik pro Shard).
+    max_workers gilt pro Shard (parallele Abrufe im Prefetch).
+    """
+    parts = shard_universe(universe, shards)
+    if not parts or not parts[0]:
+        return [], []
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=len(parts),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(len(parts), not prefetch),
+    ) as pool:
+        futures = [
+            pool.submit(scan_shard, i, part, thresholds, macro, top_k, prefetch, max_workers)
+            for i, part in enumerate(parts)
+        ]
+        results = [f.result() for f in futures]
+
+    # jede Shard-Liste ist bereits nach STS sortiert → k-Wege-Merge
+    merged = list(heapq.merge(*(r["rows"] for r in results), key=sts_key))
+    if top_k:
+        merged = top_k_rows(merged, top_k)
+
+    stats = [{k: v for k, v in r.items() if k != "rows"} for r in results]
+    return merged, stats
@@ -0,0 +1,100 @@
+import functools
+import inspect
+import threading
+
+import perf
+
+# -------------------------------------------------------------------
+# Single-Flight: gleiche Abrufe parallel laufender Sessions bündeln
+# -------------------------------------------------------------------
+#
+# Alle Streamlit-Sessions eines Prozesses teilen sich die Caches in
+# analysis_core. Fragen zwei Threads gleichzeitig denselben Ticker/
+# dieselbe Datenart an, holt nur der erste ("Leader") die Daten; alle
+# anderen warten auf genau dieses Ergebnis (inkl. Exception).
+# Zurückgegebene Objekte werden geteilt und dürfen nicht verändert werden.
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+        self.shared = 0   # Anzahl Aufrufe, die ein fremdes Ergebnis bekommen haben
+
+    def begin(self, key):
+        """(call, leader) – leader=True heißt: dieser Thread muss liefern."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def wait(self, call, ticker=None):
+        with perf.span("single_flight_wait", ticker=ticker):
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, args=(), kwargs=None, ticker=None):
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call, ticker)
+        try:
+            result = fn(*args, **(kwargs or {}))
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+FLIGHTS = SingleFlight()
+
+
+def coalesce(kind, *key_args):
+    """
+    Decorator: gleichzeitige Aufrufe mit gleichen key_args teilen sich ein
+    Ergebnis. Der erste Schlüssel-Parameter gilt als Ticker (für perf).
+    """
+    def deco(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            values = [bound.arguments[name] for name in key_args]
+            values = [v.upper() if isinstance(v, str) else v for v in values]
+            ticker = values[0] if values and isinstance(values[0], str) else None
+            return FLIGHTS.do((kind, *values), fn, args, kwargs, ticker=ticker)
+
+        return wrapper
+
+    return deco
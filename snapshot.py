@@ -0,0 +1,427 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import cache_store
+import correlation_clusters
+import live_quotes
+import lot_ledger
+import perf
+import price_panel
+import price_store
+import risk_metrics
+from config_utils import load_ai_universe, on_journal_change
+from analysis_core import (
+    analyze_position,
+    apply_quote,
+    build_portfolio_overview,
+    build_portfolio_row,
+    build_radar_row,
+    build_radar_rows,
+    clear_macro_cache,
+    compute_macro_context,
+    prefetch_market_data,
+    score_dual_candidate,
+    update_history,
+)
+
+# -------------------------------------------------------------------
+# Analyse-Snapshot (Stale-While-Revalidate)
+# -------------------------------------------------------------------
+#
+# Der letzte vollständige Analyse-Lauf (Portfolio, Radar, Makro, Scores)
+# wird als kompakte JSON-Datei gespeichert. Die APP rendert beim Start
+# sofort daraus und rechnet im Hintergrund neu.
+
+SNAPSHOT_PATH = cache_store.CACHE_DIR / "analysis_snapshot.json"
+
+# Ab diesem Alter (Sekunden) wird im Hintergrund neu gerechnet
+SNAPSHOT_MAX_AGE = 30 * 60
+
+_REFRESH_LOCK = threading.Lock()
+_REFRESH = {"thread": None, "ctx": None, "error": None, "mtime": None}
+_PREFETCH = {}  # ticker -> Thread (Vorladen neuer Portfolio-Ticker)
+
+
+def config_fingerprint(cfg, thresholds):
+    """Hash über alles aus der Config, was das Analyse-Ergebnis beeinflusst."""
+    payload = json.dumps(
+        {"portfolio": cfg.get("portfolio", []), "thresholds": thresholds},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_analysis_context(cfg, thresholds, progress_cb=None):
+    """
+    Kompletten Analyse-Kontext berechnen (teuer – Netzwerk!).
+    progress_cb(frac) wird optional mit Werten zwischen 0 und 1 aufgerufen.
+    """
+    def report(frac):
+        if progress_cb:
+            progress_cb(frac)
+
+    macro = compute_macro_context()
+    report(0.1)
+
+    portfolio, analyses, rows, gesamt_wert, gesamt_einsatz = build_portfolio_overview(
+        cfg, thresholds
+    )
+    # Risiko gegen den Markt: Benchmark-Historie im Kursspeicher nachführen
+    update_history(risk_metrics.BENCHMARK)
+    risk = risk_metrics.portfolio_risk(cfg)
+    report(0.3)
+
+    universe = load_ai_universe().get("ai_universe", [])
+    radar_analyses = {}
+    radar_rows = build_radar_rows(universe, thresholds, macro, analyses=radar_analyses)
+    report(0.9)
+
+    # Korrelations-Cluster über Universe + Depot (einmal pro Tag, auf Platte gecacht)
+    known = {(e.get("ticker") or "").upper() for e in universe}
+    clusters = correlation_clusters.universe_clusters(
+        universe + [{"ticker": t} for t in analyses if t not in known]
+    )
+
+    scores = {}
+    for ticker, (analysis, _shares) in analyses.items():
+        scores[ticker] = score_dual_candidate(analysis, thresholds, macro)
+
+    # Historien nicht mitschleppen – die liegen im Kursspeicher
+    analyses = {
+        ticker: ({**analysis, "history": None}, shares)
+        for ticker, (analysis, shares) in analyses.items()
+    }
+
+    report(1.0)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "fingerprint": config_fingerprint(cfg, thresholds),
+        "macro": macro,
+        "portfolio_analyses": analyses,
+        "portfolio_rows": rows,
+        "gesamt_wert": gesamt_wert,
+        "gesamt_einsatz": gesamt_einsatz,
+        "risk": risk,
+        "radar_rows": radar_rows,
+        "radar_analyses": radar_analyses,
+        "clusters": clusters,
+        "scores": scores,
+    }
+
+
+# -------------------------------------------------------------------
+# Live-Kurse (intraday)
+# -------------------------------------------------------------------
+
+def apply_live_quotes(ctx, cfg, thresholds):
+    """
+    Kontext mit Live-Kursen überlagern: ein gebündelter Quote-Abruf für alle
+    Ticker (bzw. der geteilte Cache), danach nur die kursabhängigen Felder
+    neu (apply_quote) – keine Historien, keine Fundamentals.
+    Der gespeicherte Snapshot bleibt unverändert.
+    """
+    radar_analyses = ctx.get("radar_analyses")
+    if radar_analyses is None:
+        return ctx  # Snapshot aus älterer Version → erst nach Neuberechnung
+
+    analyses = ctx.get("portfolio_analyses", {})
+    quotes = live_quotes.get_quotes(list(analyses) + list(radar_analyses))
+    if not quotes:
+        return ctx
+
+    macro = ctx["macro"]
+    portfolio_analyses, scores = {}, {}
+    for ticker, (analysis, shares) in analyses.items():
+        analysis = apply_quote(analysis, quotes.get(ticker), thresholds)
+        portfolio_analyses[ticker] = (analysis, shares)
+        scores[ticker] = score_dual_candidate(analysis, thresholds, macro)
+
+    rows, gesamt_wert = [], 0.0
+    for pos in cfg.get("portfolio", []):
+        entry = portfolio_analyses.get((pos.get("ticker") or "").upper())
+        if entry is None:
+            continue
+        analysis, shares = entry
+        rows.append(build_portfolio_row(analysis, shares))
+        gesamt_wert += (shares or 0) * (analysis["price"] or 0.0)
+
+    live_radar = {
+        ticker: apply_quote(analysis, quotes.get(ticker), thresholds)
+        for ticker, analysis in radar_analyses.items()
+    }
+    radar_rows = [
+        build_radar_row(entry, live_radar[entry["ticker"].upper()], thresholds, macro)
+        for entry in load_ai_universe().get("ai_universe", [])
+        if (entry.get("ticker") or "").upper() in live_radar
+    ]
+
+    return {
+        **ctx,
+        "portfolio_analyses": portfolio_analyses,
+        "portfolio_rows": rows,
+        "gesamt_wert": gesamt_wert,
+        "radar_rows": radar_rows,
+        "radar_analyses": live_radar,
+        "scores": scores,
+        "live_quotes": {
+            "tickers": len(quotes),
+            "fetched_at": min(q["fetched_at"] for q in quotes.values()),
+        },
+    }
+
+
+# -------------------------------------------------------------------
+# Journal-Änderungen (nur betroffene Ticker neu)
+# -------------------------------------------------------------------
+
+def _has_market_data(ticker):
+    panel = price_panel.active_panel()
+    return price_store.has_history(ticker) or (panel is not None and ticker in panel)
+
+
+def apply_journal_change(ctx, cfg, thresholds, tickers):
+    """
+    Kontext nach einer Journal-Änderung anpassen: nur die betroffenen Ticker
+    werden neu analysiert (Portfolio-Zeile, Ladder-Stand, Score/Empfehlung, Depot-Risiko),
+    Radar, Makro und alle übrigen Positionen bleiben. Ticker ohne Kursdaten
+    kommen erst nach dem Vorladen dazu → (neuer Kontext, fehlende Ticker).
+    """
+    tickers = {t.upper() for t in tickers}
+    previous = ctx.get("portfolio_analyses", {})
+    macro = ctx["macro"]
+
+    positions = lot_ledger.positions_for(cfg)
+
+    analyses, scores, rows, pending = {}, {}, [], []
+    gesamt_wert = gesamt_einsatz = 0.0
+    for pos in cfg.get("portfolio", []):
+        ticker = (pos.get("ticker") or "").upper()
+        if ticker in tickers or ticker not in previous:
+            if not _has_market_data(ticker):
+                pending.append(ticker)
+                continue
+            analysis, shares, avg_price = analyze_position(pos, thresholds, positions.get(ticker))
+            analysis = {**analysis, "history": None}
+            scores[ticker] = score_dual_candidate(analysis, thresholds, macro)
+        else:
+            analysis, shares = previous[ticker]
+            avg_price = analysis.get("buy_price")
+            scores[ticker] = ctx.get("scores", {}).get(ticker) or score_dual_candidate(
+                analysis, thresholds, macro
+            )
+        analyses[ticker] = (analysis, shares)
+        rows.append(build_portfolio_row(analysis, shares))
+        gesamt_wert += (shares or 0) * (analysis["price"] or 0.0)
+        gesamt_einsatz += (shares or 0) * (avg_price or 0)
+
+    updated = {
+        **ctx,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "portfolio_analyses": analyses,
+        "portfolio_rows": rows,
+        "gesamt_wert": gesamt_wert,
+        "gesamt_einsatz": gesamt_einsatz,
+        "risk": risk_metrics.portfolio_risk(cfg),
+        "scores": scores,
+        # fehlende Ticker kommen per Vorladen dazu (siehe is_stale)
+        "fingerprint": config_fingerprint(cfg, thresholds),
+        "pending": pending,
+    }
+    return updated, pending
+
+
+def _prefetch_and_apply(cfg, thresholds, tickers):
+    run = perf.start_run("journal_prefetch")
+    try:
+        prefetch_market_data(tickers)
+        ctx = latest_context()
+        if ctx is not None:
+            set_context(apply_journal_change(ctx, cfg, thresholds, tickers)[0])
+    except Exception as e:
+        with _REFRESH_LOCK:
+            _REFRESH["error"] = repr(e)
+    finally:
+        with _REFRESH_LOCK:
+            for ticker in tickers:
+                _PREFETCH.pop(ticker, None)
+        perf.finish_run(run)
+
+
+def _start_prefetch(cfg, thresholds, tickers):
+    """Neue Ticker im Hintergrund laden und danach in den Kontext einrechnen."""
+    with _REFRESH_LOCK:
+        tickers = [t for t in tickers if t not in _PREFETCH]
+        if not tickers:
+            return
+        thread = threading.Thread(
+            target=_prefetch_and_apply,
+            args=(copy.deepcopy(cfg), dict(thresholds), tickers),
+            name="journal-prefetch",
+            daemon=True,
+        )
+        for ticker in tickers:
+            _PREFETCH[ticker] = thread
+    thread.start()
+
+
+def prefetch_pending():
+    """Ticker, deren Kursdaten nach einer Journal-Änderung noch geladen werden."""
+    with _REFRESH_LOCK:
+        return sorted(_PREFETCH)
+
+
+def _on_journal_change(cfg, tickers):
+    ctx = latest_context()
+    if ctx is None:
+        return  # noch kein Kontext → wird beim nächsten Rendern komplett berechnet
+    thresholds = cfg.get("thresholds", {"run_up_pct": 30, "dip_pct": -30})
+    ctx, pending = apply_journal_change(ctx, cfg, thresholds, tickers)
+    set_context(ctx)
+    if pending:
+        _start_prefetch(cfg, thresholds, pending)
+
+
+on_journal_change(_on_journal_change)
+
+
+# -------------------------------------------------------------------
+# Speichern / Laden
+# -------------------------------------------------------------------
+
+def save_snapshot(ctx):
+    """Snapshot atomar schreiben; liefert die mtime der neuen Datei."""
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SNAPSHOT_PATH.with_name(f"{SNAPSHOT_PATH.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(ctx, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, SNAPSHOT_PATH)
+    return SNAPSHOT_PATH.stat().st_mtime
+
+
+def _snapshot_mtime():
+    try:
+        return SNAPSHOT_PATH.stat().st_mtime
+    except OSError:
+        return None
+
+
+def load_snapshot():
+    """Snapshot von der Platte laden (None, wenn keiner existiert)."""
+    if not SNAPSHOT_PATH.exists():
+        return None
+    try:
+        with open(SNAPSHOT_PATH, "r") as f:
+            ctx = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # JSON kennt keine Tupel → (analysis, shares) / (sts, las) wiederherstellen
+    ctx["portfolio_analyses"] = {
+        ticker: tuple(pair) for ticker, pair in ctx.get("portfolio_analyses", {}).items()
+    }
+    ctx["scores"] = {ticker: tuple(s) for ticker, s in ctx.get("scores", {}).items()}
+    return ctx
+
+
+def context_version(ctx):
+    """Stand eines Kontexts: letzte Journal-Anpassung oder Neuberechnung."""
+    return ctx.get("updated_at") or ctx["created_at"]
+
+
+def snapshot_age(ctx):
+    """Alter eines Kontexts in Sekunden."""
+    created = datetime.fromisoformat(ctx["created_at"])
+    return (datetime.now() - created).total_seconds()
+
+
+def is_stale(ctx, cfg, thresholds):
+    if ctx.get("fingerprint") != config_fingerprint(cfg, thresholds):
+        return True
+    # Ticker einer Journal-Änderung ohne Kursdaten: solange ihr Vorladen läuft,
+    # ist das kein Grund für eine Neuberechnung – danach (Fehlschlag) schon
+    if set(ctx.get("pending", [])) - set(prefetch_pending()):
+        return True
+    return snapshot_age(ctx) > SNAPSHOT_MAX_AGE
+
+
+# -------------------------------------------------------------------
+# Hintergrund-Aktualisierung
+# -------------------------------------------------------------------
+
+def _run_refresh(cfg, thresholds):
+    run = perf.start_run("snapshot_refresh")
+    try:
+        clear_macro_cache()
+        ctx = build_analysis_context(cfg, thresholds)
+        mtime = save_snapshot(ctx)
+        with _REFRESH_LOCK:
+            _REFRESH["ctx"] = ctx
+            _REFRESH["mtime"] = mtime
+            _REFRESH["error"] = None
+    except Exception as e:
+        with _REFRESH_LOCK:
+            _REFRESH["error"] = repr(e)
+    finally:
+        perf.finish_run(run)
+
+
+def start_background_refresh(cfg, thresholds):
+    """Neuberechnung im Hintergrund starten (nur ein Lauf gleichzeitig)."""
+    with _REFRESH_LOCK:
+        thread = _REFRESH["thread"]
+        if thread is not None and thread.is_alive():
+            return False
+        thread = threading.Thread(
+            target=_run_refresh,
+            args=(copy.deepcopy(cfg), dict(thresholds)),
+            name="snapshot-refresh",
+            daemon=True,
+        )
+        _REFRESH["thread"] = thread
+    thread.start()
+    return True
+
+
+def refresh_running():
+    with _REFRESH_LOCK:
+        thread = _REFRESH["thread"]
+    return thread is not None and thread.is_alive()
+
+
+def refresh_error():
+    with _REFRESH_LOCK:
+        return _REFRESH["error"]
+
+
+def latest_context():
+    """
+    Neuesten verfügbaren Kontext liefern. Der Speicher-Stand wird nur neu
+    von der Platte gelesen, wenn ein anderer Prozess (Cache-Warmer, Batch-CLI)
+    inzwischen einen neueren Snapshot geschrieben hat.
+    """
+    mtime = _snapshot_mtime()
+    with _REFRESH_LOCK:
+        ctx = _REFRESH["ctx"]
+        if ctx is not None and (mtime is None or mtime == _REFRESH["mtime"]):
+            return ctx
+
+    loaded = load_snapshot()
+    if loaded is None:
+        return ctx
+    with _REFRESH_LOCK:
+        _REFRESH["ctx"] = loaded
+        _REFRESH["mtime"] = mtime
+    return loaded
+
+
+def set_context(ctx):
+    """Synchron berechneten Kontext übernehmen und speichern."""
+    mtime = save_snapshot(ctx)
+    with _REFRESH_LOCK:
+        _REFRESH["ctx"] = ctx
+        _REFRESH["mtime"] = mtime
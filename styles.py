@@ -405,5 +405,15 @@ hr {
     font-family: "Inter", sans-serif !important;
 }
 
+/* ----------------------------------------------------------
+   Datenstand-Hinweis (Snapshot)
+-----------------------------------------------------------*/
+.snapshot-status {
+    font-size: 0.8rem;
+    color: var(--text-muted);
+    margin: 0.3rem 0 0.8rem 0;
+    font-family: "Inter", sans-serif !important;
+}
+
 </style>
 """
\ No newline at end of file
@@ -0,0 +1,210 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import price_store
+from data_providers import MarketDataProvider
+
+# -------------------------------------------------------------------
+# Synthetische Marktdaten (deterministisch) für Benchmarks & Offline-Läufe
+# -------------------------------------------------------------------
+#
+# Random Walk mit Regimewechseln (Bull / Seitwärts / Bear / Crash),
+# Volumen abhängig von der Tagesbewegung und gelegentlichen Kurslücken.
+# Gleicher Ticker + gleicher Seed → immer exakt dieselbe Historie.
+
+# Regime: (Drift pro Tag, Volatilität pro Tag)
+REGIMES = {
+    "bull": (0.0012, 0.022),
+    "sideways": (0.0, 0.030),
+    "bear": (-0.0015, 0.035),
+    "crash": (-0.0080, 0.070),
+}
+
+# Übergangswahrscheinlichkeiten pro Tag (Zeile = aktuelles Regime)
+REGIME_NAMES = list(REGIMES)
+REGIME_TRANSITIONS = np.array([
+    [0.985, 0.010, 0.004, 0.001],
+    [0.010, 0.980, 0.009, 0.001],
+    [0.006, 0.012, 0.977, 0.005],
+    [0.030, 0.020, 0.050, 0.900],
+])
+
+GAP_PROBABILITY = 0.01  # Wahrscheinlichkeit einer Kurslücke pro Tag
+DEFAULT_DAYS = 756       # ~3 Handelsjahre
+SYNTHETIC_END = "2025-12-31"
+
+
+def ticker_seed(ticker, seed=0):
+    """Stabiler Seed pro Ticker (unabhängig von PYTHONHASHSEED)."""
+    return (zlib.crc32(ticker.upper().encode("utf-8")) + seed * 7919) % (2 ** 32)
+
+
+def synthetic_ohlcv(ticker, days=DEFAULT_DAYS, seed=0, end=None):
+    """Daily-OHLCV im yfinance-Format (DatetimeIndex 'Date', tz New York)."""
+    rng = np.random.default_rng(ticker_seed(ticker, seed))
+    end = pd.Timestamp(end or SYNTHETIC_END).normalize()
+    index = pd.bdate_range(end=end, periods=days, tz="America/New_York", name="Date")
+
+    # Regime-Pfad als Markov-Kette
+    regimes = np.empty(days, dtype=np.int64)
+    regimes[0] = rng.integers(0, len(REGIME_NAMES))
+    draws = rng.random(days)
+    cumulative = REGIME_TRANSITIONS.cumsum(axis=1)
+    for i in range(1, days):
+        regimes[i] = int(np.searchsorted(cumulative[regimes[i - 1]], draws[i]))
+    regimes = np.minimum(regimes, len(REGIME_NAMES) - 1)
+
+    drift = np.array([REGIMES[n][0] for n in REGIME_NAMES])[regimes]
+    vol = np.array([REGIMES[n][1] for n in REGIME_NAMES])[regimes]
+    vol = vol * rng.uniform(0.6, 1.6)  # jede Aktie hat ihr eigenes Vola-Niveau
+
+    returns = drift + vol * rng.standard_normal(days)
+    gaps = rng.random(days) < GAP_PROBABILITY
+    returns[gaps] += rng.normal(0.0, 0.12, gaps.sum())
+    returns[0] = 0.0
+
+    start_price = float(np.exp(rng.uniform(np.log(0.8), np.log(400.0))))
+    closes = start_price * np.exp(np.cumsum(returns))
+
+    # Open mit Übernacht-Lücke, High/Low um Open/Close herum
+    prev_close = np.concatenate([[closes[0]], closes[:-1]])
+    overnight = rng.normal(0.0, vol * 0.3)
+    overnight[gaps] = returns[gaps] * rng.uniform(0.5, 1.0, gaps.sum())
+    opens = prev_close * np.exp(overnight)
+    spread = np.abs(rng.normal(0.0, vol, days))
+    highs = np.maximum(opens, closes) * (1 + spread * 0.6)
+    lows = np.minimum(opens, closes) * (1 - spread * 0.6)
+
+    base_volume = float(np.exp(rng.uniform(np.log(5e4), np.log(5e7))))
+    volume = base_volume * (1 + 25 * np.abs(returns)) * rng.lognormal(0.0, 0.35, days)
+
+    return pd.DataFrame(
+        {
+            "Open": opens,
+            "High": highs,
+            "Low": lows,
+            "Close": closes,
+            "Volume": np.round(volume),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+
+
+def synthetic_fundamentals(ticker, seed=0):
+    """financials / balance_sheet / calendar im Format, das analysis_core erwartet."""
+    rng = np.random.default_rng(ticker_seed(ticker, seed + 1))
+    years = pd.to_datetime(["2025-12-31", "2024-12-31", "2023-12-31"])
+
+    rev0 = float(np.exp(rng.uniform(np.log(5e6), np.log(5e10))))
+    growth = rng.normal(0.15, 0.35, 2)
+    revenue = [rev0, rev0 / (1 + growth[0]), rev0 / (1 + growth[0]) / (1 + growth[1])]
+    margin = rng.normal(-0.05, 0.25)
+    net_income = [r * (margin + rng.normal(0, 0.05)) for r in revenue]
+    financials = pd.DataFrame(
+        [revenue, net_income], index=["Total Revenue", "Net Income"], columns=years
+    )
+
+    assets = rev0 * rng.uniform(0.8, 3.0)
+    liab = assets * rng.uniform(0.1, 1.2)
+    balance_sheet = pd.DataFrame(
+        [[liab, liab * 0.9, liab * 0.8], [assets, assets * 0.9, assets * 0.8]],
+        index=["Total Liab", "Total Assets"],
+        columns=years,
+    )
+
+    earnings = pd.Timestamp(SYNTHETIC_END) + pd.Timedelta(days=int(rng.integers(-30, 90)))
+    calendar = pd.DataFrame({0: [earnings]}, index=["Earnings Date"])
+    return financials, balance_sheet, calendar
+
+
+def synthetic_universe(n, seed=0):
+    """n Universe-Einträge im Format von ai_universe.json."""
+    rng = np.random.default_rng(seed)
+    categories = ["AI Compute / GPUs", "AI Chip Fabrication", "AI Software", "AI Robotics", "AI Cloud"]
+    return [
+        {
+            "name": f"Synthetic {i:05d}",
+            "ticker": f"SYN{i:05d}",
+            "wkn": f"S{i:05d}",
+            "category": categories[int(rng.integers(0, len(categories)))],
+            "exposure": int(rng.integers(1, 11)),
+            "status": "public",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_journal(tickers, trades_per_ticker=5, seed=0, days=DEFAULT_DAYS):
+    """Journal (Käufe + Teilverkäufe) im Format von config.json."""
+    rng = np.random.default_rng(seed)
+    journal = []
+    trade_id = 1
+    for ticker in tickers:
+        hist = synthetic_ohlcv(ticker, days=days, seed=seed)
+        picks = np.sort(rng.choice(len(hist), size=trades_per_ticker, replace=False))
+        held = 0.0
+        for i in picks:
+            price = round(float(hist["Close"].iloc[i]), 2)
+            if held > 0 and rng.random() < 0.3:
+                shares = float(max(1, int(held * rng.uniform(0.1, 0.5))))
+                trade_type = "Verkauf"
+                held -= shares
+            else:
+                shares = float(rng.integers(1, 200))
+                trade_type = "Kauf"
+                held += shares
+            journal.append(
+                {
+                    "id": trade_id,
+                    "ticker": ticker,
+                    "name": ticker,
+                    "type": trade_type,
+                    "shares": shares,
+                    "price": price,
+                    "date": hist.index[i].strftime("%Y-%m-%d"),
+                }
+            )
+            trade_id += 1
+    return journal
+
+
+# -------------------------------------------------------------------
+# Daten-Provider (statt yfinance)
+# -------------------------------------------------------------------
+
+class SyntheticProvider(MarketDataProvider):
+    """Synthetische Historien & Fundamentals; Markttag ist das Ende der Reihen."""
+
+    name = "synthetic"
+
+    def __init__(self, seed=0, days=DEFAULT_DAYS, end=SYNTHETIC_END):
+        self.seed = seed
+        self.days = days
+        self.end = end
+
+    def history(self, ticker, period=None, start=None):
+        data = synthetic_ohlcv(ticker, days=self.days, seed=self.seed, end=self.end)
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start, tz=data.index.tz)]
+        elif period not in (None, "max"):
+            data = price_store.slice_period(data, period)
+        return data
+
+    def financials(self, ticker):
+        return synthetic_fundamentals(ticker, self.seed)[0]
+
+    def balance_sheet(self, ticker):
+        return synthetic_fundamentals(ticker, self.seed)[1]
+
+    def calendar(self, ticker):
+        return synthetic_fundamentals(ticker, self.seed)[2]
+
+    def today(self):
+        return pd.Timestamp(self.end).date()
+
+    def session_day(self, ticker):
+        return None  # feste Reihen, kein vorläufiger Bar
@@ -0,0 +1,102 @@
+import random
+import threading
+import time
+
+import perf
+
+# -------------------------------------------------------------------
+# Transport-Schicht für alle Upstream-Aufrufe (yfinance)
+# -------------------------------------------------------------------
+#
+# - eine geteilte Keep-Alive-Session (curl_cffi, Verbindungen werden
+#   pro Worker-Thread wiederverwendet)
+# - Token-Bucket: höchstens RATE_PER_SEC Aufrufe pro Sekunde (Burst erlaubt)
+# - begrenzte Wiederholungen mit Full Jitter bei transienten Fehlern
+# - Timeout pro Aufruf
+#
+# Rate-Limits des Providers werden hier bewusst nicht wiederholt – darauf
+# reagiert der Circuit Breaker in fetch_guard.
+# Ein "Aufruf" ist ein logischer yfinance-Abruf (financials kann intern
+# mehrere HTTP-Requests auslösen).
+
+REQUEST_TIMEOUT = 15      # Sekunden pro HTTP-Request
+RATE_PER_SEC = 8.0
+RATE_BURST = 16
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5    # Sekunden, verdoppelt sich pro Versuch
+RETRY_MAX_DELAY = 8.0
+
+TRANSIENT_MARKERS = (
+    "Timeout", "timed out", "Connection", "Curl", "reset by peer",
+    "Temporary failure", "502", "503", "504",
+)
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket; wartende Aufrufer reservieren ihr Token vorab."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Ein Token nehmen; liefert die Wartezeit in Sekunden."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            with perf.span("rate_limit_wait"):
+                time.sleep(wait)
+        return wait
+
+
+BUCKET = TokenBucket(RATE_PER_SEC, RATE_BURST)
+
+_SESSION = {"session": None, "created": False}
+_SESSION_LOCK = threading.Lock()
+
+
+def session():
+    """Geteilte HTTP-Session für yfinance (None → yfinance nutzt seine eigene)."""
+    if not _SESSION["created"]:
+        with _SESSION_LOCK:
+            if not _SESSION["created"]:
+                try:
+                    from curl_cffi import requests as curl_requests
+
+                    _SESSION["session"] = curl_requests.Session(
+                        impersonate="chrome", timeout=REQUEST_TIMEOUT
+                    )
+                except ImportError:
+                    _SESSION["session"] = None
+                _SESSION["created"] = True
+    return _SESSION["session"]
+
+
+def is_transient(error):
+    text = f"{type(error).__name__} {error}"
+    if "RateLimit" in text or "Too Many Requests" in text:
+        return False
+    return any(marker in text for marker in TRANSIENT_MARKERS)
+
+
+def request(kind, fn, *args, **kwargs):
+    """fn mit Rate-Limit und Wiederholungen ausführen."""
+    attempt = 0
+    while True:
+        BUCKET.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= MAX_RETRIES or not is_transient(e):
+                raise
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+            perf.record_network(f"{kind}_retry", nbytes=0)
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
@@ -8,203 +8,41 @@ from config_utils import (
     load_ai_universe,
     save_config,
     find_portfolio_entry,
-    rebuild_portfolio_from_journal,
+    commit_journal_change,
 )
 from analysis_core import (
-    build_portfolio_overview,
-    analyze_ticker,
     score_watchlist_candidate,
     score_dual_candidate,
     decide_portfolio_action,
-    compute_macro_context,
+    fetch_history,
+    is_reversal_candidate,
+)
+from price_store import load_history
+from live_quotes import cached_quote, splice
+from lot_ledger import positions_for
+from portfolio_history import history_summary, portfolio_history
+from risk_metrics import portfolio_risk
+from correlation_clusters import diversified
+from fetch_guard import breaker_state, broken_symbols
+from chart_utils import CHART_RANGES, chart_frame, equity_chart_frames
+from ladder_engine import (
+    LADDER_LEVELS,
+    compute_daily_ladder_actions,
 )
 from icons import icon_html
+import perf
 
 # ---------------------------------------------------------------
-# Ladder-Sell-Engine – Basislogik
+# Hilfsfunktionen
 # ---------------------------------------------------------------
 
-LADDER_LEVELS = [0.30, 0.50, 0.75, 1.00, 1.50, 2.00]  # +30 %, +50 %, ...
-
-
-def _get_exposure_map():
-    uni = load_ai_universe()
-    exposure_map = {}
-    for entry in uni.get("ai_universe", []):
-        ticker = (entry.get("ticker") or "").upper()
-        if ticker:
-            exposure_map[ticker] = entry.get("exposure")
-    return exposure_map
-
-
-def _core_and_ladder_pct(exposure):
-    """
-    Core- und Ladder-Anteile anhand AI-Exposure:
-    - 9–10: 20 % Core behalten, 80 % laddern
-    - 7–8 : 10 % Core behalten, 90 % laddern
-    - 1–6 : 0 % Core, 100 % laddern (Komplett-Verkauf über Zeit)
-    """
-    if exposure is None:
-        return 0.0, 1.0
-    if exposure >= 9:
-        return 0.20, 0.80
-    if exposure >= 7:
-        return 0.10, 0.90
-    return 0.0, 1.0
-
-
-def compute_ladder_signals(rows):
-    """
-    Alte Übersicht: Ladder-Engine ohne Fortschrittstracking.
-    Wird weiterhin im Portfolio-Tab als Gesamtübersicht verwendet.
-    """
-    exposure_map = _get_exposure_map()
-    signals = []
-
-    for r in rows:
-        ticker = r.get("Ticker")
-        name = r.get("Name")
-        shares = r.get("Stücke") or 0
-        pl_pct = r.get("P/L %")
-
-        if not ticker or shares <= 0:
-            continue
-        if pl_pct is None or pl_pct <= 0:
-            continue
-
-        exposure = exposure_map.get((ticker or "").upper())
-        core_pct, ladder_pct = _core_and_ladder_pct(exposure)
-
-        ladder_shares = int(shares * ladder_pct)
-        if ladder_shares <= 0:
-            continue
-
-        profit_frac = pl_pct / 100
-        reached = sum(1 for lvl in LADDER_LEVELS if profit_frac >= lvl)
-        if reached == 0:
-            continue
-
-        frac = reached / len(LADDER_LEVELS)
-        to_sell = int(ladder_shares * frac)
-        if to_sell <= 0:
-            continue
-
-        if core_pct >= 0.19:
-            core_text = "20 % Core halten (Exposure 9–10)"
-        elif core_pct >= 0.09:
-            core_text = "10 % Core halten (Exposure 7–8)"
-        else:
-            core_text = "kein Core – komplette Position über Ladder verwalten"
-
-        signals.append(
-            {
-                "Name": name,
-                "Ticker": ticker,
-                "Exposure": exposure,
-                "Gewinn %": round(pl_pct, 1),
-                "Empfohlen zu verkaufen": to_sell,
-                "Core-Hinweis": core_text,
-            }
-        )
 
-    return signals
-
-
-# ---------------------------------------------------------------
-# Ladder-Sell-Engine – tagesaktuelle Aktionen mit Fortschritt
-# ---------------------------------------------------------------
-
-
-def compute_daily_ladder_actions(rows, ladder_progress):
-    exposure_map = _get_exposure_map()
-    signals = []
-
-    for r in rows:
-        ticker_raw = r.get("Ticker")
-        ticker = (ticker_raw or "").upper()
-        name = r.get("Name")
-        shares = r.get("Stücke") or 0
-        pl_pct = r.get("P/L %")
-
-        if not ticker or shares <= 0:
-            continue
-        if pl_pct is None or pl_pct <= 0:
-            continue
-
-        exposure = exposure_map.get(ticker)
-        core_pct, ladder_pct = _core_and_ladder_pct(exposure)
-
-        ladder_shares = int(shares * ladder_pct)
-        if ladder_shares <= 0:
-            continue
-
-        profit_frac = pl_pct / 100
-        max_levels = len(LADDER_LEVELS)
-        levels_done = int(ladder_progress.get(ticker, 0))
-
-        if levels_done >= max_levels:
-            continue
-
-        next_level_threshold = LADDER_LEVELS[levels_done]
-        if profit_frac < next_level_threshold:
-            continue
-
-        frac_done = levels_done / max_levels
-        frac_after = (levels_done + 1) / max_levels
-        to_sell_before = int(ladder_shares * frac_done)
-        to_sell_after = int(ladder_shares * frac_after)
-        to_sell = max(0, to_sell_after - to_sell_before)
-
-        if to_sell <= 0:
-            continue
-
-        if core_pct >= 0.19:
-            core_text = "20 % Core halten (Exposure 9–10)"
-        elif core_pct >= 0.09:
-            core_text = "10 % Core halten (Exposure 7–8)"
-        else:
-            core_text = "kein Core – komplette Position über Ladder verwalten"
-
-        signals.append(
-            {
-                "Name": name,
-                "Ticker": ticker_raw,
-                "TickerKey": ticker,
-                "Exposure": exposure,
-                "Gewinn %": round(pl_pct, 1),
-                "Aktuelle Stufe": f"{levels_done}/{max_levels}",
-                "Nächste Stufe": f"{levels_done + 1}/{max_levels}",
-                "Schwelle nächste Stufe (%)": int(next_level_threshold * 100),
-                "Empfohlen zu verkaufen": to_sell,
-                "Core-Hinweis": core_text,
-            }
-        )
-
-    return signals
-
-
-# ---------------------------------------------------------------
-# Hilfsfunktionen – z.B. Reversal-Logik
-# ---------------------------------------------------------------
-
-
-def is_reversal_candidate(analysis, thresholds):
-    """
-    Entscheidet, ob eine Aktie ein Reversal-Kandidat ist.
-    """
-    dd = analysis.get("dd_52w")
-    stage = analysis.get("stage_52w", "")
-    wave = analysis.get("wave", "")
-
-    if dd is None:
-        return False
-
-    min_dd = thresholds.get("reversal_dd_min", -30)
-
-    if dd <= min_dd and ("Korrektur" in stage or "Re-Entry" in wave or "DIP" in wave):
-        return True
-
-    return False
+def _scores_for(ctx, ticker, analysis, thresholds):
+    """STS/LAS aus dem Analyse-Kontext – nur wenn sie fehlen, neu berechnen."""
+    scores = ctx.get("scores", {}).get(ticker)
+    if scores is None:
+        scores = score_dual_candidate(analysis, thresholds, ctx.get("macro"))
+    return scores
 
 
 # ---------------------------------------------------------------
@@ -212,13 +50,12 @@ def is_reversal_candidate(analysis, thresholds):
 # ---------------------------------------------------------------
 
 
-def render_actions_tab(cfg, thresholds):
-    # Makro nur einmal berechnen
-    macro = compute_macro_context()
-
-    portfolio, analyses_portfolio, rows_portfolio, gesamt_wert, gesamt_einsatz = build_portfolio_overview(
-        cfg, thresholds
-    )
+def render_actions_tab(cfg, thresholds, ctx):
+    # Alles aus dem Analyse-Kontext (Snapshot oder frisch berechnet)
+    macro = ctx["macro"]
+    portfolio = cfg.get("portfolio", [])
+    analyses_portfolio = ctx["portfolio_analyses"]
+    rows_portfolio = ctx["portfolio_rows"]
 
     # WKN-Mapping aus dem AI-Universe (Ticker -> WKN)
     universe_for_wkn = load_ai_universe().get("ai_universe", [])
@@ -303,7 +140,7 @@ def render_actions_tab(cfg, thresholds):
     else:
         # 👉 Daily Action Center – Ladder-Verkäufe heute
         #    wird jetzt als erstes Element auf der HOME-Seite angezeigt.
-        render_daily_actions_tab(cfg, thresholds)
+        render_daily_actions_tab(cfg, thresholds, ctx)
         st.markdown("---")
 
         action_rows = []
@@ -338,7 +175,7 @@ def render_actions_tab(cfg, thresholds):
         reversal_candidates = []
         for row in action_rows:
             analysis = row["analysis"]
-            sts, las = score_dual_candidate(analysis, thresholds, macro)
+            sts, las = _scores_for(ctx, row["Ticker"], analysis, thresholds)
             if is_reversal_candidate(analysis, thresholds):
                 reversal_candidates.append((sts, las, row))
 
@@ -414,11 +251,14 @@ def render_actions_tab(cfg, thresholds):
             scored = []
             for row in action_rows:
                 analysis = row["analysis"]
-                sts, las = score_dual_candidate(analysis, thresholds, macro)
+                sts, las = _scores_for(ctx, row["Ticker"], analysis, thresholds)
                 scored.append((sts, las, row, analysis))
 
             scored.sort(key=lambda x: x[0], reverse=True)
-            top3 = scored[:3]
+            # höchstens ein Wert je Korrelations-Cluster (sonst dreimal dieselbe Wette)
+            top3 = diversified(
+                scored, ctx.get("clusters") or {}, 3, ticker_of=lambda x: x[2]["Ticker"]
+            )
 
             st.markdown("---")
             st.markdown(
@@ -489,6 +329,9 @@ def render_actions_tab(cfg, thresholds):
                         f"- Kategorie: **{best_entry.get('category', 'n/a')}**, "
                         f"AI-Exposure: **{best_entry.get('exposure', 'n/a')}/10**"
                     )
+                    cluster = (ctx.get("clusters") or {}).get(row["Ticker"].upper())
+                    if cluster:
+                        st.markdown(f"- Korrelations-Cluster: **{cluster}**")
                     st.markdown(f"- Setup: {best_analysis['wave']}")
                     fund = best_analysis.get("fundamentals") or {}
                     if fund.get("rev_growth_1y") is not None:
@@ -526,8 +369,8 @@ def render_actions_tab(cfg, thresholds):
 # TAB: AI Universe Radar
 # ---------------------------------------------------------------
 
-def render_universe_tab(cfg, thresholds):
-    macro = compute_macro_context()
+def render_universe_tab(cfg, thresholds, ctx):
+    macro = ctx["macro"]
 
     st.markdown(
         icon_html(
@@ -573,68 +416,19 @@ def render_universe_tab(cfg, thresholds):
         st.warning("Keine AI-Universe-Daten gefunden. Bitte ai_universe.json prüfen.")
         return
 
-    rows = []
-    for entry in universe:
-        analysis = analyze_ticker(
-            name=entry["name"],
-            ticker=entry["ticker"],
-            thresholds=thresholds,
-        )
-
-        # Unhandlbare / tote Werte überspringen
-        if (
-            analysis["price"] is None
-            or analysis.get("is_zombie")
-            or analysis.get("is_untradable")
-        ):
-            continue
+    # Radar-Zeilen sind bereits im Analyse-Kontext berechnet
+    rows = ctx["radar_rows"]
 
-        sts, las = score_dual_candidate(analysis, thresholds, macro)
-
-        if sts >= 65 or las >= 60:
-            ampel = "🟢 Kauf-Zone"
-        elif sts >= 50 or las >= 50:
-            ampel = "🟡 Watchlist / opportunistisch"
-        else:
-            ampel = "🔴 Kein Kauf / nur beobachten"
-
-        fund = analysis.get("fundamentals") or {}
-        reversal_flag = is_reversal_candidate(analysis, thresholds)
-        dd_52w = analysis.get("dd_52w")
-
-        rows.append(
-            {
-                "Name": analysis["name"],
-                "Ticker": analysis["ticker"],
-                "WKN": entry.get("wkn", "—"),
-                "Kategorie": entry.get("category", ""),
-                "AGI-Exposure (1–10)": entry.get("exposure", ""),
-                "STS (Short-Term)": sts,
-                "LAS (Long-Term AGI)": las,
-                "Ampel": ampel,
-                "Setup": "🔁 Reversal" if reversal_flag else "—",
-                "Kurs": round(analysis["price"], 2) if analysis["price"] else None,
-                "Trend": analysis["trend"],
-                "Momentum 20d": analysis["momentum_20d"],
-                "52W-Stage": analysis["stage_52w"],
-                "Drawdown 52W (%)": round(dd_52w, 1) if dd_52w is not None else None,
-                "Umsatzwachstum 1Y (%)": round(fund["rev_growth_1y"], 1)
-                if fund.get("rev_growth_1y") is not None
-                else None,
-                "Nettomarge (%)": round(fund["net_margin"], 1)
-                if fund.get("net_margin") is not None
-                else None,
-                "Debt/Assets": round(fund["debt_to_assets"], 2)
-                if fund.get("debt_to_assets") is not None
-                else None,
-                "Wave-Signal": analysis["wave"],
-                "TP-Level": round(analysis["wave_tp_level"], 2)
-                if analysis.get("wave_tp_level")
-                else None,
-                "Re-Entry-Level": round(analysis["wave_reentry_level"], 2)
-                if analysis.get("wave_reentry_level")
-                else None,
-            }
+    # Ticker ohne Kursdaten nicht stillschweigend aus dem Radar fallen lassen
+    universe_tickers = {(e.get("ticker") or "").upper() for e in universe}
+    broken = [
+        b for b in broken_symbols()
+        if b["kind"] == "history" and b["ticker"] in universe_tickers
+    ]
+    if broken:
+        st.info(
+            f"{len(broken)} Ticker ohne Kursdaten (delistet/Tippfehler?, neuer Versuch mit Backoff): "
+            + ", ".join(b["ticker"] for b in broken)
         )
 
     # -----------------------------------------------------------
@@ -649,6 +443,20 @@ def render_universe_tab(cfg, thresholds):
 
     df = df.sort_values("STS (Short-Term)", ascending=False)
 
+    # Korrelations-Cluster: stark korrelierte Werte sind dieselbe Wette
+    clusters = ctx.get("clusters") or {}
+    if clusters:
+        df.insert(
+            df.columns.get_loc("Kategorie") + 1,
+            "Cluster",
+            df["Ticker"].str.upper().map(clusters),
+        )
+        if st.checkbox(
+            "Nur den besten Wert je Korrelations-Cluster zeigen (diversifiziert)",
+            key="radar_diversified",
+        ):
+            df = df[~df["Cluster"].duplicated() | df["Cluster"].isna()]
+
     # -----------------------------------------------------------
     # Eigenes HTML-Table mit Retro-Design + horizontalem Scroll
     # -----------------------------------------------------------
@@ -713,13 +521,14 @@ def render_universe_tab(cfg, thresholds):
     )
 
     # HTML aus dem DataFrame
-    html_table = df.to_html(
-        index=True,
-        border=0,
-        classes="agi-radar-table",
-        justify="left",
-        escape=False,
-    )
+    with perf.span("radar_html", tab="AGI/AI RADAR"):
+        html_table = df.to_html(
+            index=True,
+            border=0,
+            classes="agi-radar-table",
+            justify="left",
+            escape=False,
+        )
 
     # Wrapper + Card für runde Ecken & Shadow
     st.markdown(
@@ -738,7 +547,7 @@ def render_universe_tab(cfg, thresholds):
 # ---------------------------------------------------------------
 
 
-def render_portfolio_tab(cfg, thresholds):
+def render_portfolio_tab(cfg, thresholds, ctx):
     st.markdown(
         icon_html(
             "account_balance_48dp_1F1F1F_FILL0_wght400_GRAD0_opsz48.svg",
@@ -749,9 +558,11 @@ def render_portfolio_tab(cfg, thresholds):
         unsafe_allow_html=True,
     )
 
-    portfolio, analyses_portfolio, rows, gesamt_wert, gesamt_einsatz = build_portfolio_overview(
-        cfg, thresholds
-    )
+    portfolio = cfg.get("portfolio", [])
+    analyses_portfolio = ctx["portfolio_analyses"]
+    rows = ctx["portfolio_rows"]
+    gesamt_wert = ctx["gesamt_wert"]
+    gesamt_einsatz = ctx["gesamt_einsatz"]
 
     universe_for_wkn = load_ai_universe().get("ai_universe", [])
     wkn_map = {
@@ -775,11 +586,114 @@ def render_portfolio_tab(cfg, thresholds):
         st.info("Noch keine Positionen im Portfolio. Trage im Tab 'Trade eintragen' deinen ersten Kauf ein.")
         return
 
-    col1, col2 = st.columns(2)
+    # realisierter G/V aller Ticker (auch geschlossene Positionen) aus dem Lot-Buch
+    realisiert = sum(p["realized"] for p in positions_for(cfg).values())
+
+    col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Gesamt-Einsatz", f"{gesamt_einsatz:,.2f} USD")
     with col2:
         st.metric("Gesamt-Wert", f"{gesamt_wert:,.2f} USD")
+    with col3:
+        st.metric("Realisiert (G/V)", f"{realisiert:,.2f} USD")
+
+    # ---------------------------
+    # Depotwert-Verlauf (Equity-Kurve aus Journal + Kursspeicher)
+    # ---------------------------
+    history = portfolio_history(cfg)
+    summary = history_summary(history)
+    if summary is not None:
+        st.markdown("**Depotwert-Verlauf**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Rendite (zeitgewichtet)", f"{summary['Rendite gesamt']:+.1f} %")
+        with col2:
+            st.metric("Max. Drawdown", f"{summary['Max. Drawdown']:.1f} %")
+        with col3:
+            st.metric("Drawdown aktuell", f"{summary['Drawdown aktuell']:.1f} %")
+
+        equity_range = st.radio(
+            "Zeitraum Depotwert:",
+            options=list(CHART_RANGES.keys()),
+            index=list(CHART_RANGES.keys()).index("MAX"),
+            horizontal=True,
+            key="equity_range",
+        )
+        values_df, drawdown_df = equity_chart_frames(history, equity_range)
+        value_chart = (
+            alt.Chart(values_df)
+            .mark_line()
+            .encode(
+                x=alt.X("Datum:T", title=None),
+                y=alt.Y("Wert:Q", title="USD"),
+                color=alt.Color("Reihe:N", title=None, legend=alt.Legend(orient="top")),
+                tooltip=["Datum:T", "Reihe:N", alt.Tooltip("Wert:Q", format=",.2f")],
+            )
+            .properties(height=220)
+        )
+        drawdown_chart = (
+            alt.Chart(drawdown_df)
+            .mark_area(opacity=0.4, color="#BE5103")
+            .encode(
+                x=alt.X("Datum:T", title=None),
+                y=alt.Y("Drawdown %:Q"),
+                tooltip=["Datum:T", alt.Tooltip("Drawdown %:Q", format=".1f")],
+            )
+            .properties(height=100)
+        )
+        st.altair_chart(alt.vconcat(value_chart, drawdown_chart), use_container_width=True)
+        if history.attrs.get("missing"):
+            st.caption(
+                "Noch ohne Kursdaten, daher nicht im Verlauf: "
+                + ", ".join(history.attrs["missing"])
+            )
+
+    # ---------------------------
+    # Risiko vs. Markt (^GSPC)
+    # ---------------------------
+    risk = ctx["risk"] if "risk" in ctx else portfolio_risk(cfg)
+    if risk:
+        st.markdown("**Risiko vs. S&P 500**")
+        conf = f"{risk['confidence'] * 100:.0f} %"
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(
+                "Volatilität p.a.",
+                f"{risk['volatility_pct']:.1f} %",
+                f"S&P 500: {risk['bench_volatility_pct']:.1f} %",
+                delta_color="off",
+            )
+        with col2:
+            beta = risk["beta"]
+            corr = risk["correlation"]
+            st.metric(
+                "Beta",
+                f"{beta:.2f}" if beta is not None else "—",
+                f"Korrelation {corr:.2f}" if corr is not None else None,
+                delta_color="off",
+            )
+        with col3:
+            st.metric(f"VaR {conf} (1 Tag)", f"{risk['var_usd']:,.0f} USD", f"{risk['var_pct']:.1f} %", delta_color="off")
+        with col4:
+            st.metric(f"CVaR {conf} (1 Tag)", f"{risk['cvar_usd']:,.0f} USD", f"{risk['cvar_pct']:.1f} %", delta_color="off")
+
+        contrib = pd.DataFrame(
+            [
+                {
+                    "Ticker": ticker,
+                    "Gewicht %": round(p["weight_pct"], 1),
+                    "Risikoanteil %": round(p["risk_share_pct"], 1) if p["risk_share_pct"] is not None else None,
+                    "Volatilität p.a. %": round(p["volatility_pct"], 1) if p["volatility_pct"] is not None else None,
+                    "Beta": round(p["beta"], 2) if p["beta"] is not None else None,
+                }
+                for ticker, p in risk["positions"].items()
+            ]
+        ).sort_values("Risikoanteil %", ascending=False)
+        st.dataframe(contrib, use_container_width=True, hide_index=True)
+        st.caption(
+            f"Historisch aus {risk['observations']} Handelstagen bis {risk['as_of']}, "
+            "Gewichte = aktueller Marktwert der offenen Lots."
+        )
 
     st.markdown(
         icon_html(
@@ -879,20 +793,28 @@ def render_portfolio_tab(cfg, thresholds):
     st.markdown("---")
     choice = st.selectbox("Kursverlauf anzeigen für:", options=tickers)
     sel = next(p for p in portfolio if p["ticker"] == choice)
-    sel_analysis = analyze_ticker(
-        name=sel["name"],
-        ticker=sel["ticker"],
-        thresholds=thresholds,
+    range_label = st.radio(
+        "Zeitraum:",
+        options=list(CHART_RANGES.keys()),
+        index=list(CHART_RANGES.keys()).index("1J"),
+        horizontal=True,
     )
+
+    # Chart liest direkt aus dem lokalen Kursspeicher – kein erneuter Analyse-Lauf
+    hist = load_history(sel["ticker"])
+    if hist is None:
+        hist = fetch_history(sel["ticker"], period="max")
+    if st.session_state.get("live_quotes"):
+        hist = splice(hist, cached_quote(sel["ticker"]))
+
     wkn_sel = wkn_map.get(sel["ticker"], "—")
     st.write(
-        f"Preisverlauf 1 Jahr – {sel_analysis['name']} ({sel_analysis['ticker']}) – WKN: {wkn_sel}"
+        f"Preisverlauf {range_label} – {sel['name']} ({sel['ticker']}) – WKN: {wkn_sel}"
     )
-    if sel_analysis["history"] is not None:
-        hist = sel_analysis["history"].reset_index()
-        hist = hist[["Date", "Close"]].rename(columns={"Date": "Datum", "Close": "Kurs"})
+    if hist is not None:
+        chart_df = chart_frame(hist, range_label)
         chart = (
-            alt.Chart(hist)
+            alt.Chart(chart_df)
             .mark_area(opacity=0.4)
             .encode(
                 x="Datum:T",
@@ -909,7 +831,7 @@ def render_portfolio_tab(cfg, thresholds):
 # ---------------------------------------------------------------
 
 
-def render_daily_actions_tab(cfg, thresholds):
+def render_daily_actions_tab(cfg, thresholds, ctx):
     st.markdown(
         icon_html(
             "alarm_48dp_1F1F1F_FILL0_wght400_GRAD0_opsz48.svg",
@@ -920,9 +842,8 @@ def render_daily_actions_tab(cfg, thresholds):
         unsafe_allow_html=True,
     )
 
-    portfolio, analyses_portfolio, rows, gesamt_wert, gesamt_einsatz = build_portfolio_overview(
-        cfg, thresholds
-    )
+    portfolio = cfg.get("portfolio", [])
+    rows = ctx["portfolio_rows"]
 
     if not portfolio:
         st.info("Noch keine Positionen im Portfolio. Trage im Tab 'Trade eintragen' deinen ersten Kauf ein.")
@@ -1039,8 +960,7 @@ def render_trades_tab(cfg):
                 }
             )
 
-            rebuild_portfolio_from_journal(cfg)
-            save_config(cfg)
+            commit_journal_change(cfg, [ticker])
 
             st.success(f"Trade gespeichert: {trade_type} {shares} x {ticker} @ {price} am {date_str}")
 
@@ -1117,8 +1037,7 @@ def render_trades_tab(cfg):
     with col_btn:
         if st.button("Ausgewählten Trade löschen"):
             cfg["journal"] = [j for j in journal if j["id"] != sel_id]
-            rebuild_portfolio_from_journal(cfg)
-            save_config(cfg)
+            commit_journal_change(cfg, [j["ticker"] for j in journal if j["id"] == sel_id])
             st.success(f"Trade {sel_id} wurde gelöscht.")
 
     # ---------------------------------------------------------------
@@ -1146,9 +1065,117 @@ def render_trades_tab(cfg):
                 st.warning("Bitte einen Ticker auswählen.")
             else:
                 cfg["journal"] = [j for j in journal if j["ticker"] != delete_choice]
-                rebuild_portfolio_from_journal(cfg)
-                save_config(cfg)
+                commit_journal_change(cfg, [delete_choice])
                 st.success(
                     f"Alle Trades zu {delete_choice} wurden entfernt. "
                     "Die Aktie bleibt im AI-Universe-Radar sichtbar."
                 )
+
+
+# ---------------------------------------------------------------
+# Verstecktes Diagnose-Panel (?diag=1)
+# ---------------------------------------------------------------
+
+
+def _format_bytes(n):
+    if n >= 1e6:
+        return f"{n / 1e6:.1f} MB"
+    if n >= 1e3:
+        return f"{n / 1e3:.1f} kB"
+    return f"{n} B"
+
+
+def render_diagnostics_panel(rerun_summary, runs):
+    """Langsamste Stufen/Ticker des letzten Reruns und der letzten Hintergrund-Läufe."""
+    st.markdown("---")
+    st.markdown(
+        icon_html(
+            "browse_activity_48dp_1F1F1F_FILL0_wght400_GRAD0_opsz48.svg",
+            size=18,
+            variant="mustard",
+        )
+        + "<span style='font-size:1.0rem;font-weight:600;'>Diagnose – Hot-Path-Timings</span>",
+        unsafe_allow_html=True,
+    )
+
+    summaries = {"rerun": rerun_summary}
+    for name, summary in runs.items():
+        if name != "rerun":
+            summaries[name] = summary
+
+    for name, summary in summaries.items():
+        if not summary:
+            continue
+        net = summary["network"]
+        with st.expander(
+            f"{name} – {summary['started_at']} – {summary['duration_s']:.2f}s – "
+            f"{net['calls']} Netzwerk-Aufrufe ({_format_bytes(net['bytes'])})",
+            expanded=(name == "rerun"),
+        ):
+            stages = pd.DataFrame(
+                [{"Stufe": k, **v} for k, v in summary["stages"].items()]
+            )
+            if not stages.empty:
+                st.markdown("**Langsamste Stufen**")
+                st.dataframe(
+                    stages.sort_values("total_s", ascending=False),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            if summary["tabs"]:
+                st.markdown("**Tabs**")
+                st.dataframe(
+                    pd.DataFrame([{"Tab": k, "Sekunden": v} for k, v in summary["tabs"].items()]),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            if summary["slowest_tickers"]:
+                st.markdown("**Langsamste Ticker**")
+                st.dataframe(
+                    pd.DataFrame(summary["slowest_tickers"]),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            if net["by_kind"]:
+                st.markdown("**Netzwerk nach Art**")
+                st.dataframe(
+                    pd.DataFrame([{"Art": k, **v} for k, v in net["by_kind"].items()]),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+
+    _render_fetch_failures()
+
+
+def _render_fetch_failures():
+    """Negativ-Cache & Circuit Breaker (fetch_guard)."""
+    breaker = breaker_state()
+    broken = broken_symbols()
+    label = f"Provider: Circuit Breaker {breaker['state']} – {len(broken)} Ticker im Negativ-Cache"
+    with st.expander(label, expanded=breaker["state"] != "closed"):
+        if breaker["state"] == "open":
+            st.warning(
+                f"Remote-Aufrufe pausiert für {breaker['open_for_s']:.0f}s – "
+                f"letzter Fehler: {breaker['last_error']}"
+            )
+        st.caption(
+            f"{breaker['trips']}× ausgelöst, {breaker['consecutive_errors']} Fehler in Folge"
+        )
+        if broken:
+            st.dataframe(
+                pd.DataFrame(
+                    [
+                        {
+                            "Ticker": b["ticker"],
+                            "Art": b["kind"],
+                            "Fehlschläge": b["failures"],
+                            "seit": datetime.fromtimestamp(b["since"]).strftime("%d.%m. %H:%M"),
+                            "nächster Versuch in (min)": round(b["retry_in_s"] / 60, 1),
+                            "Fehler": b["error"],
+                        }
+                        for b in broken
+                    ]
+                ),
+                use_container_width=True,
+                hide_index=True,
+            )